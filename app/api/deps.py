@@ -1,21 +1,43 @@
 # app/api/deps.py
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
 
-from app.db import SessionLocal  # ★ 既存の db.py で SessionLocal を定義している前提
+from app.db import AsyncSessionLocal, SessionLocal, bind_game  # ★ 既存の db.py で SessionLocal を定義している前提
 
-def get_db_dep() -> Generator[Session, None, None]:
+def get_db_dep(conn: HTTPConnection) -> Generator[Session, None, None]:
     """
     FastAPI の Depends で使う DB セッション依存関数。
     エンドポイント側では `db: Session = Depends(get_db)` で利用。
+    パスに {game_id} があれば、投票・行動テーブルをその卓に向ける（JINROU_GAME_DB_MODE=PER_GAME のとき）。
     """
     db = SessionLocal()
+    bind_game(db, conn.path_params.get("game_id"))
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db_dep(conn: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
+    """
+    async エンドポイント用の DB セッション依存関数。
+    スレッドプールを使わないので、同時リクエスト数がスレッド数で頭打ちにならない。
+    """
+    async with AsyncSessionLocal() as db:
+        bind_game(db, conn.path_params.get("game_id"))
+        yield db
+
+
+async def run_sync_db(db: AsyncSession, fn, /, *args, **kwargs):
+    """
+    同期 Session 向けに書いた処理 fn(*args, db=session) を AsyncSession 上で実行する。
+    ゲームロジックは同期版のまま共有し、テストからは従来どおり同期 Session で呼べる。
+    """
+    return await db.run_sync(lambda session: fn(*args, db=session, **kwargs))
+
+
 # 新しく追加したエンドポイント用に、別名も用意しておく
 # これで from app.api.deps import get_db も動く
 get_db = get_db_dep
\ No newline at end of file
@@ -0,0 +1,76 @@
+# app/api/etag.py
+"""
+ETag / If-None-Match の共通処理。
+Game / Room の version 列から弱い ETag を作り、一致すれば 304 を返す。
+"""
+from functools import lru_cache
+
+from fastapi import Request, Response
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+def bump_version(obj) -> None:
+    """
+    永続化済みの Game / Room の version を +1 する。
+    SQL 式で代入するので、同時に更新されても取りこぼさない
+    （flush 時に UPDATE ... SET version = version + 1 になる）。
+    """
+    obj.version = type(obj).version + 1
+
+
+@lru_cache(maxsize=None)
+def _bump_version_stmt(table):
+    """UPDATE ... SET version = version + 1 ... RETURNING version（テーブルごとに1回だけ組み立てる）。"""
+    return (
+        update(table)
+        .where(table.c.id == bindparam("obj_id"))
+        .values(version=table.c.version + 1)
+        .returning(table.c.version)
+    )
+
+
+def bump_version_returning(db: Session, obj) -> int:
+    """
+    bump_version と同じく version を +1 するが、UPDATE をその場で流して新しい値を返す。
+    flush 後に version を SELECT し直さないので、書き込み transaction が1文短くなる。
+    UPDATE ... RETURNING の無い DB では bump_version + flush + 再読込になる。
+    """
+    cls = type(obj)
+    if not db.get_bind().dialect.update_returning:
+        bump_version(obj)
+        db.flush()
+        return obj.version
+    version = db.connection().execute(_bump_version_stmt(cls.__table__), {"obj_id": obj.id}).scalar_one()
+    set_committed_value(obj, "version", version)
+    return version
+
+
+def version_etag(obj) -> str:
+    return f'W/"{obj.id}:{obj.version or 0}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # 弱い比較（W/ の有無は区別しない）
+    target = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == target
+        for tag in if_none_match.split(",")
+    )
+
+
+def check_not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    レスポンスに ETag を付け、If-None-Match と一致すれば 304 レスポンスを返す。
+    一致しなければ None（呼び出し側は通常どおり本文を組み立てる）。
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return None
@@ -1,18 +1,29 @@
 # app/api/v1/debug.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 import uuid
 
 from ...api.deps import get_db_dep
-from ...db import Base, engine, ensure_room_members_schema
+from ...api.etag import bump_version
+from ... import archive, game_engine, game_log, night_outcome, query_stats
+from ...db import Base, drop_all_game_databases, engine, ensure_schema
 from ...models.room import Room, RoomRoster, RoomMember
 from ...models.profile import Profile
 from ...models.game import Game, GameMember, DayVote, WolfVote, SeerInspect
 from ...models.knight import KnightGuard
 from ...schemas.game import GameCreate
-from .games import create_game, start_game
+from .games import (
+    create_game,
+    start_game,
+    _commit_action,
+    _count_alive,
+    _load_alive_members,
+    _publish_game_state,
+    _set_alive_counts,
+    _stored_alive_counts,
+)
 
 router = APIRouter(prefix="/debug", tags=["debug"])
 
@@ -22,6 +33,10 @@ class DebugSeedRequest(BaseModel):
     player_names: list[str] | None = None
     player_count: int | None = None
     start_game: bool = True
+    # False なら既存データを残したままルーム/ゲームを追加する（負荷試験で卓を並べる用）
+    reset: bool = True
+    # ゲームの乱数の seed（同じ seed・同じ操作で役職配布・決着を再現する）。省略時はランダム
+    seed: int | None = None
 
 
 class DebugGameMemberUpdate(BaseModel):
@@ -43,9 +58,13 @@ def reset_and_seed(
     db: Session = Depends(get_db_dep),
 ):
     # DB 全消し（開発専用）
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-    ensure_room_members_schema()
+    if data.reset:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        ensure_schema()
+        drop_all_game_databases()
+        game_engine.clear()
+        night_outcome.clear()
 
     # 参加者名を決定
     if data.player_names:
@@ -105,7 +124,7 @@ def reset_and_seed(
 
     game_id = None
     if data.start_game:
-        game = create_game(GameCreate(room_id=room.id), db)
+        game = create_game(GameCreate(room_id=room.id, seed=data.seed), db)
         game_id = game.id
         start_game(game_id, payload=None, db=db)
 
@@ -146,9 +165,14 @@ def set_game_members(
     if not game:
         return {"detail": "Game not found"}
 
+    # 更新対象を1クエリでまとめて読む（1人ずつ db.get しない）
+    members_by_id = {
+        gm.id: gm
+        for gm in db.query(GameMember).filter(GameMember.game_id == data.game_id).all()
+    }
     for upd in data.updates:
-        gm = db.get(GameMember, upd.member_id)
-        if not gm or gm.game_id != data.game_id:
+        gm = members_by_id.get(upd.member_id)
+        if not gm:
             return {"detail": "GameMember not found"}
 
         if upd.role_type is not None:
@@ -172,7 +196,23 @@ def set_game_members(
             game.tie_streak = 0
         db.add(game)
 
-    db.commit()
+    # 役職・生死を直接書き換えたので、生存者数カウンタは数え直す
+    _set_alive_counts(game, [gm for gm in members_by_id.values() if gm.alive])
+    payload = {
+        "members": {
+            upd.member_id: {
+                "role_type": members_by_id[upd.member_id].role_type,
+                "team": members_by_id[upd.member_id].team,
+                "alive": members_by_id[upd.member_id].alive,
+            }
+            for upd in data.updates
+        },
+        "reset_votes": data.reset_votes,
+    }
+    if data.reset_votes:
+        payload["vote_round"] = 0
+    _commit_action(db, game, events=[(game_log.EVENT_MEMBERS_OVERRIDDEN, payload)])
+    _publish_game_state(game, db)
 
     members = (
         db.query(GameMember)
@@ -192,3 +232,61 @@ def set_game_members(
             for m in members
         ],
     }
+
+
+@router.get("/query_stats")
+def get_query_stats(reset: bool = False):
+    """
+    ルートごとの SQL 実行回数・DB 時間の累計（JINROU_QUERY_STATS=1 で起動したときだけ貯まる）。
+    reset=true で返したあとに累計を消す。
+    """
+    summary = query_stats.route_summary()
+    if reset:
+        query_stats.reset_routes()
+    return {"enabled": query_stats.enabled, "routes": summary}
+
+
+@router.get("/games/{game_id}/alive_counts")
+def check_alive_counts(game_id: str, repair: bool = False, db: Session = Depends(get_db_dep)):
+    """
+    生存者数カウンタ（games.alive_wolf_count / alive_village_count）をメンバーから数え直して突き合わせる。
+    repair=true でずれていれば数え直した値で上書きする。
+    """
+    game = db.get(Game, game_id)
+    if not game:
+        return {"detail": "Game not found"}
+
+    stored = _stored_alive_counts(game)
+    alive_members = _load_alive_members(db, game_id)
+    actual = _count_alive(alive_members)
+    repaired = False
+    if repair and stored != actual:
+        _set_alive_counts(game, alive_members)
+        bump_version(game)
+        db.commit()
+        repaired = True
+    return {
+        "game_id": game_id,
+        "stored": list(stored) if stored is not None else None,
+        "actual": list(actual) if actual is not None else None,
+        "ok": stored == actual,
+        "repaired": repaired,
+    }
+
+
+@router.post("/archive/run")
+def run_archive(older_than_sec: int | None = None):
+    """
+    終了したゲームのアーカイブを今すぐ1回回す（定期実行を待たずに確認する用）。
+    older_than_sec を省略すると config.ARCHIVE_AFTER_SEC。
+    """
+    return archive.run_once(older_than_sec=older_than_sec)
+
+
+@router.get("/archive/games/{game_id}")
+def get_archived_game(game_id: str, db: Session = Depends(get_db_dep)):
+    """アーカイブ済みのゲームのスナップショットを展開して返す。"""
+    snapshot = archive.load_archive(db, game_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Archived game not found")
+    return snapshot
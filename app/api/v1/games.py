@@ -1,13 +1,27 @@
 # app/api/v1/games.py
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+from dataclasses import asdict
+from datetime import datetime
+import json
 import uuid
-import random 
-from typing import Optional, Dict
-
-from ...api.deps import get_db_dep
+from typing import NamedTuple, Optional, Dict
+
+from ...api.deps import get_async_db_dep, get_db_dep, run_sync_db
+from ...api.etag import bump_version, bump_version_returning, check_not_modified, version_etag
+from ...db import AsyncSessionLocal, SessionLocal, routes_games
+from ... import config, game_engine, game_log, night_outcome
+from ...game_engine import GameEngine, get_game_engine, record_action
+from ...state_store import REVEAL_ROLES_STATE_NS, RUNOFF_STATE_NS, get_state_store
+from ...realtime import WAIT_RECHECK_SEC, hub, game_topic, publish_room_event
 from ...models.room import Room, RoomMember
 from ...models.game import (
     Game,
@@ -16,6 +30,7 @@ from ...models.game import (
     DayVote,
     SeerInspect,
     MediumInspect,   # ★ 追加
+    NightOutcome,
 )
 from ...models.knight import KnightGuard
 from ...schemas.game import (
@@ -29,15 +44,21 @@ from ...schemas.game import (
 from ...schemas.night import (
     WolfVoteCreate,
     WolfVoteOut,
+    WolfVoteBatchCreate,
+    WolfVoteBatchItemOut,
+    WolfVoteBatchOut,
     WolfTallyItem,
     WolfTallyOut,
     NightActionsStatusOut,
     NightResultOut,
-    NightResultVictimOut,
 )
 from ...schemas.day import (  # ★ 追加
     DayVoteCreate,
     DayVoteOut,
+    DayVoteBatchCreate,
+    DayVoteBatchItemOut,
+    DayVoteBatchOut,
+    VoteBatchItemError,
     DayTallyItem,
     DayTallyOut,
     DayResolveRequest,
@@ -55,11 +76,145 @@ from ...schemas.knight import (
 )
 from ...schemas.medium import MediumInspectOut  # ★ 追加
 from ...schemas.game_member import GameMemberMe
+from ...schemas.game_log import GameEventOut, GameLogOut, ReplayStateOut
+from ...schemas.view import GameJudgeOut, GameViewOut
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/games", tags=["games"])
-_REVEAL_ROLES_STATE: dict[str, bool] = {}
-_RUNOFF_STATE: dict[str, dict] = {}
+
+# ゲーム作成のイベントに記録する設定（Game の列）
+GAME_SETTING_KEYS = (
+    "show_votes_public",
+    "day_timer_sec",
+    "knight_self_guard",
+    "knight_consecutive_guard",
+    "allow_no_kill",
+    "wolf_vote_lvl1_point",
+    "wolf_vote_lvl2_point",
+    "wolf_vote_lvl3_point",
+)
+
+# SSE 接続を維持するためのコメント送信間隔（秒）
+SSE_KEEPALIVE_SEC = 15
+# long-poll（GET /{game_id}?wait_for_version=N）の待ち時間（秒）
+LONG_POLL_DEFAULT_SEC = 25
+LONG_POLL_MAX_SEC = 60
+
+
+def _game_state_event(game: Game, db: Session) -> dict:
+    """
+    SSE で配信するゲーム状態のスナップショット。
+    フェーズ遷移・投票進捗の検知に必要な最小限の項目だけを含める。
+    """
+    alive_ids = [
+        mid
+        for (mid,) in (
+            db.query(GameMember.id)
+            .filter(GameMember.game_id == game.id, GameMember.alive == True)
+            .order_by(GameMember.order_no.asc())
+            .all()
+        )
+    ]
+    return {
+        "type": "game_state",
+        "game_id": game.id,
+        "status": game.status,
+        "curr_day": game.curr_day,
+        "curr_night": game.curr_night,
+        "vote_round": int(getattr(game, "vote_round", 0) or 0),
+        "version": int(game.version or 0),
+        "alive_ids": alive_ids,
+    }
+
+
+def _publish_game_state(game: Game, db: Session) -> None:
+    """
+    commit 後に呼ぶ。購読者がいなければ DB を読まずに終わる。
+    （commit で expire された game.id に触ると再読込になるので、id は identity から取る）
+    """
+    topic = game_topic(sa_inspect(game).identity[0])
+    if not hub.subscriber_count(topic):
+        return
+    hub.publish(topic, _game_state_event(game, db))
+
+
+def _require_game_engine(game_id: str, db: Session) -> GameEngine:
+    """状態取得 API 用。GameEngine（メモリ上のスナップショット）を返す。無ければ 404。"""
+    engine = get_game_engine(db, game_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return engine
+
+
+def _commit_action(
+    db: Session,
+    game: Game,
+    action: str | None = None,
+    *actor_ids: str,
+    events: list[tuple[str, dict]] = (),
+) -> None:
+    """
+    version を進めて commit する。action（game_engine.ACTION_*）を渡すと、
+    この transaction で確定した version とともに GameEngine へ差分（行動した actor_ids）を反映する。
+    events（(game_log.EVENT_*, payload) の列）は同じ transaction でイベントログに追記する。
+    """
+    # 最初の INSERT/UPDATE から commit までは DB の書き込みロックを握るので、その間に SELECT を挟まない。
+    # イベントは games の行を更新した後に INSERT する（同じゲームのイベントの id 順が commit 順になる）
+    game_id = game.id
+    if db.is_modified(game):
+        # フェーズ遷移など games の列も変わる: version の +1 は同じ UPDATE に載せ、
+        # イベントの version は INSERT の中で games から読む
+        bump_version(game)
+        db.flush()
+        game_log.append(db, game_id, _current_version(game_id), events)
+        db.commit()
+        # 確定した version は読み直さないと分からないので、GameEngine は次の読み取りで組み立て直す
+        if action is not None:
+            game_engine.discard(game_id)
+        return
+    # 行動の行を先に flush し、version は UPDATE ... RETURNING で受け取る
+    db.flush()
+    version = bump_version_returning(db, game)
+    game_log.append(db, game_id, version, events)
+    db.commit()
+    if action is not None:
+        record_action(game_id, version, action, *actor_ids)
+
+
+def _current_version(game_id: str):
+    """INSERT の値に埋め込む games.version（同じ transaction で進めた後の値）。"""
+    return select(Game.version).where(Game.id == game_id).scalar_subquery()
+
+
+def _commit_upsert(
+    db: Session,
+    game: Game,
+    upsert,
+    action: str | None = None,
+    *actor_ids: str,
+    events: list[tuple[str, dict]] = (),
+):
+    """
+    upsert() で投票行を作成/更新し、version を進めて commit する。
+    同じ投票者の同時リクエストが先に INSERT して一意インデックスに当たった場合は、
+    rollback してもう一度 upsert()（今度は既存行の UPDATE になる）する。
+    """
+    try:
+        row = upsert()
+        _commit_action(db, game, action, *actor_ids, events=events)
+    except IntegrityError:
+        db.rollback()
+        row = upsert()
+        _commit_action(db, game, action, *actor_ids, events=events)
+    return row
+
+
+def _members_by_id(db: Session, game_id: str) -> dict[str, GameMember]:
+    """ゲームの全メンバーを1クエリで読み、id で引けるようにする（一括処理用）。"""
+    return {
+        gm.id: gm
+        for gm in db.query(GameMember).filter(GameMember.game_id == game_id).all()
+    }
 
 
 def _fetch_unique_game_members(game_id: str, db: Session) -> list[GameMember]:
@@ -92,10 +247,22 @@ def _fetch_unique_game_members(game_id: str, db: Session) -> list[GameMember]:
     return unique_members
 
 
-def _assign_roles_to_members(members: list[GameMember]) -> None:
+def _draw_seed(game: Game, *key) -> tuple[int, list]:
+    """
+    game の乱択1回ぶんの (seed, draw_key) を返す（app/game_log.py の draw_seed）。
+    seed を持たない古いゲームにはここで付ける（commit は呼び出し側）。
+    """
+    if game.rng_seed is None:
+        game.rng_seed = game_log.new_seed()
+    return game_log.draw_seed(game.rng_seed, *key), list(key)
+
+
+def _assign_roles_to_members(game: Game, members: list[GameMember]) -> dict:
     """
     GameMember 一覧に対して乱択した役職・陣営をセットする。
-    members は既にユニーク化されている前提。
+    members は既にユニーク化（order_no 順）されている前提。
+    配り直しで結果が変わるように、key には配布時点の game.version を入れる。
+    イベントログ用の payload（seed と配布結果）を返す。
     """
     n = len(members)
     if n < 6:
@@ -105,12 +272,18 @@ def _assign_roles_to_members(members: list[GameMember]) -> None:
     if len(roles) != n:
         raise HTTPException(status_code=500, detail="Role assignment mismatch")
 
-    shuffled_members = members[:]
-    random.shuffle(shuffled_members)
+    seed, draw_key = _draw_seed(game, "roles", game.version)
+    shuffled_members = game_log.shuffled(seed, members)
 
     for gm, (role_type, team) in zip(shuffled_members, roles):
         gm.role_type = role_type
         gm.team = team
+    return {
+        "seed": seed,
+        "draw_key": draw_key,
+        "order": [gm.id for gm in shuffled_members],
+        "roles": [list(role) for role in roles],
+    }
 
 
 # -----------------------------
@@ -140,14 +313,17 @@ def create_game(
         id=str(uuid.uuid4()),
         room_id=room.id,
         status="WAITING",   # 初期ステータスは他ロジックと揃えて大文字で管理
+        rng_seed=payload.seed if payload.seed is not None else game_log.new_seed(),
     )
     db.add(game)
     db.flush()             # game.id を使うので flush しておく
 
     room.current_game_id = game.id
+    bump_version(room)
     db.add(room) 
 
     # RoomMember から GameMember を作成
+    created_members = []
     for i, rm in enumerate(room_members, start=1):
         gm = GameMember(
             id=str(uuid.uuid4()),
@@ -161,10 +337,23 @@ def create_game(
             order_no=i,         # ★ ここがポイント：order_in_room ではなく order_no
         )
         db.add(gm)
-
+        created_members.append(gm)
+
+    game_log.append(db, game.id, game.version, [(game_log.EVENT_GAME_CREATED, {
+        "room_id": room.id,
+        "settings": {key: getattr(game, key) for key in GAME_SETTING_KEYS},
+        "members": [
+            {
+                "id": gm.id,
+                "room_member_id": gm.room_member_id,
+                "display_name": gm.display_name,
+                "order_no": gm.order_no,
+            }
+            for gm in created_members
+        ],
+    })])
     db.commit()
-    db.refresh(game)
-    db.refresh(room)
+    publish_room_event(room.id, "current_game_changed", current_game_id=game.id)
     return game
 
 
@@ -189,15 +378,16 @@ def assign_roles(
     if not members:
         raise HTTPException(status_code=400, detail="No members in game")
 
-    _assign_roles_to_members(members)
+    assigned = _assign_roles_to_members(game, members)
+    _set_alive_counts(game, [gm for gm in members if gm.alive])
 
     game.status = "ROLE_ASSIGN"
-    db.add(game)
-    db.commit()
-
-    for gm in members:
-        db.refresh(gm)
+    _commit_action(db, game, events=[
+        (game_log.EVENT_ROLES_ASSIGNED, {**assigned, "status": game.status}),
+    ])
+    _publish_game_state(game, db)
 
+    # expire_on_commit=False なので、commit 後もそのまま返せる（読み直さない）
     return [GameMemberOut.model_validate(gm) for gm in members]
 
 # -----------------------------
@@ -218,9 +408,16 @@ def debug_set_status(
         raise HTTPException(status_code=404, detail="Game not found")
 
     game.status = status
-    db.add(game)
-    db.commit()
-    db.refresh(game)
+    if status == "NIGHT":
+        # 当夜をやり直せるように、確定済みの結果を消す
+        db.query(NightOutcome).filter(
+            NightOutcome.game_id == game_id,
+            NightOutcome.night_no == game.curr_night,
+        ).delete(synchronize_session=False)
+    _commit_action(db, game, events=[(game_log.EVENT_STATUS_FORCED, {"status": status})])
+    if status == "NIGHT":
+        night_outcome.discard(game_id)
+    _publish_game_state(game, db)
     return {"game_id": game.id, "status": game.status}
 
 
@@ -229,6 +426,8 @@ def debug_set_status(
 @router.get("/{game_id}/day_timer")
 def get_day_timer(
     game_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db_dep),
 ):
     """
@@ -243,16 +442,23 @@ def get_day_timer(
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
-
-    # 生存しているメンバー数をカウント
-    alive_count = (
-        db.query(func.count(GameMember.id))
-        .filter(
-            GameMember.game_id == game_id,
-            GameMember.alive == True,
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
+
+    # 生存しているメンバー数（カウンタがあればメンバーは数えない）
+    counts = _stored_alive_counts(game)
+    if counts is not None:
+        alive_count = sum(counts)
+    else:
+        alive_count = (
+            db.query(func.count(GameMember.id))
+            .filter(
+                GameMember.game_id == game_id,
+                GameMember.alive == True,
+            )
+            .scalar()
         )
-        .scalar()
-    )
 
     base = game.day_timer_sec  # 基本値（例: 300秒）
 
@@ -277,16 +483,200 @@ def get_day_timer(
 # 🔍 ゲーム情報取得
 # -----------------------------
 @router.get("/{game_id}", response_model=GameOut)
-def get_game(
+async def get_game(
     game_id: str,
-    db: Session = Depends(get_db_dep),
+    request: Request,
+    response: Response,
+    wait_for_version: Optional[int] = None,
+    timeout: float = Query(LONG_POLL_DEFAULT_SEC, ge=0, le=LONG_POLL_MAX_SEC),
 ):
-    game = db.get(Game, game_id)
-    if not game:
+    """
+    ゲーム情報を返す。
+    wait_for_version を指定すると、version がその値から変わるまで（最大 timeout 秒）待ってから返す。
+    SSE を張れないクライアント向けの long-poll で、待機中は DB セッションもスレッドプールも占有しない。
+    """
+    if wait_for_version is None:
+        game = await _load_game_out(game_id)
+    else:
+        game = await _wait_game_version(game_id, wait_for_version, timeout)
+    if game is None:
         raise HTTPException(status_code=404, detail="Game not found")
+    # version が変わっていなければ 304（Game 1行を読むだけで済む）
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
     return game
 
 
+async def _load_game_out(game_id: str) -> GameOut | None:
+    """Game を短命セッションで読む（long-poll の待機中にセッションを保持しない）。"""
+    async with AsyncSessionLocal() as db:
+        game = await db.get(Game, game_id)
+        return GameOut.model_validate(game) if game else None
+
+
+async def _load_game_version(game_id: str) -> int | None:
+    """Game.version だけを短命セッションで読む（ゲームが無ければ None）。"""
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(Game.version).where(Game.id == game_id))
+
+
+async def _wait_game_version(game_id: str, version: int, timeout: float) -> GameOut | None:
+    """
+    Game.version が version から変わるか timeout 秒経つまで待つ。
+    購読を張ってから読むので、その間の更新も取りこぼさない。
+    イベントは起床の合図としてだけ使い、中身は毎回 DB から読み直す。
+    別のワーカーでの更新はイベントが届かないので、WAIT_RECHECK_SEC ごとに version を読み直して拾う。
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    async with hub.subscription(game_topic(game_id)) as queue:
+        game = await _load_game_out(game_id)
+        while game is not None and game.version == version:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(queue.get(), timeout=min(remaining, WAIT_RECHECK_SEC))
+            except asyncio.TimeoutError:
+                if await _load_game_version(game_id) == version:
+                    continue
+            game = await _load_game_out(game_id)
+    return game
+
+
+def _load_game_state_event(game_id: str) -> dict | None:
+    """SSE 用のスナップショットを短命セッションで読む（ストリーム中にセッションを保持しない）。"""
+    db = SessionLocal()
+    try:
+        game = db.get(Game, game_id)
+        if not game:
+            return None
+        return _game_state_event(game, db)
+    finally:
+        db.close()
+
+
+def _format_sse(event: dict) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+async def _game_event_stream(request: Request, game_id: str):
+    """
+    購読を先に張ってから現在の状態を送る（その間の変更を取りこぼさないため）。
+    以後は publish されたイベントを順に流し、無通信時は keep-alive コメントを送る。
+    別のワーカーでの更新はイベントが届かないので、WAIT_RECHECK_SEC ごとに version を読み直し、
+    送った version から変わっていればスナップショットを送り直す。ゲームが消えたら終わる。
+    """
+    loop = asyncio.get_running_loop()
+    async with hub.subscription(game_topic(game_id)) as queue:
+        snapshot = await run_in_threadpool(_load_game_state_event, game_id)
+        if snapshot is None:
+            return
+        yield _format_sse(snapshot)
+        sent_version = snapshot["version"]
+        last_sent = loop.time()
+
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=WAIT_RECHECK_SEC)
+            except asyncio.TimeoutError:
+                current = await _load_game_version(game_id)
+                if current is None:
+                    return
+                if current == sent_version:
+                    if loop.time() - last_sent >= SSE_KEEPALIVE_SEC:
+                        yield ": keep-alive\n\n"
+                        last_sent = loop.time()
+                    continue
+                event = await run_in_threadpool(_load_game_state_event, game_id)
+                if event is None:
+                    return
+            sent_version = max(sent_version, event.get("version", sent_version))
+            yield _format_sse(event)
+            last_sent = loop.time()
+
+
+@router.get("/{game_id}/events")
+async def game_events(
+    game_id: str,
+    request: Request,
+):
+    """
+    ゲーム状態の変化を Server-Sent Events で配信する。
+    - 接続直後に現在の状態を1件送る
+    - start / 投票 / 夜行動 / resolve_day_simple / resolve_night_simple の commit 後に
+      status, curr_day, curr_night, vote_round, alive_ids を送る
+    """
+    if await run_in_threadpool(_load_game_state_event, game_id) is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    return StreamingResponse(
+        _game_event_stream(request, game_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/{game_id}/log", response_model=GameLogOut)
+def get_game_log(
+    game_id: str,
+    after_id: int = 0,
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db_dep),
+):
+    """
+    イベントログを発生順に返す（app/game_log.py）。
+    途中参加の観戦者・終局後の振り返りは after_id=0 から読み、
+    以降は next_after_id を after_id に渡して差分だけ読む。
+    """
+    if db.get(Game, game_id) is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    events = game_log.load_events(db, game_id, after_id=after_id, limit=limit)
+    return GameLogOut(
+        game_id=game_id,
+        events=[
+            GameEventOut(
+                id=e.id,
+                version=e.version,
+                type=e.type,
+                payload=game_log.public_payload(e),
+                created_at=e.created_at,
+            )
+            for e in events
+        ],
+        next_after_id=events[-1].id if events else after_id,
+    )
+
+
+@router.get("/{game_id}/replay", response_model=ReplayStateOut)
+def replay_game(
+    game_id: str,
+    offset: int | None = Query(None, ge=1),
+    db: Session = Depends(get_db_dep),
+):
+    """
+    イベントログを先頭から offset 件（省略時は全部）再生したゲームの状態を返す。
+    乱択は記録した seed で引き直して突き合わせ、食い違えば 500。
+    """
+    try:
+        state = game_log.replay_game(db, game_id, offset=offset)
+    except game_log.ReplayError as exc:
+        raise HTTPException(status_code=500, detail=f"Replay diverged from the log: {exc}")
+    if state is None:
+        raise HTTPException(status_code=404, detail="Game log not found")
+
+    return ReplayStateOut.model_validate({
+        **asdict(state),
+        "members": [asdict(m) for m in state.ordered_members()],
+    })
+
+
 @router.post("/{game_id}/start", response_model=GameOut)
 def start_game(
     game_id: str,
@@ -320,6 +710,9 @@ def start_game(
         db.query(RoomMember).filter(
             RoomMember.id == requester.room_member_id,
         ).update({RoomMember.is_host: True})
+        room = db.get(Room, game.room_id)
+        if room:
+            bump_version(room)
         db.flush()
 
     # ★ ここから追加（司会チェック）
@@ -350,9 +743,11 @@ def start_game(
         m.role_type is None or m.team is None
         for m in members
     )
+    events = []
     if need_assignment:
-        _assign_roles_to_members(members)
+        events.append((game_log.EVENT_ROLES_ASSIGNED, _assign_roles_to_members(game, members)))
         db.flush()
+    _set_alive_counts(game, [m for m in members if m.alive])
 
     # --- ゲーム開始フラグ & フェーズ設定 ---
 
@@ -368,9 +763,15 @@ def start_game(
     if hasattr(game, "curr_night"):
         game.curr_night = 0
 
-    db.add(game)
-    db.commit()
-    db.refresh(game)
+    events.append((game_log.EVENT_GAME_STARTED, {
+        "started": True,
+        "status": game.status,
+        "curr_day": game.curr_day,
+        "curr_night": game.curr_night,
+    }))
+    _commit_action(db, game, events=events)
+    _publish_game_state(game, db)
+    publish_room_event(game.room_id, "game_started", game_id=game.id)
     return game
 
 
@@ -381,21 +782,9 @@ def start_game(
 # -----------------------------
 # 🐺 夜の人狼投票
 # -----------------------------
-@router.post("/{game_id}/wolves/vote", response_model=WolfVoteOut)
-def wolf_vote(
-    game_id: str,
-    data: WolfVoteCreate,
-    db: Session = Depends(get_db_dep),
-):
-    game = db.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
-    if game.status != "NIGHT":
-        raise HTTPException(status_code=400, detail="Game is not in NIGHT phase")
-
+def _check_wolf_vote(game_id: str, wolf: GameMember | None, target: GameMember | None) -> None:
+    """人狼投票のルール（単発・一括で共通）。違反なら HTTPException。"""
     # 人狼本人の GameMember を確認
-    wolf = db.get(GameMember, data.wolf_member_id)
     if not wolf or wolf.game_id != game_id:
         raise HTTPException(status_code=404, detail="Wolf member not found")
 
@@ -407,7 +796,6 @@ def wolf_vote(
         raise HTTPException(status_code=400, detail="Dead wolf cannot vote")
 
     # ターゲットの GameMember を確認
-    target = db.get(GameMember, data.target_member_id)
     if not target or target.game_id != game_id:
         raise HTTPException(status_code=404, detail="Target member not found")
 
@@ -422,33 +810,61 @@ def wolf_vote(
     if target.role_type == "WEREWOLF":
         raise HTTPException(status_code=400, detail="Wolf cannot target other werewolves")
 
-    # priority_level → ポイント値
-    if data.priority_level == 1:
-        pts = game.wolf_vote_lvl1_point
-    elif data.priority_level == 2:
-        pts = game.wolf_vote_lvl2_point
+
+def _wolf_vote_points(game: Game, priority_level: int) -> int:
+    """priority_level → ポイント値"""
+    if priority_level == 1:
+        return game.wolf_vote_lvl1_point
+    elif priority_level == 2:
+        return game.wolf_vote_lvl2_point
     else:
-        pts = game.wolf_vote_lvl3_point
+        return game.wolf_vote_lvl3_point
+
+
+@router.post("/{game_id}/wolves/vote", response_model=WolfVoteOut)
+async def wolf_vote(
+    game_id: str,
+    data: WolfVoteCreate,
+    db: AsyncSession = Depends(get_async_db_dep),
+):
+    return await run_sync_db(db, _wolf_vote, game_id, data)
+
+
+def _wolf_vote(
+    game_id: str,
+    data: WolfVoteCreate,
+    db: Session,
+):
+    game = db.get(Game, game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    if game.status != "NIGHT":
+        raise HTTPException(status_code=400, detail="Game is not in NIGHT phase")
+
+    wolf = db.get(GameMember, data.wolf_member_id)
+    target = db.get(GameMember, data.target_member_id)
+    _check_wolf_vote(game_id, wolf, target)
+    pts = _wolf_vote_points(game, data.priority_level)
 
     night_no = game.curr_night
 
-    # 既存投票があれば上書き（UPSERT的挙動）
-    existing: WolfVote | None = (
-        db.query(WolfVote)
-        .filter(
-            WolfVote.game_id == game_id,
-            WolfVote.night_no == night_no,
-            WolfVote.wolf_member_id == wolf.id,
+    def upsert() -> WolfVote:
+        # 既存投票があれば上書き（UPSERT的挙動）
+        existing: WolfVote | None = (
+            db.query(WolfVote)
+            .filter(
+                WolfVote.game_id == game_id,
+                WolfVote.night_no == night_no,
+                WolfVote.wolf_member_id == wolf.id,
+            )
+            .one_or_none()
         )
-        .one_or_none()
-    )
-
-    if existing:
-        existing.target_member_id = target.id
-        existing.priority_level = data.priority_level
-        existing.points_at_vote = pts
-        vote = existing
-    else:
+        if existing:
+            existing.target_member_id = target.id
+            existing.priority_level = data.priority_level
+            existing.points_at_vote = pts
+            return existing
         vote = WolfVote(
             id=str(uuid.uuid4()),
             game_id=game_id,
@@ -459,39 +875,144 @@ def wolf_vote(
             points_at_vote=pts,
         )
         db.add(vote)
+        return vote
 
-    db.commit()
-    db.refresh(vote)
+    event = (game_log.EVENT_WOLF_VOTE, {
+        "night_no": night_no,
+        "votes": {
+            wolf.id: {"target_member_id": target.id, "priority_level": data.priority_level, "points": pts},
+        },
+    })
+    vote = _commit_upsert(db, game, upsert, game_engine.ACTION_WOLF_VOTE, wolf.id, events=[event])
+    _publish_game_state(game, db)
     return WolfVoteOut.model_validate(vote, from_attributes=True)
 
 
-@router.post("/{game_id}/day_vote", response_model=DayVoteOut)
-def day_vote(
+@router.post("/{game_id}/wolves/votes:batch", response_model=WolfVoteBatchOut)
+async def wolf_votes_batch(
     game_id: str,
-    data: DayVoteCreate,
-    db: Session = Depends(get_db_dep),
+    data: WolfVoteBatchCreate,
+    db: AsyncSession = Depends(get_async_db_dep),
 ):
     """
-    昼の投票（シンプル版）:
-    - ゲームが DAY_DISCUSSION 状態のときのみ有効
-    - 生存しているプレイヤーだけ投票可能
-    - ターゲットも生存しているプレイヤーのみ
-    - 同じ voter が再投票した場合は上書き
+    人狼投票の一括登録（1台の端末で全員分を入力する卓向け）:
+    - 1件ずつ /wolves/vote と同じルールで検証し、通らなかったものは results[].error に理由を返す
+    - 通ったものはまとめて upsert し、1回の commit で反映する（同じ wolf が複数あれば後勝ちで、
+      前の件は results[].error に 409 を返す）
+    - ゲームが無い / NIGHT でない場合は全体を 404 / 400 にする
     """
+    return await run_sync_db(db, _wolf_votes_batch, game_id, data)
+
+
+def _accept_batch_item(
+    accepted_at: dict[str, int],
+    errors: dict[int, VoteBatchItemError],
+    actor_id: str,
+    index: int,
+) -> None:
+    """actor_id の index 件目を受け付ける。同じ actor の前の件は上書きされたものとしてエラーにする（後勝ち）。"""
+    previous = accepted_at.get(actor_id)
+    if previous is not None:
+        errors[previous] = VoteBatchItemError(status_code=409, detail=f"Superseded by index {index}")
+    accepted_at[actor_id] = index
+
+
+def _wolf_votes_batch(
+    game_id: str,
+    data: WolfVoteBatchCreate,
+    db: Session,
+) -> WolfVoteBatchOut:
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    if game.status != "DAY_DISCUSSION":
-        raise HTTPException(status_code=400, detail="Game is not in DAY_DISCUSSION phase")
+    if game.status != "NIGHT":
+        raise HTTPException(status_code=400, detail="Game is not in NIGHT phase")
 
-    voter = db.get(GameMember, data.voter_member_id)
+    night_no = game.curr_night
+    members = _members_by_id(db, game_id)
+
+    errors: dict[int, VoteBatchItemError] = {}
+    accepted: dict[str, WolfVoteCreate] = {}
+    accepted_at: dict[str, int] = {}
+    for index, item in enumerate(data.votes):
+        try:
+            _check_wolf_vote(
+                game_id, members.get(item.wolf_member_id), members.get(item.target_member_id)
+            )
+        except HTTPException as exc:
+            errors[index] = VoteBatchItemError(status_code=exc.status_code, detail=exc.detail)
+            continue
+        _accept_batch_item(accepted_at, errors, item.wolf_member_id, index)
+        accepted[item.wolf_member_id] = item
+
+    def upsert() -> dict[str, WolfVoteOut]:
+        existing = {
+            v.wolf_member_id: v
+            for v in db.query(WolfVote).filter(
+                WolfVote.game_id == game_id,
+                WolfVote.night_no == night_no,
+                WolfVote.wolf_member_id.in_(list(accepted)),
+            )
+        }
+        out = {}
+        for wolf_id, item in accepted.items():
+            vote = existing.get(wolf_id)
+            if vote is None:
+                vote = WolfVote(id=str(uuid.uuid4()), game_id=game_id, night_no=night_no, wolf_member_id=wolf_id)
+                db.add(vote)
+            vote.target_member_id = item.target_member_id
+            vote.priority_level = item.priority_level
+            vote.points_at_vote = _wolf_vote_points(game, item.priority_level)
+            # commit で expire される前に値を取っておく（1件ずつ refresh しない）
+            out[wolf_id] = WolfVoteOut.model_validate(vote)
+        return out
+
+    votes: dict[str, WolfVoteOut] = {}
+    if accepted:
+        event = (game_log.EVENT_WOLF_VOTE, {
+            "night_no": night_no,
+            "votes": {
+                wolf_id: {
+                    "target_member_id": item.target_member_id,
+                    "priority_level": item.priority_level,
+                    "points": _wolf_vote_points(game, item.priority_level),
+                }
+                for wolf_id, item in accepted.items()
+            },
+        })
+        votes = _commit_upsert(db, game, upsert, game_engine.ACTION_WOLF_VOTE, *accepted, events=[event])
+        _publish_game_state(game, db)
+
+    return WolfVoteBatchOut(
+        game_id=game_id,
+        night_no=night_no,
+        accepted=len(accepted),
+        rejected=len(errors),
+        results=[
+            WolfVoteBatchItemOut(
+                index=index,
+                wolf_member_id=item.wolf_member_id,
+                vote=votes.get(item.wolf_member_id) if accepted_at.get(item.wolf_member_id) == index else None,
+                error=errors.get(index),
+            )
+            for index, item in enumerate(data.votes)
+        ],
+    )
+
+
+def _check_day_vote(
+    game_id: str,
+    voter: GameMember | None,
+    target: GameMember | None,
+    candidate_ids: list[str],
+) -> None:
+    """昼投票のルール（単発・一括で共通）。candidate_ids は決選投票中の候補（無ければ空）。"""
     if not voter or voter.game_id != game_id:
         raise HTTPException(status_code=404, detail="Voter member not found")
     if not voter.alive:
         raise HTTPException(status_code=400, detail="Dead player cannot vote")
 
-    target = db.get(GameMember, data.target_member_id)
     if not target or target.game_id != game_id:
         raise HTTPException(status_code=404, detail="Target member not found")
     if not target.alive:
@@ -503,28 +1024,58 @@ def day_vote(
     if voter.role_type == "WEREWOLF" and target.role_type == "WEREWOLF":
         raise HTTPException(status_code=400, detail="Werewolf cannot vote for another werewolf")
 
+    if candidate_ids and target.id not in candidate_ids:
+        raise HTTPException(status_code=400, detail="Target is not in runoff candidates")
+
+
+@router.post("/{game_id}/day_vote", response_model=DayVoteOut)
+async def day_vote(
+    game_id: str,
+    data: DayVoteCreate,
+    db: AsyncSession = Depends(get_async_db_dep),
+):
+    """
+    昼の投票（シンプル版）:
+    - ゲームが DAY_DISCUSSION 状態のときのみ有効
+    - 生存しているプレイヤーだけ投票可能
+    - ターゲットも生存しているプレイヤーのみ
+    - 同じ voter が再投票した場合は上書き
+    """
+    return await run_sync_db(db, _day_vote, game_id, data)
+
+
+def _day_vote(
+    game_id: str,
+    data: DayVoteCreate,
+    db: Session,
+):
+    game = db.get(Game, game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    if game.status != "DAY_DISCUSSION":
+        raise HTTPException(status_code=400, detail="Game is not in DAY_DISCUSSION phase")
+
+    voter = db.get(GameMember, data.voter_member_id)
+    target = db.get(GameMember, data.target_member_id)
     day_no = game.curr_day
-    runoff = _RUNOFF_STATE.get(game_id)
-    if runoff and runoff.get("day_no") == day_no:
-        candidate_ids = runoff.get("candidate_ids") or []
-        if candidate_ids and target.id not in candidate_ids:
-            raise HTTPException(status_code=400, detail="Target is not in runoff candidates")
-
-    # 既存投票があれば上書き
-    existing: DayVote | None = (
-        db.query(DayVote)
-        .filter(
-            DayVote.game_id == game_id,
-            DayVote.day_no == day_no,
-            DayVote.voter_member_id == voter.id,
-        )
-        .one_or_none()
-    )
+    _, candidate_ids = _runoff_candidates(db, game_id, day_no)
+    _check_day_vote(game_id, voter, target, candidate_ids)
 
-    if existing:
-        existing.target_member_id = target.id
-        vote = existing
-    else:
+    def upsert() -> DayVote:
+        # 既存投票があれば上書き
+        existing: DayVote | None = (
+            db.query(DayVote)
+            .filter(
+                DayVote.game_id == game_id,
+                DayVote.day_no == day_no,
+                DayVote.voter_member_id == voter.id,
+            )
+            .one_or_none()
+        )
+        if existing:
+            existing.target_member_id = target.id
+            return existing
         vote = DayVote(
             id=str(uuid.uuid4()),
             game_id=game_id,
@@ -533,40 +1084,213 @@ def day_vote(
             target_member_id=target.id,
         )
         db.add(vote)
+        return vote
 
-    db.commit()
-    db.refresh(vote)
+    event = (game_log.EVENT_DAY_VOTE, {"day_no": day_no, "votes": {voter.id: target.id}})
+    vote = _commit_upsert(db, game, upsert, game_engine.ACTION_DAY_VOTE, voter.id, events=[event])
+    _publish_game_state(game, db)
     return DayVoteOut.model_validate(vote)
 
 
+@router.post("/{game_id}/day_votes:batch", response_model=DayVoteBatchOut)
+async def day_votes_batch(
+    game_id: str,
+    data: DayVoteBatchCreate,
+    db: AsyncSession = Depends(get_async_db_dep),
+):
+    """
+    昼投票の一括登録（ホスト端末で全員分を入力する卓向け）:
+    - 1件ずつ /day_vote と同じルール（決選投票の候補・人狼同士の投票禁止を含む）で検証し、
+      通らなかったものは results[].error に理由を返す
+    - 通ったものはまとめて upsert し、1回の commit で反映する（同じ voter が複数あれば後勝ちで、
+      前の件は results[].error に 409 を返す）
+    - ゲームが無い / DAY_DISCUSSION でない場合は全体を 404 / 400 にする
+    """
+    return await run_sync_db(db, _day_votes_batch, game_id, data)
+
+
+def _day_votes_batch(
+    game_id: str,
+    data: DayVoteBatchCreate,
+    db: Session,
+) -> DayVoteBatchOut:
+    game = db.get(Game, game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    if game.status != "DAY_DISCUSSION":
+        raise HTTPException(status_code=400, detail="Game is not in DAY_DISCUSSION phase")
+
+    day_no = game.curr_day
+    members = _members_by_id(db, game_id)
+    _, candidate_ids = _runoff_candidates(db, game_id, day_no)
+
+    errors: dict[int, VoteBatchItemError] = {}
+    accepted: dict[str, str] = {}
+    accepted_at: dict[str, int] = {}
+    for index, item in enumerate(data.votes):
+        try:
+            _check_day_vote(
+                game_id,
+                members.get(item.voter_member_id),
+                members.get(item.target_member_id),
+                candidate_ids,
+            )
+        except HTTPException as exc:
+            errors[index] = VoteBatchItemError(status_code=exc.status_code, detail=exc.detail)
+            continue
+        _accept_batch_item(accepted_at, errors, item.voter_member_id, index)
+        accepted[item.voter_member_id] = item.target_member_id
+
+    def upsert() -> dict[str, DayVoteOut]:
+        existing = {
+            v.voter_member_id: v
+            for v in db.query(DayVote).filter(
+                DayVote.game_id == game_id,
+                DayVote.day_no == day_no,
+                DayVote.voter_member_id.in_(list(accepted)),
+            )
+        }
+        out = {}
+        for voter_id, target_id in accepted.items():
+            vote = existing.get(voter_id)
+            if vote is None:
+                vote = DayVote(id=str(uuid.uuid4()), game_id=game_id, day_no=day_no, voter_member_id=voter_id)
+                db.add(vote)
+            vote.target_member_id = target_id
+            # commit で expire される前に値を取っておく（1件ずつ refresh しない）
+            out[voter_id] = DayVoteOut.model_validate(vote)
+        return out
+
+    votes: dict[str, DayVoteOut] = {}
+    if accepted:
+        event = (game_log.EVENT_DAY_VOTE, {"day_no": day_no, "votes": dict(accepted)})
+        votes = _commit_upsert(db, game, upsert, game_engine.ACTION_DAY_VOTE, *accepted, events=[event])
+        _publish_game_state(game, db)
+
+    return DayVoteBatchOut(
+        game_id=game_id,
+        day_no=day_no,
+        accepted=len(accepted),
+        rejected=len(errors),
+        results=[
+            DayVoteBatchItemOut(
+                index=index,
+                voter_member_id=item.voter_member_id,
+                vote=votes.get(item.voter_member_id) if accepted_at.get(item.voter_member_id) == index else None,
+                error=errors.get(index),
+            )
+            for index, item in enumerate(data.votes)
+        ],
+    )
+
+
 def _judge_game_result(game_id: str, db: Session) -> dict:
     """
-    生存メンバーから勝敗を判定するヘルパー関数。
+    勝敗を判定するヘルパー関数。
     戻り値は dict で result / wolf_alive / village_alive / reason を含む。
+    Game の生存者数カウンタがあればそれだけで判定し（メンバーは読まない）、
+    未初期化ならメンバーから数え直してカウンタも埋める（commit は呼び出し側）。
     """
-    alive_members = (
-        db.query(GameMember)
+    game = db.get(Game, game_id)
+    counts = _stored_alive_counts(game) if game else None
+    if counts is not None:
+        if config.CHECK_ALIVE_COUNTS:
+            _check_alive_counts(db, game, counts)
+        return _judge_counts(*counts)
+
+    alive_members = _load_alive_members(db, game_id)
+    if game is not None:
+        _set_alive_counts(game, alive_members)
+    return _judge_alive_members(alive_members)
+
+
+def _load_alive_members(db: Session, game_id: str) -> list:
+    return (
+        db.query(GameMember.role_type, GameMember.team)
         .filter(GameMember.game_id == game_id, GameMember.alive == True)
         .all()
     )
 
-    # 勝敗判定の「狼人数」は実狼（WEREWOLF）のみを数える。
-    # MADMAN は狼陣営(team=WOLF)だが、頭数には含めない。
-    wolf_count = sum(1 for m in alive_members if (m.role_type or "").upper() == "WEREWOLF")
-    village_count = len(alive_members) - wolf_count
-    # 役職未割り当て状態（team=None 等）では勝敗確定させない
-    pending_assignment = any(
-        (m.team or "").upper() not in ("WOLF", "VILLAGE") for m in alive_members
-    )
 
-    if pending_assignment:
+def _count_alive(alive_members) -> tuple[int, int] | None:
+    """
+    生存メンバーから (人狼数, それ以外の数) を数える。
+    役職未割り当て（team=None 等）のメンバーが居れば None（勝敗を確定させない）。
+    """
+    if any((m.team or "").upper() not in ("WOLF", "VILLAGE") for m in alive_members):
+        return None
+    # 勝敗判定の「狼人数」は実狼（WEREWOLF）のみを数える。
+    # MADMAN は狼陣営(team=WOLF)だが、頭数には含めない。
+    wolf_count = sum(1 for m in alive_members if (m.role_type or "").upper() == "WEREWOLF")
+    return wolf_count, len(alive_members) - wolf_count
+
+
+def _stored_alive_counts(game: Game) -> tuple[int, int] | None:
+    """Game の生存者数カウンタ。未初期化（NULL）なら None。"""
+    wolves, villagers = game.alive_wolf_count, game.alive_village_count
+    if not isinstance(wolves, int) or not isinstance(villagers, int):
+        return None
+    return wolves, villagers
+
+
+def _set_alive_counts(game: Game, alive_members) -> None:
+    """生存メンバーからカウンタを設定し直す（役職配布時・未初期化のゲームの初回判定時）。"""
+    game.alive_wolf_count, game.alive_village_count = _count_alive(alive_members) or (None, None)
+
+
+def _record_death(game: Game, role_type: str | None) -> tuple[int, int] | None:
+    """
+    メンバー1人の alive を False にしたときに呼ぶ。
+    カウンタを SQL 式（UPDATE ... SET alive_wolf_count = alive_wolf_count - 1）で減らし、
+    減らした後の (人狼数, それ以外の数) を返す。未初期化なら None。
+    """
+    counts = _stored_alive_counts(game)
+    if (role_type or "").upper() == "WEREWOLF":
+        game.alive_wolf_count = Game.alive_wolf_count - 1
+    else:
+        game.alive_village_count = Game.alive_village_count - 1
+    if counts is None:
+        return None
+    wolves, villagers = counts
+    if (role_type or "").upper() == "WEREWOLF":
+        return wolves - 1, villagers
+    return wolves, villagers - 1
+
+
+def _check_alive_counts(db: Session, game: Game, counts: tuple[int, int]) -> None:
+    """
+    JINROU_CHECK_ALIVE_COUNTS 用。メンバーから数え直してカウンタと突き合わせる。
+    counts は判定に使う値（未 flush の減算を含む）。
+    """
+    db.flush()
+    actual = _count_alive(_load_alive_members(db, game.id))
+    if actual != counts:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Alive counters out of sync: stored={counts}, actual={actual}",
+        )
+
+
+def _judge_alive_members(alive_members) -> dict:
+    """
+    読み込み済みの生存メンバー（GameMember / GameEngine の MemberState）から
+    勝敗を判定する（DB は読まない）。
+    """
+    counts = _count_alive(alive_members)
+    if counts is None:
+        wolf_count = sum(1 for m in alive_members if (m.role_type or "").upper() == "WEREWOLF")
         return {
             "result": "ONGOING",
             "wolf_alive": wolf_count,
-            "village_alive": village_count,
+            "village_alive": len(alive_members) - wolf_count,
             "reason": "Roles are not assigned yet.",
         }
+    return _judge_counts(*counts)
 
+
+def _judge_counts(wolf_count: int, village_count: int) -> dict:
+    """生存している人狼数・それ以外の数から勝敗を判定する。"""
     if wolf_count == 0:
         return {
             "result": "VILLAGE_WIN",
@@ -595,6 +1319,8 @@ def _judge_game_result(game_id: str, db: Session) -> dict:
 @router.get("/{game_id}/wolves/tally", response_model=WolfTallyOut)
 def wolf_tally(
     game_id: str,
+    request: Request,
+    response: Response,
     night_no: Optional[int] = None,
     db: Session = Depends(get_db_dep),
 ):
@@ -605,6 +1331,9 @@ def wolf_tally(
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
 
     if night_no is None:
         night_no = game.curr_night
@@ -641,41 +1370,45 @@ def wolf_tally(
 
 
 @router.get("/{game_id}/night_actions_status", response_model=NightActionsStatusOut)
-def night_actions_status(
+async def night_actions_status(
     game_id: str,
-    db: Session = Depends(get_db_dep),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_dep),
 ):
-    game = db.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    return await run_sync_db(db, _night_actions_status, game_id, request, response)
 
-    night_no = game.curr_night
 
-    alive_members = (
-        db.query(GameMember)
-        .filter(GameMember.game_id == game_id, GameMember.alive == True)
-        .all()
-    )
+def _night_actions_status(
+    game_id: str,
+    request: Request,
+    response: Response,
+    db: Session,
+):
+    engine = _require_game_engine(game_id, db)
+    not_modified = check_not_modified(request, response, version_etag(engine))
+    if not_modified:
+        return not_modified
+
+    return _night_actions_progress(engine)
+
+
+def _night_actions_progress(engine: GameEngine) -> NightActionsStatusOut:
+    """
+    夜行動の進捗を組み立てる。
+    完了数（狼投票 / 占い / 護衛）は GameEngine が持つ当夜の行動済み者から数える（DB は読まない）。
+    """
+    game_id = engine.id
+    night_no = engine.game.curr_night
+    alive_members = engine.alive_members
 
     wolves = [m for m in alive_members if m.role_type == "WEREWOLF"]
     seers = [m for m in alive_members if m.role_type == "SEER"]
     knights = [m for m in alive_members if m.role_type == "KNIGHT"]
 
-    wolves_done = (
-        db.query(func.count(func.distinct(WolfVote.wolf_member_id)))
-        .filter(WolfVote.game_id == game_id, WolfVote.night_no == night_no)
-        .scalar()
-    ) or 0
-    seer_done = (
-        db.query(func.count(func.distinct(SeerInspect.seer_member_id)))
-        .filter(SeerInspect.game_id == game_id, SeerInspect.night_no == night_no)
-        .scalar()
-    ) or 0
-    knight_done = (
-        db.query(func.count(func.distinct(KnightGuard.knight_member_id)))
-        .filter(KnightGuard.game_id == game_id, KnightGuard.night_no == night_no)
-        .scalar()
-    ) or 0
+    wolves_done = len(engine.wolf_voters)
+    seer_done = len(engine.seer_inspectors)
+    knight_done = len(engine.knight_guards)
 
     wolves_total = len(wolves)
     seer_total = len(seers)
@@ -700,6 +1433,93 @@ def night_actions_status(
     )
 
 
+class _NightBoardRow(NamedTuple):
+    """_load_night_board の1行（JOIN できないときに組み立てる。列は JOIN 版と同じ）"""
+    id: str
+    display_name: str
+    role_type: str | None
+    team: str | None
+    alive: bool
+    wolf_points: int | None
+    guarded: bool
+
+
+def _load_night_board(db: Session, game_id: str, night_no: int) -> list:
+    """
+    夜明け処理に必要なものを1クエリで読む。ゲームの全メンバー（order_no 順）に、
+    - wolf_points: 当夜の狼投票の合計ポイント（投票されていなければ None）
+    - guarded: 当夜に騎士が護衛しているか
+    を LEFT JOIN で付けた行のリストを返す（生存数・勝敗判定もこの行から出す）。
+    投票・護衛が卓ごとのファイルにある（JINROU_GAME_DB_MODE=PER_GAME）ときは JOIN できないので、
+    メンバー・集計・護衛を別々に読んで同じ形の行にする。
+    """
+    tally = (
+        db.query(
+            WolfVote.target_member_id.label("target_member_id"),
+            func.sum(func.coalesce(WolfVote.points_at_vote, 0)).label("points"),
+        )
+        .filter(WolfVote.game_id == game_id, WolfVote.night_no == night_no)
+        .group_by(WolfVote.target_member_id)
+    )
+    guards = (
+        db.query(KnightGuard.target_member_id.label("target_member_id"))
+        .filter(KnightGuard.game_id == game_id, KnightGuard.night_no == night_no)
+        .distinct()
+    )
+    if routes_games(db):
+        points = {row.target_member_id: row.points for row in tally}
+        guarded = {row.target_member_id for row in guards}
+        members = (
+            db.query(GameMember.id, GameMember.display_name, GameMember.role_type, GameMember.team, GameMember.alive)
+            .filter(GameMember.game_id == game_id)
+            .order_by(GameMember.order_no.asc(), GameMember.id.asc())
+        )
+        return [_NightBoardRow(*m, points.get(m.id), m.id in guarded) for m in members]
+
+    tally = tally.subquery()
+    guards = guards.subquery()
+    return (
+        db.query(
+            GameMember.id,
+            GameMember.display_name,
+            GameMember.role_type,
+            GameMember.team,
+            GameMember.alive,
+            tally.c.points.label("wolf_points"),
+            (guards.c.target_member_id != None).label("guarded"),  # noqa: E711
+        )
+        .outerjoin(tally, tally.c.target_member_id == GameMember.id)
+        .outerjoin(guards, guards.c.target_member_id == GameMember.id)
+        .filter(GameMember.game_id == game_id)
+        .order_by(GameMember.order_no.asc(), GameMember.id.asc())
+        .all()
+    )
+
+
+def _wolf_target_candidates(board: list) -> list:
+    """狼投票の合計ポイントが最大のメンバー（board の並び = order_no 順）。投票が無ければ空。"""
+    voted = [row for row in board if row.wolf_points is not None]
+    if not voted:
+        return []
+    max_points = max(row.wolf_points for row in voted)
+    return [row for row in voted if row.wolf_points == max_points]
+
+
+def _night_draw_seed(game: Game, night_no: int) -> tuple[int, list]:
+    """
+    夜 night_no の襲撃先の乱択の (seed, draw_key)。resolve_night_simple と night_result で共通にして、
+    プレビューと確定の結果を揃える。
+    """
+    return _draw_seed(game, "night", night_no)
+
+
+def _pick_wolf_target(candidates: list, seed: int):
+    """候補から襲撃先を1人選ぶ（同点なら seed で乱択）。候補が無ければ None。"""
+    if not candidates:
+        return None
+    return game_log.choice(seed, candidates)
+
+
 @router.post("/{game_id}/resolve_night_simple")
 def resolve_night_simple(
     game_id: str,
@@ -714,6 +1534,9 @@ def resolve_night_simple(
     - Game.status を DAY_DISCUSSION または FINISHED に更新
     - 処理後に勝敗判定も行う
     - 戻り値は killed_member_id / victim / guarded_success / game_result / status を含む dict
+
+    投票・護衛・生存者は _load_night_board の1クエリで読み、
+    襲撃と勝敗による Game の更新・確定結果（night_outcomes）は同じ transaction で commit する。
     """
     game = db.get(Game, game_id)
     if not game:
@@ -723,111 +1546,74 @@ def resolve_night_simple(
         raise HTTPException(status_code=400, detail="Game is not in NIGHT phase")
 
     night_no = getattr(game, "curr_night", 1)
+    board = _load_night_board(db, game_id, night_no)
+    candidates = _wolf_target_candidates(board)
+    seed, draw_key = _night_draw_seed(game, night_no)
+    target = _pick_wolf_target(candidates, seed)
 
-    votes: list[WolfVote] = (
-        db.query(WolfVote)
-        .filter(
-            WolfVote.game_id == game_id,
-            WolfVote.night_no == night_no,
-        )
-        .all()
-    )
-
-    # --- 投票なし → 誰も死なない ---
-    if not votes:
-        game_result = _judge_game_result(game_id, db)
-
-        # ゲーム終了の場合のみ FINISHED にしておく（DB 上の状態）
-        if game_result["result"] != "ONGOING":
-            if hasattr(game, "status"):
-                game.status = game_result["result"]   
-            if hasattr(game, "result"):
-                game.result = game_result["result"]
-            if hasattr(game, "finished"):
-                game.finished = True
-            db.add(game)
-            db.commit()
-
-        # レスポンス用 status（テスト仕様）
-        if game_result["result"] == "ONGOING":
-            status_for_response = "DAY_DISCUSSION"
-        else:
-            status_for_response = game_result["result"]  # "WOLF_WIN" / "VILLAGE_WIN"
-
-        return {
-            "killed_member_id": None,
-            "victim": None,
-            "guarded_success": False,
-            "game_result": game_result,
-            "status": status_for_response,
-        }
-
-    # --- 投票ありパス ---
-
-    # ターゲットごとにポイント集計
-    points_by_target: dict[str, int] = {}
-    for v in votes:
-        pts = v.points_at_vote or 0
-        points_by_target[v.target_member_id] = points_by_target.get(
-            v.target_member_id, 0
-        ) + pts
-
-    # 一番ポイントが高いターゲットを決定（同点ならランダム）
-    max_points = max(points_by_target.values())
-    top_targets = [tid for tid, pts in points_by_target.items() if pts == max_points]
-    targeted_member_id = random.choice(top_targets)
-
-    # 騎士護衛があるかどうか
-    guard = (
-        db.query(KnightGuard)
-        .filter(
-            KnightGuard.game_id == game_id,
-            KnightGuard.night_no == night_no,
-            KnightGuard.target_member_id == targeted_member_id,
-        )
-        .one_or_none()
-    )
-
-    guarded_success = guard is not None
+    guarded_success = bool(target is not None and target.guarded)
     killed_member_id: str | None = None
-    victim_obj: GameMember | None = None
-
-    if guarded_success:
-        # 護衛成功 → 誰も死なない
-        killed_member_id = None
-    else:
-        target = db.get(GameMember, targeted_member_id)
-        if target and target.alive:
-            target.alive = False
-            db.add(target)
-            victim_obj = target
-            killed_member_id = target.id
 
-    # 勝敗判定
-    game_result = _judge_game_result(game_id, db)
+    if target is not None and not guarded_success and target.alive:
+        db.query(GameMember).filter(GameMember.id == target.id).update(
+            {GameMember.alive: False}, synchronize_session=False
+        )
+        killed_member_id = target.id
+
+    # 勝敗判定（襲撃後の生存者で。DB は読み直さない）
+    alive_members = [row for row in board if row.alive and row.id != killed_member_id]
+    game_result = _judge_alive_members(alive_members)
+
+    # 生存者数カウンタ: 初期化済みなら襲撃ぶんを減らし、未初期化なら今読んだ生存者で埋める
+    if _stored_alive_counts(game) is None:
+        _set_alive_counts(game, alive_members)
+    elif killed_member_id is not None:
+        counts = _record_death(game, target.role_type)
+        if config.CHECK_ALIVE_COUNTS and counts != _count_alive(alive_members):
+            raise HTTPException(
+                status_code=500,
+                detail=f"Alive counters out of sync: stored={counts}, actual={_count_alive(alive_members)}",
+            )
 
     if game_result["result"] == "ONGOING":
-        # ゲーム継続 → 昼議論へ
-        game.status = "DAY_DISCUSSION"
-        if hasattr(game, "curr_day"):
-            game.curr_day = (game.curr_day or 0) + 1
+        if target is not None:
+            # ゲーム継続 → 昼議論へ
+            game.status = "DAY_DISCUSSION"
+            if hasattr(game, "curr_day"):
+                game.curr_day = (game.curr_day or 0) + 1
     else:
         # ゲーム終了（DB 上は FINISHED）
         if hasattr(game, "status"):
-            game.status = game_result["result"] 
+            game.status = game_result["result"]
+        # アーカイブ（app/archive.py）までの経過時間の起点
+        game.finished_at = datetime.utcnow()
         if hasattr(game, "result"):
             game.result = game_result["result"]
         if hasattr(game, "finished"):
             game.finished = True
 
-    db.add(game)
-    db.commit()
-
-    # victim の dict 生成
-    victim_dict = None
-    if victim_obj is not None:
-        db.refresh(victim_obj)
-        victim_dict = {"id": victim_obj.id}
+    # 投票なしで継続する場合は状態を変えない（従来どおり commit もしない）
+    if target is not None or game_result["result"] != "ONGOING":
+        outcome = night_outcome.record(
+            db, game_id, night_no,
+            target=target,
+            guarded=guarded_success,
+            killed_member_id=killed_member_id,
+            tally={row.id: row.wolf_points for row in board if row.wolf_points is not None},
+        )
+        _commit_action(db, game, events=[(game_log.EVENT_NIGHT_RESOLVED, {
+            "night_no": night_no,
+            "seed": seed,
+            "draw_key": draw_key,
+            "candidate_ids": [row.id for row in candidates],
+            "target_member_id": target.id if target is not None else None,
+            "guarded": guarded_success,
+            "killed_member_id": killed_member_id,
+            "status": game.status,
+            "curr_day": game.curr_day,
+        })])
+        night_outcome.put(outcome)
+        _publish_game_state(game, db)
 
     # ✅ レスポンス用 status（テスト仕様に合わせる）
     if game_result["result"] == "ONGOING":
@@ -837,7 +1623,7 @@ def resolve_night_simple(
 
     return {
         "killed_member_id": killed_member_id,
-        "victim": victim_dict,
+        "victim": {"id": killed_member_id} if killed_member_id else None,
         "guarded_success": guarded_success,
         "game_result": game_result,
         "status": status_for_response,
@@ -847,131 +1633,112 @@ def resolve_night_simple(
 @router.get("/{game_id}/night_result", response_model=NightResultOut)
 def night_result(
     game_id: str,
+    request: Request,
+    response: Response,
     night_no: Optional[int] = None,
     db: Session = Depends(get_db_dep),
 ):
     """
     夜明け結果の取得（読み取り専用）:
-    - 指定 night_no の狼投票を集計してターゲットを決定
+    - 閉じた夜（過去の夜・当夜の解決後）は resolve_night_simple が保存した結果を返す
+      （app/night_outcome.py のキャッシュから。無ければ1行読む）
+    - まだ NIGHT の当夜（プレビュー）は、狼投票を集計してターゲットを決定
+      （同点は resolve_night_simple と同じ seed で引くので、確定前後で結果が変わらない）
     - 騎士護衛があれば襲撃失敗
     - DBを書き換えず、結果のみ返す
     """
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
 
     if night_no is None:
         night_no = getattr(game, "curr_night", 1)
 
-    votes: list[WolfVote] = (
-        db.query(WolfVote)
-        .filter(
-            WolfVote.game_id == game_id,
-            WolfVote.night_no == night_no,
-        )
-        .all()
-    )
-
-    if not votes:
-        return NightResultOut(
-            game_id=game_id,
-            night_no=night_no,
-            guarded_success=False,
-            victim=None,
-        )
-
-    points_by_target: dict[str, int] = {}
-    for v in votes:
-        pts = v.points_at_vote or 0
-        points_by_target[v.target_member_id] = points_by_target.get(
-            v.target_member_id, 0
-        ) + pts
-
-    max_points = max(points_by_target.values())
-    top_targets = [tid for tid, pts in points_by_target.items() if pts == max_points]
-    targeted_member_id = random.choice(top_targets)
-
-    guard = (
-        db.query(KnightGuard)
-        .filter(
-            KnightGuard.game_id == game_id,
-            KnightGuard.night_no == night_no,
-            KnightGuard.target_member_id == targeted_member_id,
-        )
-        .one_or_none()
+    closed = night_outcome.is_closed(game, night_no)
+    if closed:
+        result = night_outcome.get(game_id, night_no) or night_outcome.load(db, game_id, night_no)
+        if result is not None:
+            night_outcome.put(result)
+            return result
+
+    # まだ確定していない夜（または結果を保存する前に解決した夜）は集計して求める
+    candidates = _wolf_target_candidates(_load_night_board(db, game_id, night_no))
+    if game.rng_seed is None:
+        # seed を持たない古いゲーム（読み取り専用なので付けない）
+        seed = game_log.new_seed()
+    else:
+        seed, _ = _night_draw_seed(game, night_no)
+    target = _pick_wolf_target(candidates, seed)
+    result = night_outcome.build_result(
+        game_id, night_no, target, bool(target is not None and target.guarded)
     )
+    if closed:
+        # 閉じた夜は投票が増えないので、集計した結果もそのまま使い回せる
+        night_outcome.put(result)
+    return result
 
-    guarded_success = guard is not None
-    victim = None
-    if not guarded_success:
-        target = db.get(GameMember, targeted_member_id)
-        if target:
-            victim = NightResultVictimOut(
-                id=target.id,
-                display_name=target.display_name,
-            )
 
-    return NightResultOut(
-        game_id=game_id,
-        night_no=night_no,
-        guarded_success=guarded_success,
-        victim=victim,
-    )
 
 
+@router.get("/{game_id}/members", response_model=list[GameMemberOut])
+async def list_game_members(
+    game_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_dep),
+):
+    return await run_sync_db(db, _list_game_members, game_id, request, response)
 
 
-@router.get("/{game_id}/members", response_model=list[GameMemberOut])
-def list_game_members(
+def _list_game_members(
     game_id: str,
-    db: Session = Depends(get_db_dep),
+    request: Request,
+    response: Response,
+    db: Session,
 ):
-    game = db.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    engine = _require_game_engine(game_id, db)
+    not_modified = check_not_modified(request, response, version_etag(engine))
+    if not_modified:
+        return not_modified
 
-    members = (
-        db.query(GameMember)
-        .filter(GameMember.game_id == game_id)
-        .order_by(GameMember.order_no.asc())
-        .all()
-    )
+    return [_to_game_member_out(m) for m in engine.members]
 
-    # ★ ここで None を潰して Pydantic に渡す
-    result: list[GameMemberOut] = []
-    for m in members:
-        role_type = m.role_type or "VILLAGER"
-        team = m.team or "VILLAGE"
-
-        result.append(
-            GameMemberOut(
-                id=m.id,
-                game_id=m.game_id,
-                room_member_id=m.room_member_id,
-                display_name=m.display_name,
-                avatar_url=m.avatar_url,
-                role_type=role_type,
-                team=team,
-                alive=m.alive,
-                order_no=m.order_no,
-            )
-        )
 
-    return result
+def _to_game_member_out(m) -> GameMemberOut:
+    # ★ ここで None を潰して Pydantic に渡す
+    return GameMemberOut(
+        id=m.id,
+        game_id=m.game_id,
+        room_member_id=m.room_member_id,
+        display_name=m.display_name,
+        avatar_url=m.avatar_url,
+        role_type=m.role_type or "VILLAGER",
+        team=m.team or "VILLAGE",
+        alive=m.alive,
+        order_no=m.order_no,
+    )
 
 
 @router.get("/{game_id}/reveal_roles", response_model=RevealRolesOut)
 def get_reveal_roles(
     game_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db_dep),
 ):
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
 
     return RevealRolesOut(
         game_id=game_id,
-        enabled=bool(_REVEAL_ROLES_STATE.get(game_id, False)),
+        enabled=_reveal_roles_enabled(db, game_id),
     )
 
 
@@ -993,14 +1760,22 @@ def set_reveal_roles(
     if not requester_room_member or not requester_room_member.is_host:
         raise HTTPException(status_code=403, detail="Host only")
 
-    _REVEAL_ROLES_STATE[game_id] = bool(data.enabled)
+    get_state_store().set(db, REVEAL_ROLES_STATE_NS, game_id, bool(data.enabled))
+    # 公開フラグは games の列ではないが、GET の ETag を無効にするため version は進める
+    bump_version(game)
+    db.commit()
+    _publish_game_state(game, db)
 
     return RevealRolesOut(
         game_id=game_id,
-        enabled=bool(_REVEAL_ROLES_STATE.get(game_id, False)),
+        enabled=_reveal_roles_enabled(db, game_id),
     )
 
 
+def _reveal_roles_enabled(db: Session, game_id: str) -> bool:
+    return bool(get_state_store().get(db, REVEAL_ROLES_STATE_NS, game_id, False))
+
+
 # -----------------------------
 # 👥 人数に応じた役職構成
 # -----------------------------
@@ -1065,6 +1840,8 @@ def decide_roles(n: int) -> list[tuple[str, str]]:
 @router.get("/{game_id}/day_tally", response_model=DayTallyOut)
 def day_tally(
     game_id: str,
+    request: Request,
+    response: Response,
     day_no: Optional[int] = None,
     db: Session = Depends(get_db_dep),
 ):
@@ -1076,6 +1853,9 @@ def day_tally(
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
 
     if day_no is None:
         day_no = game.curr_day
@@ -1109,24 +1889,36 @@ def day_tally(
 
 
 @router.get("/{game_id}/day_vote_status", response_model=DayVoteStatusOut)
-def day_vote_status(
+async def day_vote_status(
     game_id: str,
+    request: Request,
+    response: Response,
     day_no: Optional[int] = None,
-    db: Session = Depends(get_db_dep),
+    db: AsyncSession = Depends(get_async_db_dep),
 ):
     """
     昼投票の進捗（生存者の投票完了数）を返す。
     """
-    game = db.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    return await run_sync_db(db, _day_vote_status, game_id, request, response, day_no)
 
-    if day_no is None:
-        day_no = game.curr_day
 
-    members = _fetch_unique_game_members(game_id, db)
-    alive_ids = [m.id for m in members if m.alive]
+def _day_vote_status(
+    game_id: str,
+    request: Request,
+    response: Response,
+    day_no: Optional[int],
+    db: Session,
+):
+    engine = _require_game_engine(game_id, db)
+    not_modified = check_not_modified(request, response, version_etag(engine))
+    if not_modified:
+        return not_modified
+
+    if day_no is None or day_no == engine.game.curr_day:
+        return _day_vote_progress(engine, db)
 
+    # 過去日の進捗は GameEngine に無いので DB で数える
+    alive_ids = [m.id for m in engine.alive_members]
     voted_count = (
         db.query(func.count(func.distinct(DayVote.voter_member_id)))
         .filter(
@@ -1136,10 +1928,38 @@ def day_vote_status(
         )
         .scalar()
     ) or 0
+    return _day_vote_progress(engine, db, day_no, int(voted_count))
+
+
+def _get_runoff(db: Session, game_id: str) -> dict | None:
+    return get_state_store().get(db, RUNOFF_STATE_NS, game_id)
 
-    runoff = _RUNOFF_STATE.get(game_id)
+
+def _runoff_candidates(db: Session, game_id: str, day_no: int) -> tuple[bool, list[str]]:
+    """指定日の決選投票状態（is_runoff, candidate_ids）を返す。"""
+    runoff = _get_runoff(db, game_id)
     is_runoff = bool(runoff and runoff.get("day_no") == day_no)
     candidate_ids = runoff.get("candidate_ids") if is_runoff else []
+    return is_runoff, list(candidate_ids or [])
+
+
+def _day_vote_progress(
+    engine: GameEngine,
+    db: Session,
+    day_no: Optional[int] = None,
+    voted_count: Optional[int] = None,
+) -> DayVoteStatusOut:
+    """
+    生存者の昼投票完了数と決選投票状態を組み立てる。
+    day_no / voted_count を省略すると当日分を GameEngine の投票済み者から数える。
+    """
+    game_id = engine.id
+    alive_ids = {m.id for m in engine.alive_members}
+    if day_no is None:
+        day_no = engine.game.curr_day
+        voted_count = len(engine.day_voters & alive_ids)
+
+    is_runoff, candidate_ids = _runoff_candidates(db, game_id, day_no)
 
     return DayVoteStatusOut(
         game_id=game_id,
@@ -1147,30 +1967,40 @@ def day_vote_status(
         alive_total=len(alive_ids),
         voted_count=int(voted_count),
         all_done=int(voted_count) >= len(alive_ids),
-        vote_round=int(getattr(game, "vote_round", 0) or 0),
+        vote_round=engine.vote_round,
         is_runoff=is_runoff,
         candidate_ids=candidate_ids or [],
     )
 
 
 @router.get("/{game_id}/day_vote_state", response_model=DayVoteStateOut)
-def day_vote_state(
+async def day_vote_state(
     game_id: str,
-    db: Session = Depends(get_db_dep),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_dep),
 ):
-    game = db.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    return await run_sync_db(db, _day_vote_state, game_id, request, response)
 
-    day_no = game.curr_day
-    runoff = _RUNOFF_STATE.get(game_id)
-    is_runoff = bool(runoff and runoff.get("day_no") == day_no)
-    candidate_ids = runoff.get("candidate_ids") if is_runoff else []
+
+def _day_vote_state(
+    game_id: str,
+    request: Request,
+    response: Response,
+    db: Session,
+):
+    engine = _require_game_engine(game_id, db)
+    not_modified = check_not_modified(request, response, version_etag(engine))
+    if not_modified:
+        return not_modified
+
+    day_no = engine.game.curr_day
+    is_runoff, candidate_ids = _runoff_candidates(db, game_id, day_no)
 
     return DayVoteStateOut(
         game_id=game_id,
         day_no=day_no,
-        vote_round=int(getattr(game, "vote_round", 0) or 0),
+        vote_round=engine.vote_round,
         is_runoff=is_runoff,
         candidate_ids=candidate_ids or [],
     )
@@ -1234,25 +2064,35 @@ def resolve_day_simple(
         raise HTTPException(status_code=400, detail="No day votes to resolve")
 
     max_votes = max(int(r.vote_count) for r in rows)
-    candidates = [r for r in rows if int(r.vote_count) == max_votes]
-    is_runoff_round = _RUNOFF_STATE.get(game_id, {}).get("day_no") == day_no
+    # 乱択を再生できるように、候補は target_member_id 順に並べる（game_log.day_vote_leaders と同じ）
+    candidates = sorted(
+        (r for r in rows if int(r.vote_count) == max_votes),
+        key=lambda r: r.target_member_id,
+    )
+    runoff = _get_runoff(db, game_id)
+    is_runoff_round = bool(runoff and runoff.get("day_no") == day_no)
 
     # 通常投票で同率1位が複数なら、まずは決選投票へ
     if len(candidates) >= 2 and not is_runoff_round:
         runoff_candidate_ids = [r.target_member_id for r in candidates]
-        _RUNOFF_STATE[game_id] = {
+        get_state_store().set(db, RUNOFF_STATE_NS, game_id, {
             "day_no": day_no,
             "candidate_ids": runoff_candidate_ids,
-        }
+        })
         game.vote_round = int(getattr(game, "vote_round", 0) or 0) + 1
         db.add(game)
         # 再投票を必須にするため、当日分の投票を一旦クリア
+        # （消した投票はイベントログに残っている）
         db.query(DayVote).filter(
             DayVote.game_id == game_id,
             DayVote.day_no == day_no,
         ).delete(synchronize_session=False)
-        db.commit()
-        db.refresh(game)
+        _commit_action(db, game, events=[(game_log.EVENT_RUNOFF_STARTED, {
+            "day_no": day_no,
+            "candidate_ids": runoff_candidate_ids,
+            "vote_round": game.vote_round,
+        })])
+        _publish_game_state(game, db)
         return {
             "game_id": game.id,
             "day_no": day_no,
@@ -1261,45 +2101,46 @@ def resolve_day_simple(
             "vote_round": int(getattr(game, "vote_round", 0) or 0),
         }
 
-    # 決選投票で同数の場合はランダム決着
-    chosen = random.choice(candidates)
+    # 決選投票で同数の場合はランダム決着（key は vote_round を戻す前の値）
+    seed, draw_key = _draw_seed(game, "day", day_no, int(game.vote_round or 0))
+    chosen = game_log.choice(seed, candidates)
 
     victim = db.get(GameMember, chosen.target_member_id)
     if not victim:
         raise HTTPException(status_code=500, detail="Victim GameMember not found")
 
     # 決選状態があれば解除
-    if _RUNOFF_STATE.get(game_id, {}).get("day_no") == day_no:
-        _RUNOFF_STATE.pop(game_id, None)
+    if is_runoff_round:
+        get_state_store().delete(db, RUNOFF_STATE_NS, game_id)
     game.vote_round = 0
 
-    # 昼の処刑反映
+    # 昼の処刑反映（生存者数カウンタも同じ transaction で減らす）
     victim.alive = False
     db.add(victim)
+    counts = _record_death(game, victim.role_type)
 
     # この昼に処刑されたプレイヤーを記録
     game.last_executed_member_id = victim.id
-    db.add(game)
-    db.commit()
-    db.refresh(victim)
-    db.refresh(game)
 
-    # ★ 昼の処刑後に勝敗判定
-    judge = _judge_game_result(game.id, db)
+    # ★ 昼の処刑後に勝敗判定（カウンタがあればメンバーを読み直さない）
+    if counts is not None:
+        if config.CHECK_ALIVE_COUNTS:
+            _check_alive_counts(db, game, counts)
+        judge = _judge_counts(*counts)
+    else:
+        db.flush()
+        judge = _judge_game_result(game_id, db)
 
     if judge["result"] != "ONGOING":
         # 村人勝利 or 人狼勝利 → 夜には遷移せず終了
         game.status = "FINISHED"
+        game.finished_at = datetime.utcnow()
         # ゲーム結果として保持（必要なら）
         if hasattr(game, "result"):
             game.result = judge["result"]  # "VILLAGE_WIN" or "WOLF_WIN"
         if hasattr(game, "finished"):
             game.finished = True
 
-        db.add(game)
-        db.commit()
-        db.refresh(game)
-
         next_status = judge["result"]  # レスポンスとしては勝敗をそのまま返す
     else:
         # まだゲーム継続 → ここで初めて NIGHT へ進める
@@ -1307,25 +2148,37 @@ def resolve_day_simple(
         game.curr_day = game.curr_day + 1
         game.curr_night = game.curr_night + 1
 
-        db.add(game)
-        db.commit()
-        db.refresh(game)
-
         next_status = "NIGHT"
 
+    victim_out = {
+        "id": victim.id,
+        "display_name": victim.display_name,
+        "role_type": victim.role_type,
+        "team": victim.team,
+        "alive": False,
+    }
+
+    # 処刑・勝敗・フェーズ遷移を1回の commit で反映する
+    _commit_action(db, game, events=[(game_log.EVENT_DAY_RESOLVED, {
+        "day_no": day_no,
+        "seed": seed,
+        "draw_key": draw_key,
+        "candidate_ids": [r.target_member_id for r in candidates],
+        "executed_member_id": victim.id,
+        "status": game.status,
+        "curr_day": game.curr_day,
+        "curr_night": game.curr_night,
+        "vote_round": game.vote_round,
+    })])
+    _publish_game_state(game, db)
+
     return {
-        "game_id": game.id,
+        "game_id": game_id,
         "day_no": day_no,
         "status": next_status,  # "NIGHT" / "VILLAGE_WIN" / "WOLF_WIN"
-        "victim": {
-            "id": victim.id,
-            "display_name": victim.display_name,
-            "role_type": victim.role_type,
-            "team": victim.team,
-            "alive": victim.alive,
-        },
+        "victim": victim_out,
         "tally": {
-            "target_member_id": victim.id,
+            "target_member_id": victim_out["id"],
             "vote_count": max_votes,
         },
     }
@@ -1375,27 +2228,30 @@ def get_or_create_seer_first_white(
             is_wolf=False,  # このAPIは「人狼ではない」ことを知らせる
         )
 
-    # 3. まだ決まっていない場合 → 村陣営からランダムに1人選ぶ
-    candidates = (
+    # 3. まだ決まっていない場合 → 村陣営（人狼・占い師本人以外）からランダムに1人選ぶ
+    members = (
         db.query(GameMember)
-        .filter(
-            GameMember.game_id == game_id,
-            GameMember.role_type != "WEREWOLF",  # 人狼以外は候補にする
-            GameMember.id != seer.id,       # 占い師本人は除外
-        )
+        .filter(GameMember.game_id == game_id)
+        .order_by(GameMember.order_no.asc(), GameMember.id.asc())
         .all()
     )
+    candidates = game_log.seer_white_candidates(members, seer.id)
 
     if not candidates:
         raise HTTPException(status_code=400, detail="No village candidate for seer white")
 
-    target = random.choice(candidates)
+    seed, draw_key = _draw_seed(game, "seer_first_white")
+    target = game_log.choice(seed, candidates)
 
     # 4. game に保存して永続化
     game.seer_first_white_target_id = target.id
-    db.add(game)
-    db.commit()
-    db.refresh(game)
+    _commit_action(db, game, events=[(game_log.EVENT_SEER_FIRST_WHITE, {
+        "seed": seed,
+        "draw_key": draw_key,
+        "seer_member_id": seer.id,
+        "target_member_id": target.id,
+    })])
+    _publish_game_state(game, db)
 
     # 5. レスポンス
     return SeerFirstWhiteOut(
@@ -1484,8 +2340,23 @@ def seer_inspect(
         is_wolf=is_wolf,
     )
     db.add(inspect)
-    db.commit()
-    db.refresh(inspect)
+    try:
+        _commit_action(db, game, game_engine.ACTION_SEER_INSPECT, seer.id, events=[
+            (game_log.EVENT_SEER_INSPECT, {
+                "night_no": night_no,
+                "seer_member_id": seer.id,
+                "target_member_id": target.id,
+                "is_wolf": is_wolf,
+            }),
+        ])
+    except IntegrityError:
+        # 同時リクエストで先に登録された（一意インデックスで弾かれた）
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Seer already inspected someone this night",
+        )
+    _publish_game_state(game, db)
 
     return SeerInspectOut.model_validate(inspect, from_attributes=True)
 
@@ -1501,12 +2372,17 @@ class SeerInspectStatusOut(BaseModel):
 )
 def seer_inspect_status(
     game_id: str,
+    request: Request,
+    response: Response,
     seer_member_id: str,
     db: Session = Depends(get_db_dep),
 ):
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
 
     seer = db.get(GameMember, seer_member_id)
     if not seer or seer.game_id != game_id:
@@ -1622,8 +2498,22 @@ def knight_guard(
         target_member_id=target.id,
     )
     db.add(guard)
-    db.commit()
-    db.refresh(guard)
+    try:
+        _commit_action(db, game, game_engine.ACTION_KNIGHT_GUARD, knight.id, events=[
+            (game_log.EVENT_KNIGHT_GUARD, {
+                "night_no": night_no,
+                "knight_member_id": knight.id,
+                "target_member_id": target.id,
+            }),
+        ])
+    except IntegrityError:
+        # 同時リクエストで先に登録された（一意インデックスで弾かれた）
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Knight already guarded someone this night",
+        )
+    _publish_game_state(game, db)
 
     return KnightGuardOut.model_validate(guard, from_attributes=True)
 
@@ -1639,12 +2529,17 @@ class KnightGuardStatusOut(BaseModel):
 )
 def knight_guard_status(
     game_id: str,
+    request: Request,
+    response: Response,
     knight_member_id: str,
     db: Session = Depends(get_db_dep),
 ):
     game = db.get(Game, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    not_modified = check_not_modified(request, response, version_etag(game))
+    if not_modified:
+        return not_modified
 
     # 騎士本人の最低限チェック（※UIのためなので軽めでOK。厳密にしたいならrole/aliveも確認）
     knight = db.get(GameMember, knight_member_id)
@@ -1746,17 +2641,32 @@ def medium_inspect(
         is_wolf=is_wolf,
     )
     db.add(inspect)
-    db.commit()
-    db.refresh(inspect)
+    try:
+        _commit_action(db, game, events=[(game_log.EVENT_MEDIUM_INSPECT, {
+            "day_no": day_no,
+            "medium_member_id": medium.id,
+            "target_member_id": executed.id,
+            "is_wolf": is_wolf,
+        })])
+    except IntegrityError:
+        # 同時リクエストで先に登録された（一意インデックスで弾かれた）
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Medium already inspected for this day",
+        )
+    _publish_game_state(game, db)
 
     return MediumInspectOut.model_validate(inspect, from_attributes=True)
 
 
 
 @router.get("/{game_id}/judge")
-def judge_game(
+async def judge_game(
     game_id: str,
-    db: Session = Depends(get_db_dep),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_dep),
 ):
     """
     現時点の生存状況から勝敗を判定する。
@@ -1765,17 +2675,27 @@ def judge_game(
     - reason: 簡単な説明
     ※ このAPIは Game.status を変更しない（判定のみ）。
     """
-    game = db.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    return await run_sync_db(db, _judge_game, game_id, request, response)
+
+
+def _judge_game(
+    game_id: str,
+    request: Request,
+    response: Response,
+    db: Session,
+):
+    engine = _require_game_engine(game_id, db)
+    not_modified = check_not_modified(request, response, version_etag(engine))
+    if not_modified:
+        return not_modified
 
-    result = _judge_game_result(game_id, db)
+    result = _judge_alive_members(engine.alive_members)
     # 参考用に現在の status や day/night も返しておくと便利
     result.update(
         {
-            "game_status": game.status,
-            "curr_day": game.curr_day,
-            "curr_night": game.curr_night,
+            "game_status": engine.game.status,
+            "curr_day": engine.game.curr_day,
+            "curr_night": engine.game.curr_night,
         }
     )
     return result
@@ -1792,34 +2712,107 @@ ROLE_MAP = {
 }
 
 @router.get("/{game_id}/me", response_model=GameMemberMe)
-def get_my_info(
+async def get_my_info(
     game_id: str,
+    request: Request,
+    response: Response,
     player_id: str,
-    db: Session = Depends(get_db_dep),
+    db: AsyncSession = Depends(get_async_db_dep),
 ) -> GameMemberMe:
     """
     実際の GameMember から自分の役職・状態を返す本番版。
     player_id は GameMember.id を想定。
     """
-    game = db.get(Game, game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    return await run_sync_db(db, _get_my_info, game_id, request, response, player_id)
+
+
+def _get_my_info(
+    game_id: str,
+    request: Request,
+    response: Response,
+    player_id: str,
+    db: Session,
+) -> GameMemberMe:
+    engine = _require_game_engine(game_id, db)
+    not_modified = check_not_modified(request, response, version_etag(engine))
+    if not_modified:
+        return not_modified
 
-    member = db.get(GameMember, player_id)
-    if not member or member.game_id != game_id:
+    member = engine.member(player_id)
+    if member is None:
         raise HTTPException(status_code=404, detail="Member not found in this game")
 
-    room_member = db.get(RoomMember, member.room_member_id)
-    is_host = bool(room_member and room_member.is_host)
+    return _to_game_member_me(engine.id, member, member.is_host)
+
 
+def _to_game_member_me(game_id: str, member, is_host: bool) -> GameMemberMe:
     # role_type は "WEREWOLF" / "SEER" ... なので、フロント向けに小文字にマップする
     role_key = ROLE_MAP.get(member.role_type, "villager")
     status = "alive" if member.alive else "dead"
 
     return GameMemberMe(
-        game_id=game.id,
+        game_id=game_id,
         player_id=member.id,
         role=role_key,
         status=status,
         is_host=is_host,
     )
+
+
+@router.get("/{game_id}/view", response_model=GameViewOut)
+async def get_player_view(
+    game_id: str,
+    request: Request,
+    response: Response,
+    player_id: str,
+    db: AsyncSession = Depends(get_async_db_dep),
+) -> GameViewOut:
+    """
+    プレイ画面用のまとめ取得API。
+    /games/{id}, /me, /members, 進捗（day_vote_status / night_actions_status）, /judge,
+    決選投票候補をまとめて返す。
+    - GameEngine（メモリ上のスナップショット）から組み立てるので、
+      version が変わっていなければ DB は games の version 1行しか読まない
+    - 進捗は現在フェーズ（DAY_DISCUSSION / NIGHT）の分だけ数える
+    """
+    return await run_sync_db(db, _get_player_view, game_id, request, response, player_id)
+
+
+def _get_player_view(
+    game_id: str,
+    request: Request,
+    response: Response,
+    player_id: str,
+    db: Session,
+) -> GameViewOut:
+    engine = _require_game_engine(game_id, db)
+    not_modified = check_not_modified(request, response, version_etag(engine))
+    if not_modified:
+        return not_modified
+
+    me_member = engine.member(player_id)
+    if me_member is None:
+        raise HTTPException(status_code=404, detail="Member not found in this game")
+
+    game = engine.game
+    status = (game.status or "").upper()
+
+    day_vote = None
+    night_actions = None
+    if status == "DAY_DISCUSSION":
+        day_vote = _day_vote_progress(engine, db)
+    elif status == "NIGHT":
+        night_actions = _night_actions_progress(engine)
+
+    is_runoff, candidate_ids = _runoff_candidates(db, game_id, game.curr_day)
+
+    return GameViewOut(
+        game=game,
+        me=_to_game_member_me(game.id, me_member, me_member.is_host),
+        members=[_to_game_member_out(m) for m in engine.members],
+        day_vote=day_vote,
+        night_actions=night_actions,
+        judge=GameJudgeOut(**_judge_alive_members(engine.alive_members)),
+        is_runoff=is_runoff,
+        runoff_candidate_ids=candidate_ids,
+    )
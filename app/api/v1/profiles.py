@@ -40,7 +40,6 @@ def create_profile(
     )
     db.add(profile)
     db.commit()
-    db.refresh(profile)
     return profile
 
 
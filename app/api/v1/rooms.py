@@ -1,14 +1,21 @@
 # app/api/v1/rooms.py
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import asyncio
 import uuid
 
-from ...api.deps import get_db_dep
+from ...api.deps import get_async_db_dep, get_db_dep, run_sync_db
+from ...api.etag import bump_version, check_not_modified, version_etag
+from ... import archive
+from ...db import SessionLocal, drop_game_databases
+from ...realtime import WAIT_RECHECK_SEC, hub, room_topic, publish_room_event
+from ...models.archive import GameArchive
 from ...models.room import Room, RoomRoster, RoomMember
 from ...models.profile import Profile
-from ...models.game import Game, GameMember, DayVote, WolfVote, SeerInspect, MediumInspect
-from ...models.knight import KnightGuard
+from ...models.game import ENDED_STATUSES, Game
 from ...schemas.room import (
     RoomCreate,
     RoomOut,
@@ -36,13 +43,14 @@ def _ensure_room_member_editable(room: Room, db: Session) -> None:
     game = db.get(Game, room.current_game_id)
     if game is None:
         room.current_game_id = None
+        bump_version(room)
         db.add(room)
         db.commit()
+        publish_room_event(room.id, "current_game_changed", current_game_id=None)
         return
 
     status = (game.status or "").upper()
-    ended_statuses = {"FINISHED", "WOLF_WIN", "VILLAGE_WIN"}
-    if status not in ended_statuses:
+    if status not in ENDED_STATUSES:
         raise HTTPException(
             status_code=400,
             detail="Cannot modify members while current game is in progress",
@@ -65,7 +73,6 @@ def create_room(
     )
     db.add(room)
     db.commit()
-    db.refresh(room)
     return room
 
 
@@ -109,29 +116,45 @@ def add_to_roster(
         alias_name=None,
     )
     db.add(roster)
+    bump_version(room)
     db.commit()
-    db.refresh(roster)
 
     # 4. レスポンス用に整形
     display_name = roster.alias_name or profile.display_name
-    return RoomRosterItem(
+    item = RoomRosterItem(
         id=roster.id,
         profile_id=profile.id,
         display_name=display_name,
         alias_name=roster.alias_name,
         avatar_url=profile.avatar_url,
     )
+    publish_room_event(room_id, "roster_added", roster=item.model_dump())
+    return item
 
 
 
 @router.get("/{room_id}/roster", response_model=list[RoomRosterItem])
-def list_roster(
+async def list_roster(
     room_id: str,
-    db: Session = Depends(get_db_dep),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_dep),
+):
+    return await run_sync_db(db, _list_roster, room_id, request, response)
+
+
+def _list_roster(
+    room_id: str,
+    request: Request,
+    response: Response,
+    db: Session,
 ):
     room = db.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
+    not_modified = check_not_modified(request, response, version_etag(room))
+    if not_modified:
+        return not_modified
 
     q = (
         db.query(RoomRoster, Profile)
@@ -217,21 +240,34 @@ def create_members_from_roster(
         db.add(m)
         members.append(m)
 
-
+    bump_version(room)
     db.commit()
-    for m in members:
-        db.refresh(m)
 
+    publish_room_event(room_id, "members_changed")
     return [RoomMemberListItem.model_validate(m) for m in members]
 
 @router.get("/{room_id}/members", response_model=list[RoomMemberListItem])
-def list_room_members(
+async def list_room_members(
     room_id: str,
-    db: Session = Depends(get_db_dep),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_dep),
+):
+    return await run_sync_db(db, _list_room_members, room_id, request, response)
+
+
+def _list_room_members(
+    room_id: str,
+    request: Request,
+    response: Response,
+    db: Session,
 ):
     room = db.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
+    not_modified = check_not_modified(request, response, version_etag(room))
+    if not_modified:
+        return not_modified
 
     members = (
         db.query(RoomMember)
@@ -262,8 +298,9 @@ def add_room_member(
         is_host=False,
     )
     db.add(member)
+    bump_version(room)
     db.commit()
-    db.refresh(member)
+    publish_room_event(room_id, "members_changed")
     return RoomMemberListItem.model_validate(member)
 
 
@@ -284,15 +321,22 @@ def remove_room_member(
         raise HTTPException(status_code=404, detail="Room member not found")
 
     db.delete(member)
+    bump_version(room)
     db.commit()
+    publish_room_event(room_id, "members_changed")
     return Response(status_code=204)
 
 
 @router.delete("/{room_id}", status_code=204)
 def delete_room(
     room_id: str,
+    purge_archives: bool = False,
     db: Session = Depends(get_db_dep),
 ):
+    """
+    ルームとメンバー・名簿、ルームのゲームの行を消す。
+    アーカイブ済みのゲーム（game_archives）は残す。purge_archives=true のときだけ一緒に消す。
+    """
     room = db.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -301,24 +345,129 @@ def delete_room(
         gid for (gid,) in db.query(Game.id).filter(Game.room_id == room_id).all()
     ]
 
-    if game_ids:
-        db.query(DayVote).filter(DayVote.game_id.in_(game_ids)).delete(synchronize_session=False)
-        db.query(WolfVote).filter(WolfVote.game_id.in_(game_ids)).delete(synchronize_session=False)
-        db.query(SeerInspect).filter(SeerInspect.game_id.in_(game_ids)).delete(synchronize_session=False)
-        db.query(MediumInspect).filter(MediumInspect.game_id.in_(game_ids)).delete(synchronize_session=False)
-        db.query(KnightGuard).filter(KnightGuard.game_id.in_(game_ids)).delete(synchronize_session=False)
-        db.query(GameMember).filter(GameMember.game_id.in_(game_ids)).delete(synchronize_session=False)
-        db.query(Game).filter(Game.id.in_(game_ids)).delete(synchronize_session=False)
+    archive.delete_game_rows(db, game_ids)
+    if purge_archives:
+        db.query(GameArchive).filter(GameArchive.room_id == room_id).delete(synchronize_session=False)
 
     db.query(RoomRoster).filter(RoomRoster.room_id == room_id).delete(synchronize_session=False)
     db.query(RoomMember).filter(RoomMember.room_id == room_id).delete(synchronize_session=False)
     db.delete(room)
     db.commit()
+    drop_game_databases(game_ids)
+    publish_room_event(room_id, "room_deleted")
     return Response(status_code=204)
 
 @router.get("/{room_id}", response_model=RoomOut)
-def get_room(room_id: str, db: Session = Depends(get_db_dep)):
+async def get_room(
+    room_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_dep),
+):
+    return await run_sync_db(db, _get_room, room_id, request, response)
+
+
+def _get_room(
+    room_id: str,
+    request: Request,
+    response: Response,
+    db: Session,
+):
     room = db.get(Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="room not found")
+    not_modified = check_not_modified(request, response, version_etag(room))
+    if not_modified:
+        return not_modified
     return room
+
+
+# -----------------------------
+# ルームチャネル（WebSocket）
+# -----------------------------
+
+def _load_room_state_event(room_id: str) -> dict | None:
+    """接続直後に送るルームの現在状態。短命セッションで読む。"""
+    db = SessionLocal()
+    try:
+        room = db.get(Room, room_id)
+        if not room:
+            return None
+        game = db.get(Game, room.current_game_id) if room.current_game_id else None
+        return {
+            "type": "room_state",
+            "room_id": room.id,
+            "version": int(room.version or 0),
+            "current_game_id": room.current_game_id,
+            "game_status": game.status if game else None,
+            "game_started": bool(game and game.started),
+        }
+    finally:
+        db.close()
+
+
+async def _wait_ws_disconnect(websocket: WebSocket) -> None:
+    """クライアントからの受信を読み捨て、切断されたら戻る。"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/{room_id}/ws")
+async def room_channel(
+    websocket: WebSocket,
+    room_id: str,
+):
+    """
+    ロビー / 待機画面向けのルームチャネル。
+    接続直後に room_state を送り、以後は以下のイベントを push する:
+    - roster_added: 出席簿に参加者が追加された
+    - members_changed: 当日参加者（room_members）が変わった
+    - current_game_changed: Room.current_game_id が変わった
+    - game_started: 現在のゲームが開始された
+    - room_deleted: ルームが削除された
+    別のワーカーでの変更は hub に届かないので、WAIT_RECHECK_SEC ごとにルームと現在のゲームを読み直し、
+    最後に送った room_state から変わっていれば room_state を送り直す（ルームが消えていれば room_deleted）。
+    """
+    if await run_in_threadpool(_load_room_state_event, room_id) is None:
+        await websocket.close(code=4404)
+        return
+
+    await websocket.accept()
+    async with hub.subscription(room_topic(room_id)) as queue:
+        snapshot = await run_in_threadpool(_load_room_state_event, room_id)
+        if snapshot is None:
+            await websocket.close(code=4404)
+            return
+        await websocket.send_json(snapshot)
+
+        disconnected = asyncio.create_task(_wait_ws_disconnect(websocket))
+        try:
+            while True:
+                next_event = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait(
+                    {next_event, disconnected},
+                    timeout=WAIT_RECHECK_SEC,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected in done:
+                    next_event.cancel()
+                    break
+                if next_event in done:
+                    event = next_event.result()
+                else:
+                    next_event.cancel()
+                    event = await run_in_threadpool(_load_room_state_event, room_id)
+                    if event == snapshot:
+                        continue
+                    if event is None:
+                        event = {"type": "room_deleted", "room_id": room_id}
+                if event["type"] == "room_state":
+                    snapshot = event
+                await websocket.send_json(event)
+                if event.get("type") == "room_deleted":
+                    await websocket.close()
+                    break
+        finally:
+            disconnected.cancel()
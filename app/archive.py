@@ -0,0 +1,267 @@
+# app/archive.py
+"""
+終了したゲームのアーカイブ。
+
+終了（FINISHED / VILLAGE_WIN / WOLF_WIN）から config.ARCHIVE_AFTER_SEC たったゲームを
+1ゲーム1行（game_archives、gzip 圧縮した JSON）にまとめ、games / game_members と
+投票・行動の行（day_votes など）を消す。消した後は SQLite のファイルを縮める（config.ARCHIVE_VACUUM）。
+
+- app/main.py の lifespan から config.ARCHIVE_INTERVAL_SEC ごとに run_once() を呼ぶ
+- 複数ワーカーで同時に回っても、同じゲームは game_archives の主キーで1回しか入らない
+  （負けた側は rollback して、その回は終わる）
+- 決選投票の候補などの共有状態（app/state_store.py）はアーカイブに含めず消す
+"""
+import asyncio
+import gzip
+import json
+import logging
+from datetime import date, datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, inspect as sa_inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import config, game_engine, night_outcome
+from .api.etag import bump_version
+from .db import GAME_TABLES, SessionLocal, drop_game_databases, engine, routes_games
+from .models.archive import GameArchive
+from .models.game import (
+    ENDED_STATUSES,
+    DayVote,
+    Game,
+    GameMember,
+    MediumInspect,
+    NightOutcome,
+    SeerInspect,
+    WolfVote,
+)
+from .models.game_event import GameEvent
+from .models.knight import KnightGuard
+from .models.room import Room
+from .realtime import publish_room_event
+from .state_store import REVEAL_ROLES_STATE_NS, RUNOFF_STATE_NS, get_state_store
+
+logger = logging.getLogger(__name__)
+
+# ゲームに属する投票・行動の行とイベントログ（スナップショットのキー: モデル）
+GAME_DETAIL_MODELS = {
+    "day_votes": DayVote,
+    "wolf_votes": WolfVote,
+    "seer_inspects": SeerInspect,
+    "medium_inspects": MediumInspect,
+    "knight_guards": KnightGuard,
+    "events": GameEvent,
+    "night_outcomes": NightOutcome,
+}
+
+# 共有状態ストアに game_id をキーにして置かれるもの
+GAME_STATE_NAMESPACES = (RUNOFF_STATE_NS, REVEAL_ROLES_STATE_NS)
+
+# payload の JSON の形を変えたら上げる
+ARCHIVE_FORMAT = 1
+
+
+def _game_filters(db: Session, model, game_ids: list[str]) -> list:
+    """
+    model の game_ids の行を選ぶ条件の列。投票・行動が卓ごとのファイルにある（PER_GAME）なら
+    1文で複数の卓を読めないので、卓ごとの条件にする。
+    """
+    if routes_games(db) and model.__tablename__ in GAME_TABLES:
+        return [model.game_id == game_id for game_id in game_ids]
+    return [model.game_id.in_(game_ids)]
+
+
+def delete_game_rows(db: Session, game_ids: list[str]) -> None:
+    """
+    games とそれに属する行（メンバー・投票・行動・共有状態）を消す。commit は呼び出し側。
+    games ⇔ game_members は互いに参照し合うので、先に games 側の参照を外してから消す。
+    """
+    if not game_ids:
+        return
+    db.execute(
+        update(Game)
+        .where(Game.id.in_(game_ids))
+        .values(seer_first_white_target_id=None, last_executed_member_id=None),
+        execution_options={"synchronize_session": False},
+    )
+    for model in GAME_DETAIL_MODELS.values():
+        for criterion in _game_filters(db, model, game_ids):
+            db.query(model).filter(criterion).delete(synchronize_session=False)
+    db.query(GameMember).filter(GameMember.game_id.in_(game_ids)).delete(synchronize_session=False)
+    db.query(Game).filter(Game.id.in_(game_ids)).delete(synchronize_session=False)
+    store = get_state_store()
+    for namespace in GAME_STATE_NAMESPACES:
+        store.delete_keys(db, namespace, game_ids)
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _row_dict(obj) -> dict:
+    return {attr.key: _jsonable(getattr(obj, attr.key)) for attr in sa_inspect(type(obj)).column_attrs}
+
+
+def build_snapshots(db: Session, games: list[Game]) -> dict[str, dict]:
+    """
+    games それぞれのスナップショット {game_id: {...}} を作る。
+    ゲーム数によらず、テーブルごとに1クエリでまとめて読む。
+    """
+    game_ids = [game.id for game in games]
+    snapshots = {
+        game.id: {
+            "format": ARCHIVE_FORMAT,
+            "game": _row_dict(game),
+            "members": [],
+            **{name: [] for name in GAME_DETAIL_MODELS},
+        }
+        for game in games
+    }
+    members = (
+        db.query(GameMember)
+        .filter(GameMember.game_id.in_(game_ids))
+        .order_by(GameMember.game_id, GameMember.order_no, GameMember.id)
+    )
+    for member in members:
+        snapshots[member.game_id]["members"].append(_row_dict(member))
+    for name, model in GAME_DETAIL_MODELS.items():
+        for criterion in _game_filters(db, model, game_ids):
+            query = db.query(model).filter(criterion)
+            for row in query.order_by(model.game_id, *sa_inspect(model).primary_key):
+                snapshots[row.game_id][name].append(_row_dict(row))
+    return snapshots
+
+
+def compress_snapshot(snapshot: dict) -> tuple[bytes, int]:
+    """(gzip 圧縮した JSON, 圧縮前のバイト数)"""
+    raw = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(raw, mtime=0), len(raw)
+
+
+def load_archive(db: Session, game_id: str) -> dict | None:
+    """アーカイブ済みのゲームのスナップショット。無ければ None。"""
+    row = db.get(GameArchive, game_id)
+    if row is None:
+        return None
+    return json.loads(gzip.decompress(row.payload))
+
+
+def archive_finished_games(
+    db: Session,
+    *,
+    older_than_sec: int,
+    limit: int,
+    now: datetime | None = None,
+) -> list[str]:
+    """
+    終了から older_than_sec 秒たったゲームを古い順に最大 limit 件アーカイブし、
+    元の行を消して commit する。アーカイブしたゲームの id を返す。
+    finished_at が無いゲーム（記録するようになる前に終わったもの）は created_at で判定する。
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=older_than_sec)
+    ended_at = func.coalesce(Game.finished_at, Game.created_at)
+    games = (
+        db.query(Game)
+        .filter(Game.status.in_(ENDED_STATUSES), ended_at <= cutoff)
+        .order_by(ended_at, Game.id)
+        .limit(limit)
+        .all()
+    )
+    if not games:
+        return []
+
+    snapshots = build_snapshots(db, games)
+    for game in games:
+        payload, raw_bytes = compress_snapshot(snapshots[game.id])
+        db.add(GameArchive(
+            game_id=game.id,
+            room_id=game.room_id,
+            status=game.status,
+            created_at=game.created_at,
+            finished_at=game.finished_at,
+            raw_bytes=raw_bytes,
+            payload=payload,
+        ))
+
+    game_ids = [game.id for game in games]
+    # 最後のゲームとしてルームから参照されたままなら外す
+    rooms = db.query(Room).filter(Room.current_game_id.in_(game_ids)).all()
+    for room in rooms:
+        room.current_game_id = None
+        bump_version(room)
+    room_ids = [room.id for room in rooms]
+
+    delete_game_rows(db, game_ids)
+    db.commit()
+
+    drop_game_databases(game_ids)
+    for game_id in game_ids:
+        game_engine.discard(game_id)
+        night_outcome.discard(game_id)
+    for room_id in room_ids:
+        publish_room_event(room_id, "current_game_changed", current_game_id=None)
+    return game_ids
+
+
+def vacuum(mode: str | None = None) -> str:
+    """
+    消した行の空きページを OS に返す（SQLite のみ。PostgreSQL は autovacuum に任せる）。
+    実際に行ったもの（"incremental" / "full" / "skipped"）を返す。
+    """
+    mode = mode or config.ARCHIVE_VACUUM
+    if engine.dialect.name != "sqlite" or mode == "OFF":
+        return "skipped"
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        if mode == "FULL":
+            conn.exec_driver_sql("VACUUM")
+            return "full"
+        # auto_vacuum: 0=NONE / 1=FULL / 2=INCREMENTAL
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+            return "skipped"
+        # pysqlite の execute() だと1ページしか返さないので、最後まで step する executescript を使う
+        conn.connection.dbapi_connection.executescript("PRAGMA incremental_vacuum;")
+        return "incremental"
+
+
+def run_once(
+    *,
+    older_than_sec: int | None = None,
+    batch_size: int | None = None,
+    vacuum_mode: str | None = None,
+) -> dict:
+    """対象が無くなるまでバッチでアーカイブし、何か消したら vacuum する。"""
+    older_than_sec = config.ARCHIVE_AFTER_SEC if older_than_sec is None else older_than_sec
+    batch_size = batch_size or config.ARCHIVE_BATCH_SIZE
+    archived = 0
+    db = SessionLocal()
+    try:
+        while True:
+            try:
+                game_ids = archive_finished_games(db, older_than_sec=older_than_sec, limit=batch_size)
+            except IntegrityError:
+                # 別のワーカーが同じゲームを先にアーカイブした。残りは次の回に回す
+                db.rollback()
+                break
+            archived += len(game_ids)
+            if len(game_ids) < batch_size:
+                break
+    finally:
+        db.close()
+    return {
+        "archived": archived,
+        "vacuum": vacuum(vacuum_mode) if archived else "skipped",
+    }
+
+
+async def run_periodically(interval_sec: int) -> None:
+    """lifespan から起動する。interval_sec ごとに run_once() をスレッドプールで回す。"""
+    while True:
+        await asyncio.sleep(interval_sec)
+        try:
+            await run_in_threadpool(run_once)
+        except Exception:
+            logger.exception("game archive run failed")
@@ -0,0 +1,135 @@
+# app/config.py
+"""
+環境変数から読む設定値。
+未設定ならローカル開発向けの既定値を使う。
+"""
+import os
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_STATE_BACKENDS = {"MEMORY", "DB", "FILE"}
+_POOL_CLASSES = {"QUEUE", "STATIC", "NULL"}
+_AUTO_VACUUM_MODES = {"NONE", "FULL", "INCREMENTAL"}
+_ARCHIVE_VACUUM_MODES = {"OFF", "INCREMENTAL", "FULL"}
+_GAME_DB_MODES = {"SHARED", "PER_GAME"}
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer: {raw!r}")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_choice(name: str, default: str, choices: set[str]) -> str:
+    value = (os.environ.get(name) or default).strip().upper()
+    if value not in choices:
+        raise RuntimeError(f"{name} must be one of {sorted(choices)}: {value!r}")
+    return value
+
+
+# --- データベース（app/db.py） ---
+
+# SQLAlchemy の URL。複数の API ノードで共有するなら PostgreSQL を指す
+# （例: postgresql+psycopg2://jinrou:secret@db:5432/jinrou）
+DATABASE_URL = os.environ.get("JINROU_DATABASE_URL") or "sqlite:///./werewolf.db"
+# async エンドポイント用の URL。未設定なら DATABASE_URL のドライバを
+# async 版（sqlite → aiosqlite、postgresql → asyncpg）に置き換えて使う
+ASYNC_DATABASE_URL = os.environ.get("JINROU_ASYNC_DATABASE_URL") or None
+_IS_SQLITE = DATABASE_URL.startswith("sqlite")
+# 起動時に一意インデックスを足すとき、同じキーの重複行があれば最後に入った1行だけ残して消す。
+# 無効（既定）なら消さずに重複キーをログに出し、そのインデックスは作らない
+DEDUPE_ON_UNIQUE_INDEX = _env_bool("JINROU_DEDUPE_ON_UNIQUE_INDEX", False)
+
+
+# --- SQLite PRAGMA（接続ごとに適用する。SQLite のときだけ） ---
+
+# WAL: 書き込み中でも読み取りがブロックされない
+SQLITE_JOURNAL_MODE = _env_choice("JINROU_SQLITE_JOURNAL_MODE", "WAL", _JOURNAL_MODES)
+# WAL なら NORMAL でも電源断以外では壊れない（commit ごとの fsync を省く）
+SQLITE_SYNCHRONOUS = _env_choice("JINROU_SQLITE_SYNCHRONOUS", "NORMAL", _SYNCHRONOUS_LEVELS)
+# ロック待ちの上限（ミリ秒）。同時投票で即 "database is locked" にしない
+SQLITE_BUSY_TIMEOUT_MS = _env_int("JINROU_SQLITE_BUSY_TIMEOUT_MS", 5000)
+# ページキャッシュ。負数は KiB 指定（-20000 ≒ 20MB）
+SQLITE_CACHE_SIZE = _env_int("JINROU_SQLITE_CACHE_SIZE", -20000)
+# メモリマップ I/O の上限（バイト）。0 で無効
+SQLITE_MMAP_SIZE = _env_int("JINROU_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+# 空きページの返し方。INCREMENTAL ならアーカイブ後に PRAGMA incremental_vacuum で縮められる
+# （テーブル作成前の新しい DB にだけ効く。既存 DB は VACUUM するまで変わらない）
+SQLITE_AUTO_VACUUM = _env_choice("JINROU_SQLITE_AUTO_VACUUM", "INCREMENTAL", _AUTO_VACUUM_MODES)
+
+
+# --- 投票・行動テーブルの置き場所（app/db.py の GameDatabases） ---
+
+# SHARED: DATABASE_URL に全卓分（既定）
+# PER_GAME: day_votes / wolf_votes / seer_inspects / medium_inspects / knight_guards を
+#   game_id ごとの SQLite ファイル（GAME_DB_DIR/<game_id>.db）に置く。SQLite のときだけ
+GAME_DB_MODE = _env_choice("JINROU_GAME_DB_MODE", "SHARED", _GAME_DB_MODES)
+GAME_DB_DIR = os.environ.get("JINROU_GAME_DB_DIR") or "./game_dbs"
+# PER_GAME で同時に開いておくファイル（engine）の数。超えたら古いものから閉じる
+GAME_DB_MAX_OPEN = _env_int("JINROU_GAME_DB_MAX_OPEN", 64)
+
+
+# --- 接続プール（app/db.py） ---
+
+# QUEUE: 接続を使い回す（既定）/ STATIC: 1接続を全スレッドで共有 / NULL: 毎回接続する
+DB_POOL_CLASS = _env_choice("JINROU_DB_POOL", "QUEUE", _POOL_CLASSES)
+# QUEUE のときの常時保持数と、それを超えて一時的に開ける数
+DB_POOL_SIZE = _env_int("JINROU_DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("JINROU_DB_MAX_OVERFLOW", 20)
+# 空き接続を待つ上限（秒）。超えると TimeoutError
+DB_POOL_TIMEOUT_SEC = _env_int("JINROU_DB_POOL_TIMEOUT_SEC", 30)
+# この秒数より古い接続は作り直す（-1 で無効）
+DB_POOL_RECYCLE_SEC = _env_int("JINROU_DB_POOL_RECYCLE_SEC", -1)
+# 貸し出し前に接続が生きているか確認する（ネットワーク越しの DB 向け。既定は SQLite 以外で有効）
+DB_POOL_PRE_PING = _env_bool("JINROU_DB_POOL_PRE_PING", not _IS_SQLITE)
+
+
+# --- ワーカー間の共有状態（app/state_store.py） ---
+
+# MEMORY: プロセス内（ワーカー1つのときだけ）/ DB: shared_state テーブル / FILE: JINROU_STATE_DIR 配下
+STATE_BACKEND = _env_choice("JINROU_STATE_BACKEND", "DB", _STATE_BACKENDS)
+# FILE バックエンドの保存先（同じマシン上のワーカーで共有する）
+STATE_DIR = os.environ.get("JINROU_STATE_DIR") or "./.jinrou_state"
+
+
+# --- SQL 計測（app/query_stats.py） ---
+
+# 有効にするとレスポンスに X-DB-Queries / X-DB-Time を付け、ルートごとに集計する
+QUERY_STATS = _env_bool("JINROU_QUERY_STATS", False)
+
+
+# --- 生存者数カウンタ（games.alive_wolf_count / alive_village_count） ---
+
+# 有効にすると、カウンタで勝敗判定するたびにメンバーから数え直して突き合わせ、ずれていれば 500 にする（デバッグ用）
+CHECK_ALIVE_COUNTS = _env_bool("JINROU_CHECK_ALIVE_COUNTS", False)
+
+
+# --- 静的ファイル（app/static.py） ---
+
+# /frontend の js/css などの Cache-Control: max-age（秒）。?v= 付きで参照されるものは immutable
+STATIC_ASSET_MAX_AGE_SEC = _env_int("JINROU_STATIC_ASSET_MAX_AGE_SEC", 86400)
+
+
+# --- 終了したゲームのアーカイブ（app/archive.py） ---
+
+# アーカイブ処理を回す間隔（秒）。0 で無効
+ARCHIVE_INTERVAL_SEC = _env_int("JINROU_ARCHIVE_INTERVAL_SEC", 3600)
+# 終了してからこの秒数たったゲームをアーカイブする（既定 7 日）
+ARCHIVE_AFTER_SEC = _env_int("JINROU_ARCHIVE_AFTER_SEC", 7 * 24 * 3600)
+# 1 transaction でアーカイブするゲーム数
+ARCHIVE_BATCH_SIZE = _env_int("JINROU_ARCHIVE_BATCH_SIZE", 100)
+# アーカイブ後に SQLite のファイルを縮める方法
+# INCREMENTAL: auto_vacuum=INCREMENTAL の DB なら PRAGMA incremental_vacuum（短い）
+# FULL: VACUUM（DB 全体を作り直す。その間は書き込みが止まる）/ OFF: しない
+ARCHIVE_VACUUM = _env_choice("JINROU_ARCHIVE_VACUUM", "INCREMENTAL", _ARCHIVE_VACUUM_MODES)
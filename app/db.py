@@ -1,32 +1,590 @@
 # app/db.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import Table, create_engine, event, inspect as sa_inspect
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from sqlalchemy.sql.util import find_tables
+
+from . import config, query_stats
+
+logger = logging.getLogger(__name__)
+
+# async エンドポイント用に、同じ DB を開く async ドライバ
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """sync 用の URL のドライバを async 版に置き換える（postgresql+psycopg2 → postgresql+asyncpg など）。"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(
+            f"no async driver known for {backend!r}; set JINROU_ASYNC_DATABASE_URL"
+        )
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+DATABASE_URL = config.DATABASE_URL
+ASYNC_DATABASE_URL = config.ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
+
+
+def sqlite_pragmas() -> dict[str, object]:
+    """接続ごとに流す PRAGMA（値は app/config.py / 環境変数で変更できる）。"""
+    return {
+        # auto_vacuum はテーブル作成前に設定する必要があるので先頭
+        "auto_vacuum": config.SQLITE_AUTO_VACUUM,
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+    }
+
+
+def install_sqlite_pragmas(target_engine, pragmas: dict[str, object]) -> None:
+    """
+    SQLite の PRAGMA は接続単位の設定なので、connect イベントで新しい接続ごとに適用する。
+    （journal_mode=WAL だけは DB ファイルに残るが、他は毎回必要）
+    """
+
+    @event.listens_for(target_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def pool_options() -> dict[str, object]:
+    """
+    create_engine / create_async_engine に渡す接続プールの設定（app/config.py / 環境変数）。
+    既定（QUEUE）は sync / async とも QueuePool 系で、接続と PRAGMA 適用済みの状態を使い回す。
+    """
+    options: dict[str, object] = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    if config.DB_POOL_CLASS == "STATIC":
+        options["poolclass"] = StaticPool
+    elif config.DB_POOL_CLASS == "NULL":
+        options["poolclass"] = NullPool
+    else:
+        # poolclass は指定しない（sync は QueuePool、async は AsyncAdaptedQueuePool になる）
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT_SEC,
+            pool_recycle=config.DB_POOL_RECYCLE_SEC,
+        )
+    return options
+
+
+# -----------------------------
+# 投票・行動テーブルの game_id ごとのファイル（JINROU_GAME_DB_MODE=PER_GAME）
+# -----------------------------
+# ゲームの進行中にだけ書かれるテーブル。PER_GAME ではこれだけを GAME_DB_DIR/<game_id>.db に置き、
+# 残り（games / game_members / rooms / イベントログなど）は DATABASE_URL に置く
+GAME_TABLES = ("day_votes", "wolf_votes", "seer_inspects", "medium_inspects", "knight_guards")
+
+# Session.info のキー: game_id → その卓のファイルの engine を返す関数 / いま向けている game_id
+GAME_ENGINE_FOR = "game_engine_for"
+GAME_ID = "game_id"
+
+
+class GameDatabases:
+    """
+    game_id ごとの SQLite ファイルとその engine を管理する。engine は開いた順に max_open 個まで残す。
+    ファイルは最初に使うときに作り、GAME_TABLES のテーブルを作成する。
+    async=True なら aiosqlite の engine を作り、Session 向けにはその sync_engine を返す。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        pragmas: dict[str, object] | None = None,
+        engine_options: dict[str, object] | None = None,
+        connect_args: dict[str, object] | None = None,
+        max_open: int = 64,
+        is_async: bool = False,
+    ):
+        self.directory = directory
+        self.pragmas = pragmas
+        self.engine_options = engine_options or {}
+        self.connect_args = connect_args or {}
+        self.max_open = max_open
+        self.is_async = is_async
+        self._engines: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, game_id: str) -> str:
+        if not game_id or os.sep in game_id or "/" in game_id or game_id.startswith("."):
+            raise ValueError(f"invalid game_id for a game database: {game_id!r}")
+        return os.path.join(self.directory, f"{game_id}.db")
+
+    def engine(self, game_id: str):
+        """game_id のファイルの（sync の）engine。無ければファイルとテーブルを作る。"""
+        with self._lock:
+            engine = self._engines.get(game_id)
+            if engine is None:
+                engine = self._open(game_id)
+                self._engines[game_id] = engine
+                while len(self._engines) > self.max_open:
+                    _, evicted = self._engines.popitem(last=False)
+                    self._dispose(evicted)
+            else:
+                self._engines.move_to_end(game_id)
+        return engine.sync_engine if self.is_async else engine
+
+    def _open(self, game_id: str):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.abspath(self.path(game_id))
+        is_new = not os.path.exists(path)
+        connect_args = {"check_same_thread": False, **self.connect_args}
+        if self.is_async:
+            engine = create_async_engine(
+                f"sqlite+aiosqlite:///{path}", connect_args=connect_args, **self.engine_options
+            )
+            sync_engine = engine.sync_engine
+        else:
+            engine = sync_engine = create_engine(
+                f"sqlite:///{path}", connect_args=connect_args, **self.engine_options
+            )
+        if self.pragmas:
+            install_sqlite_pragmas(sync_engine, self.pragmas)
+        if is_new and not self.is_async:
+            Base.metadata.create_all(bind=sync_engine, tables=game_tables())
+        # ファイル作成時の DDL はリクエストの SQL 回数に数えない
+        query_stats.install(sync_engine)
+        return engine
+
+    def _dispose(self, engine) -> None:
+        # AsyncEngine.dispose() はコルーチンなので、同期側から接続プールを閉じる
+        (engine.sync_engine if self.is_async else engine).dispose()
+
+    def close(self, game_ids) -> None:
+        """game_ids の engine を閉じる（ファイルは残す）。"""
+        with self._lock:
+            for game_id in game_ids:
+                engine = self._engines.pop(game_id, None)
+                if engine is not None:
+                    self._dispose(engine)
+
+    def close_all(self) -> None:
+        with self._lock:
+            game_ids = list(self._engines)
+        self.close(game_ids)
+
+    def drop(self, game_ids) -> None:
+        """game_ids の engine を閉じ、ファイルを消す（アーカイブ・部屋の削除の commit 後に呼ぶ）。"""
+        game_ids = list(game_ids)
+        self.close(game_ids)
+        for game_id in game_ids:
+            _remove_sqlite_files(self.path(game_id))
+
+    def drop_all(self) -> None:
+        """全卓分のファイルを消す（DB を作り直すデバッグ API・テスト用）。"""
+        self.close_all()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith((".db", ".db-wal", ".db-shm", ".db-journal")):
+                    os.remove(os.path.join(self.directory, name))
+
+
+def _remove_sqlite_files(path: str) -> None:
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def game_tables() -> list:
+    return [Base.metadata.tables[name] for name in GAME_TABLES]
+
+
+def _statement_game_id(clause) -> str | None:
+    """SQL 文の WHERE にある `<GAME_TABLES>.game_id = 値` の値（無ければ None）。"""
+    for node in visitors.iterate(clause):
+        if (
+            isinstance(node, BinaryExpression)
+            and node.operator is operators.eq
+            and getattr(node.left, "name", None) == "game_id"
+            and getattr(getattr(node.left, "table", None), "name", None) in GAME_TABLES
+            and isinstance(node.right, BindParameter)
+        ):
+            return node.right.effective_value
+    return None
+
+
+class GameRoutedSession(Session):
+    """
+    GAME_TABLES への SQL を game_id のファイルへ送る Session。それ以外のテーブルは通常どおり bind（DATABASE_URL）へ。
+    game_id は SQL 文の `game_id = 値`、flush する行の game_id、bind_game() で向けた値の順に探す
+    （`game_id IN (...)` のように複数の卓にまたがる文は、卓ごとに bind_game() してから流す）。
+    GAME_TABLES とそれ以外を1文で JOIN することはできない（ファイルが別なので RuntimeError）。
+
+    1リクエストで両方に書いても、ファイルをまたいで原子的には commit できない。
+    投票は卓のファイルに、games.version とイベントログは本体に入るので、commit() は本体を先に commit し、
+    成功してから卓のファイルを commit する（本体が失敗すれば、卓のファイルは rollback して何も残らない）。
+    本体の後で卓のファイルの commit が失敗したときは、discard_if_game_commit_fails() で控えた
+    本体の行（投票・夜行動のイベント）を消してから例外を上げる。games.version は進んだまま残る。
+    卓のファイルの接続は Session の外で begin した transaction として渡すので、Session.commit() は
+    それを commit しない（順序をここで決める）。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # flush で行を書くときの接続を、行の game_id で選ぶ（sqlalchemy.ext.horizontal_shard と同じ仕組み）
+        self.connection_callable = self._connection_for_row
+        # この transaction で開いた卓のファイルの接続（game_id → Connection）
+        self._game_connections: dict[str, Connection] = {}
+        # 卓のファイルの commit に失敗したら本体から消す行（(table, [id, ...])）
+        self._discard_on_game_failure: list[tuple[Table, list]] = []
+
+    def commit(self) -> None:
+        try:
+            super().commit()
+        except BaseException:
+            self._end_game_transactions(commit=False)
+            raise
+        self._end_game_transactions(commit=True)
+
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            self._end_game_transactions(commit=False)
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._end_game_transactions(commit=False)
+
+    def _end_game_transactions(self, *, commit: bool) -> None:
+        connections = list(self._game_connections.values())
+        discard = self._discard_on_game_failure
+        self._game_connections = {}
+        self._discard_on_game_failure = []
+        failed = None
+        for conn in connections:
+            try:
+                if commit and failed is None:
+                    conn.commit()
+                else:
+                    conn.rollback()
+            except BaseException as exc:
+                failed = failed or exc
+                # commit に失敗した接続は transaction が開いたまま残るので、DBAPI の接続ごと捨てて rollback させる
+                conn.invalidate()
+            finally:
+                conn.close()
+        if failed is not None:
+            if commit and discard:
+                with self.get_bind().begin() as conn:
+                    for table, ids in discard:
+                        conn.execute(table.delete().where(table.c.id.in_(ids)))
+            raise failed
+
+    def _game_connection(self, game_id: str) -> Connection:
+        conn = self._game_connections.get(game_id)
+        if conn is None:
+            conn = self.info[GAME_ENGINE_FOR](game_id).connect()
+            conn.begin()
+            self._game_connections[game_id] = conn
+        return conn
+
+    def _connection_for_row(self, mapper=None, instance=None, **kw):
+        game_id = getattr(instance, "game_id", None) if mapper is not None and _is_game_table(mapper) else None
+        return self.connection(bind_arguments={"mapper": mapper, "game_id": game_id})
+
+    def get_bind(self, mapper=None, clause=None, game_id=None, **kw):
+        names = set()
+        if mapper is not None:
+            names.update(table.name for table in mapper.tables)
+        if clause is not None:
+            names.update(getattr(table, "name", None) for table in find_tables(clause, include_crud=True))
+        routed = names.intersection(GAME_TABLES)
+        if not routed:
+            return super().get_bind(mapper, clause=clause, **kw)
+        if names - routed - {None}:
+            raise RuntimeError(
+                f"cannot query {sorted(routed)} together with {sorted(names - routed - {None})}: "
+                "they live in different files (JINROU_GAME_DB_MODE=PER_GAME)"
+            )
+        if game_id is None and clause is not None:
+            game_id = _statement_game_id(clause)
+        if game_id is None:
+            game_id = self.info.get(GAME_ID)
+        if game_id is None:
+            raise RuntimeError(f"no game bound to the session for {sorted(routed)}; call bind_game() first")
+        return self._game_connection(game_id)
+
+
+def _is_game_table(mapper) -> bool:
+    return any(table.name in GAME_TABLES for table in mapper.tables)
+
+
+def _sync_session(db) -> Session:
+    return db.sync_session if isinstance(db, AsyncSession) else db
+
+
+def bind_game(db, game_id: str | None) -> None:
+    """
+    db（Session / AsyncSession）の GAME_TABLES を game_id のファイルへ向ける。
+    SHARED では何もしない。get_db_dep はパスの {game_id} で呼ぶので、
+    パス以外から game_id を得るところ（debug・アーカイブ）だけが自分で呼ぶ。
+    """
+    session = _sync_session(db)
+    if GAME_ENGINE_FOR in session.info:
+        session.info[GAME_ID] = game_id
+
+
+def discard_if_game_commit_fails(db, table: Table, ids) -> None:
+    """
+    PER_GAME のとき、本体の table に書いた行 ids を、卓のファイルの commit が失敗したら消すよう控える
+    （GameRoutedSession.commit の後始末）。SHARED では何もしない。
+    """
+    session = _sync_session(db)
+    if isinstance(session, GameRoutedSession) and ids:
+        session._discard_on_game_failure.append((table, list(ids)))
+
+
+def routes_games(db) -> bool:
+    """db が GAME_TABLES を game_id ごとのファイルへ送るか（PER_GAME か）。"""
+    return GAME_ENGINE_FOR in _sync_session(db).info
+
+
+PER_GAME_DB = config.GAME_DB_MODE == "PER_GAME"
+if PER_GAME_DB and not IS_SQLITE:
+    raise RuntimeError("JINROU_GAME_DB_MODE=PER_GAME requires a SQLite JINROU_DATABASE_URL")
 
-DATABASE_URL = "sqlite:///./werewolf.db"
 
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite用
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},  # SQLite用
+    **pool_options(),
+)
+if IS_SQLITE:
+    install_sqlite_pragmas(engine, sqlite_pragmas())
+query_stats.install(engine)
+
+# 1リクエスト = 1セッション（get_db_dep）。commit 後も読み込んだ値をそのまま使えるように
+# expire_on_commit=False にする（commit のたびに db.refresh で読み直さない）。
+# SQL 式で更新した列（bump_version の version など）は flush 時に expire され、次に触ったときに読み直される
+game_databases: GameDatabases | None = None
+_routing: dict[str, object] = {}
+if PER_GAME_DB:
+    game_databases = GameDatabases(
+        config.GAME_DB_DIR,
+        pragmas=sqlite_pragmas(),
+        engine_options=pool_options(),
+        max_open=config.GAME_DB_MAX_OPEN,
+    )
+    _routing = {"class_": GameRoutedSession, "info": {GAME_ENGINE_FOR: game_databases.engine}}
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, **_routing
+)
+
+# async エンドポイント用（PRAGMA は sync_engine 側の connect イベントで同じものを適用）
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options())
+if IS_SQLITE:
+    install_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas())
+query_stats.install(async_engine.sync_engine)
+
+_async_routing: dict[str, object] = {}
+if PER_GAME_DB:
+    # 同じファイルを aiosqlite でも開く（テーブルは sync 側の engine() が作る）
+    async_game_databases = GameDatabases(
+        config.GAME_DB_DIR,
+        pragmas=sqlite_pragmas(),
+        engine_options=pool_options(),
+        max_open=config.GAME_DB_MAX_OPEN,
+        is_async=True,
+    )
+
+    def _async_game_engine(game_id: str):
+        game_databases.engine(game_id)
+        return async_game_databases.engine(game_id)
+
+    _async_routing = {
+        "sync_session_class": GameRoutedSession,
+        "info": {GAME_ENGINE_FOR: _async_game_engine},
+    }
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, **_async_routing
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def drop_game_databases(game_ids) -> None:
+    """PER_GAME のとき、game_ids のファイルを消す（行を消して commit した後に呼ぶ）。SHARED では何もしない。"""
+    if game_databases is not None:
+        async_game_databases.close(game_ids)
+        game_databases.drop(game_ids)
+
+
+def drop_all_game_databases() -> None:
+    if game_databases is not None:
+        async_game_databases.close_all()
+        game_databases.drop_all()
 
 Base = declarative_base()
 
 
+def ensure_schema() -> None:
+    """
+    起動時に既存 DB を現行モデルに合わせてアップグレードする。
+    create_all() の後に呼ぶこと。
+    """
+    ensure_room_members_schema()
+    ensure_version_columns()
+    ensure_alive_count_columns()
+    ensure_rng_seed_column()
+    ensure_indexes()
+
+
+def _add_missing_columns(conn, table: str, columns: dict[str, str]) -> None:
+    """table に無い列だけ ALTER TABLE ... ADD COLUMN する（DDL は SQLite / PostgreSQL 共通の書き方で渡す）。"""
+    inspector = sa_inspect(conn)
+    if not inspector.has_table(table):
+        # テーブル未作成（create_all 前）
+        return
+    existing = {col["name"] for col in inspector.get_columns(table)}
+    for name, ddl in columns.items():
+        if name not in existing:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+
+def ensure_version_columns() -> None:
+    """
+    ETag 用のバージョン列（games.version / rooms.version）を既存 DB に追加する。
+    """
+    with engine.begin() as conn:
+        _add_missing_columns(conn, "games", {"version": "INTEGER NOT NULL DEFAULT 0"})
+        _add_missing_columns(conn, "rooms", {"version": "INTEGER NOT NULL DEFAULT 0"})
+
+
+def ensure_alive_count_columns() -> None:
+    """
+    生存者数カウンタ（games.alive_wolf_count / alive_village_count）を既存 DB に追加する。
+    既存のゲームは NULL のまま（判定時にメンバーから数え直す）。
+    """
+    with engine.begin() as conn:
+        _add_missing_columns(conn, "games", {
+            "alive_wolf_count": "INTEGER",
+            "alive_village_count": "INTEGER",
+        })
+
+
+def ensure_rng_seed_column() -> None:
+    """
+    ゲームごとの乱数の seed（games.rng_seed）を既存 DB に追加する。
+    既存のゲームは NULL のまま（最初の乱択で付ける）。
+    """
+    with engine.begin() as conn:
+        _add_missing_columns(conn, "games", {"rng_seed": "BIGINT"})
+
+
+def _existing_tables_and_indexes(conn) -> tuple[set[str], set[str]]:
+    if conn.dialect.name == "sqlite":
+        # PRAGMA index_list は他接続でのスキーマ変更を反映しないことがあるので sqlite_master を読む
+        rows = conn.exec_driver_sql("SELECT type, name FROM sqlite_master").fetchall()
+        return (
+            {name for type_, name in rows if type_ == "table"},
+            {name for type_, name in rows if type_ == "index"},
+        )
+    inspector = sa_inspect(conn)
+    tables = set(inspector.get_table_names())
+    indexes = {
+        index["name"]
+        for table in tables
+        for index in inspector.get_indexes(table)
+    }
+    return tables, indexes
+
+
+def _duplicate_keys(conn, table: str, cols: list[str], limit: int = 10) -> tuple[int, list[tuple]]:
+    """cols が同じ行が2行以上あるキーの数と、ログに出す先頭 limit 件のキー（と行数）を返す。"""
+    group = ", ".join(cols)
+    duplicated = f"SELECT {group}, COUNT(*) FROM {table} GROUP BY {group} HAVING COUNT(*) > 1"
+    total = conn.exec_driver_sql(f"SELECT COUNT(*) FROM ({duplicated}) dup").scalar()
+    if not total:
+        return 0, []
+    rows = conn.exec_driver_sql(f"{duplicated} ORDER BY {group} LIMIT {int(limit)}").fetchall()
+    return total, [tuple(row) for row in rows]
+
+
+def _delete_duplicate_rows(conn, table: str, cols: list[str]) -> int:
+    """
+    cols が同じ行のうち、最後に入った1行（SQLite は rowid、PostgreSQL は ctid が最大）だけ残す。
+    消した行数を返す。
+    """
+    if conn.dialect.name == "sqlite":
+        result = conn.exec_driver_sql(
+            f"DELETE FROM {table} WHERE rowid NOT IN "
+            f"(SELECT MAX(rowid) FROM {table} GROUP BY {', '.join(cols)})"
+        )
+        return result.rowcount
+    if conn.dialect.name == "postgresql":
+        same_key = " AND ".join(f"a.{c} = b.{c}" for c in cols)
+        result = conn.exec_driver_sql(
+            f"DELETE FROM {table} a USING {table} b WHERE a.ctid < b.ctid AND {same_key}"
+        )
+        return result.rowcount
+    # それ以外の DB は重複があれば CREATE UNIQUE INDEX がエラーになる（手で直す）
+    return 0
+
+
+def ensure_indexes() -> None:
+    """
+    モデルの __table_args__ に定義したインデックスを既存 DB に作る。
+    create_all() は既存テーブルにインデックスを足さないため、起動時にここで補う。
+    一意制約が無かった頃の同時投票で、同じキーの行が二重登録されていることがある。
+    既定ではその行を消さず、重複キーを warning で出してその一意インデックスだけ作らない。
+    config.DEDUPE_ON_UNIQUE_INDEX が有効なら、最後に入った1行だけ残して消し、消した行数を warning で出す。
+    """
+    with engine.begin() as conn:
+        existing_tables, existing_indexes = _existing_tables_and_indexes(conn)
+        for table in Base.metadata.tables.values():
+            if table.name not in existing_tables:
+                continue
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                if index.name in existing_indexes:
+                    continue
+                if index.unique:
+                    cols = [c.name for c in index.columns]
+                    duplicate_count, sample = _duplicate_keys(conn, table.name, cols)
+                    if duplicate_count and not config.DEDUPE_ON_UNIQUE_INDEX:
+                        logger.warning(
+                            "not creating unique index %s: %s has %d duplicated keys (%s, count): %s; "
+                            "fix them by hand or set JINROU_DEDUPE_ON_UNIQUE_INDEX=1 to keep the latest row of each",
+                            index.name, table.name, duplicate_count, ", ".join(cols), sample,
+                        )
+                        continue
+                    if duplicate_count:
+                        removed = _delete_duplicate_rows(conn, table.name, cols)
+                        logger.warning(
+                            "deleted %d duplicate rows from %s (%d keys) before creating unique index %s",
+                            removed, table.name, duplicate_count, index.name,
+                        )
+                index.create(bind=conn)
+
+
 def ensure_room_members_schema() -> None:
     """
-    SQLite では Base.metadata.create_all() では既存テーブルに列が追加されない。
+    Base.metadata.create_all() では既存テーブルに列が追加されない。
     司会フラグ（is_host）が欠落している既存 DB を自動でアップグレードする。
     """
     with engine.begin() as conn:
-        result = conn.exec_driver_sql("PRAGMA table_info(room_members)")
-        columns = {row[1] for row in result.fetchall()}
-        if not columns:
-            # テーブル未作成（create_all 前）か、まだゲーム機能未使用
-            return
-        if "is_host" not in columns:
-            conn.exec_driver_sql(
-                "ALTER TABLE room_members "
-                "ADD COLUMN is_host BOOLEAN NOT NULL DEFAULT 0"
-            )
+        # 未作成（create_all 前か、まだゲーム機能未使用）なら何もしない
+        _add_missing_columns(conn, "room_members", {"is_host": "BOOLEAN NOT NULL DEFAULT false"})
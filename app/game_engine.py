@@ -0,0 +1,212 @@
+# app/game_engine.py
+"""
+進行中ゲームの状態をメモリ上に保持する GameEngine。
+
+Game.version 時点のスナップショット（フェーズ・メンバー・役職・生存・当日/当夜の行動済み者）を
+ゲームごとに持ち、version が変わらない限り GameMember や投票テーブルを読まずに
+状態取得 API に答える。確認に使うのは games の主キー1行（version 列）だけ。
+
+書き込みは従来どおり各エンドポイントで SQLite に commit する（DB が正）。
+投票・夜行動のような差分は commit 直後に record_action() でスナップショットへ反映し、
+フェーズ遷移などそれ以外の更新は version の不一致で検知して DB から読み直す。
+プロセス再起動後や別ワーカーで更新された場合も、version 比較で同じように追従する。
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+
+from sqlalchemy.orm import Session
+
+from .models.game import Game, GameMember, DayVote, WolfVote, SeerInspect
+from .models.knight import KnightGuard
+from .models.room import RoomMember
+from .schemas.game import GameOut
+
+# メモリに残すゲーム数の上限（古いものから捨てる）
+MAX_CACHED_GAMES = 256
+
+# record_action() の kind
+ACTION_DAY_VOTE = "day_vote"
+ACTION_WOLF_VOTE = "wolf_vote"
+ACTION_SEER_INSPECT = "seer_inspect"
+ACTION_KNIGHT_GUARD = "knight_guard"
+
+
+@dataclass(frozen=True)
+class MemberState:
+    """GameMember 1人分（RoomMember の司会フラグ込み）。"""
+    id: str
+    game_id: str
+    room_member_id: str
+    display_name: str
+    avatar_url: str | None
+    role_type: str | None
+    team: str | None
+    alive: bool
+    order_no: int
+    is_host: bool
+
+
+@dataclass(frozen=True)
+class GameEngine:
+    """
+    1ゲーム分のスナップショット。version と一致している間だけ有効。
+    読み取り中のスレッドがいても安全なように、更新は差し替え（replace）で行う。
+    """
+    game: GameOut
+    vote_round: int
+    members: tuple[MemberState, ...]
+    # curr_day の昼投票 / curr_night の夜行動を済ませたメンバー
+    day_voters: frozenset[str] = field(default_factory=frozenset)
+    wolf_voters: frozenset[str] = field(default_factory=frozenset)
+    seer_inspectors: frozenset[str] = field(default_factory=frozenset)
+    knight_guards: frozenset[str] = field(default_factory=frozenset)
+
+    @property
+    def id(self) -> str:
+        return self.game.id
+
+    @property
+    def version(self) -> int:
+        return self.game.version
+
+    @property
+    def alive_members(self) -> list[MemberState]:
+        return [m for m in self.members if m.alive]
+
+    def member(self, member_id: str) -> MemberState | None:
+        return next((m for m in self.members if m.id == member_id), None)
+
+    @classmethod
+    def load(cls, db: Session, game_id: str) -> "GameEngine | None":
+        """DB から組み立てる（起動直後・version 不一致時の再構築）。"""
+        game = db.get(Game, game_id)
+        if game is None:
+            return None
+
+        rows = (
+            db.query(GameMember, RoomMember.is_host)
+            .outerjoin(RoomMember, RoomMember.id == GameMember.room_member_id)
+            .filter(GameMember.game_id == game_id)
+            .order_by(GameMember.order_no.asc(), GameMember.id.asc())
+            .all()
+        )
+        members: list[MemberState] = []
+        seen_room_members: set[str] = set()
+        for gm, is_host in rows:
+            # assign_roles の旧実装で作られた重複は1件目だけ使う（_fetch_unique_game_members と同じ）
+            if gm.room_member_id in seen_room_members:
+                continue
+            seen_room_members.add(gm.room_member_id)
+            members.append(
+                MemberState(
+                    id=gm.id,
+                    game_id=gm.game_id,
+                    room_member_id=gm.room_member_id,
+                    display_name=gm.display_name,
+                    avatar_url=gm.avatar_url,
+                    role_type=gm.role_type,
+                    team=gm.team,
+                    alive=bool(gm.alive),
+                    order_no=gm.order_no,
+                    is_host=bool(is_host),
+                )
+            )
+
+        def actors(column, *criteria) -> frozenset[str]:
+            return frozenset(mid for (mid,) in db.query(column).filter(*criteria).distinct().all())
+
+        return cls(
+            game=GameOut.model_validate(game),
+            vote_round=int(game.vote_round or 0),
+            members=tuple(members),
+            day_voters=actors(
+                DayVote.voter_member_id,
+                DayVote.game_id == game_id, DayVote.day_no == game.curr_day,
+            ),
+            wolf_voters=actors(
+                WolfVote.wolf_member_id,
+                WolfVote.game_id == game_id, WolfVote.night_no == game.curr_night,
+            ),
+            seer_inspectors=actors(
+                SeerInspect.seer_member_id,
+                SeerInspect.game_id == game_id, SeerInspect.night_no == game.curr_night,
+            ),
+            knight_guards=actors(
+                KnightGuard.knight_member_id,
+                KnightGuard.game_id == game_id, KnightGuard.night_no == game.curr_night,
+            ),
+        )
+
+
+_ENGINES: "OrderedDict[str, GameEngine]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def get_game_engine(db: Session, game_id: str) -> GameEngine | None:
+    """
+    game_id の GameEngine を返す（ゲームが無ければ None）。
+    DB の version と一致していればメモリ上のものをそのまま使い、違えば読み直す。
+    """
+    version = db.query(Game.version).filter(Game.id == game_id).scalar()
+    if version is None:
+        discard(game_id)
+        return None
+
+    with _LOCK:
+        engine = _ENGINES.get(game_id)
+        if engine is not None and engine.version == version:
+            _ENGINES.move_to_end(game_id)
+            return engine
+
+    engine = GameEngine.load(db, game_id)
+    if engine is None:
+        return None
+    with _LOCK:
+        current = _ENGINES.get(game_id)
+        # 並行して新しい version が入っていたらそちらを残す
+        if current is None or current.version <= engine.version:
+            _ENGINES[game_id] = engine
+            _ENGINES.move_to_end(game_id)
+        while len(_ENGINES) > MAX_CACHED_GAMES:
+            _ENGINES.popitem(last=False)
+    return engine
+
+
+def record_action(game_id: str, version: int, kind: str, *member_ids: str) -> None:
+    """
+    投票・夜行動の commit 直後に呼ぶ。version はその transaction で確定した Game.version、
+    member_ids はその transaction で行動したメンバー（一括投票なら複数）。
+    手元のスナップショットが直前の version（version - 1）なら差分だけ反映して進める。
+    それ以外（間に別の更新があった等）は捨てて、次の読み取りで DB から組み立て直す。
+    """
+    with _LOCK:
+        engine = _ENGINES.get(game_id)
+        if engine is None or engine.version >= version:
+            return
+        if engine.version != version - 1:
+            _ENGINES.pop(game_id, None)
+            return
+
+        attr = {
+            ACTION_DAY_VOTE: "day_voters",
+            ACTION_WOLF_VOTE: "wolf_voters",
+            ACTION_SEER_INSPECT: "seer_inspectors",
+            ACTION_KNIGHT_GUARD: "knight_guards",
+        }[kind]
+        _ENGINES[game_id] = replace(
+            engine,
+            game=engine.game.model_copy(update={"version": version}),
+            **{attr: getattr(engine, attr) | set(member_ids)},
+        )
+
+
+def discard(game_id: str) -> None:
+    with _LOCK:
+        _ENGINES.pop(game_id, None)
+
+
+def clear() -> None:
+    """全ゲーム分を捨てる（DB を作り直すデバッグ API 用）。"""
+    with _LOCK:
+        _ENGINES.clear()
@@ -0,0 +1,394 @@
+# app/game_log.py
+"""
+ゲームのイベントログ（game_events）と再生。
+
+各エンドポイントは状態を変える transaction の中で、起きたこと（投票・夜行動・フェーズ遷移）を
+1件以上のイベントとして追記する（app/api/v1/games.py の _commit_action に events を渡す）。
+投票テーブルの行は決選投票の開始時に消えるが、ログには残る。
+
+乱択（役職配布・同票の決着・初日白通知）は、ゲームの seed（Game.rng_seed）と乱択ごとの key
+（("night", night_no) など）から draw_seed() で導いた seed で shuffled() / choice() を行い、
+seed・key と候補・結果をイベントに記録する。key が同じなら何度引いても同じ結果になるので、
+プレビュー（night_result）と確定（resolve_night_simple）が食い違わず、他のゲームや
+プロセス内の乱数の消費順にも左右されない。replay() はログを先頭から適用してゲームの状態を
+メモリ上に組み立て直し、乱択のイベントでは seed を導き直して引き直し、記録と一致するか確かめる。
+観戦者の途中参加・終局後の振り返り・障害後の確認は、ここで1本のログを読むだけで済む。
+
+ログを書くようになる前に作られたゲームにはイベントが無い（replay_game は None を返す）。
+"""
+import hashlib
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .db import discard_if_game_commit_fails, routes_games
+from .models.game import Game
+from .models.game_event import GameEvent
+
+# イベントの種類と payload
+# 作成: room_id, settings, members=[{id, room_member_id, display_name, order_no}]
+# ゲームの seed は games.rng_seed にだけ置く（ログは /log で読めるので、入れると先の乱択が読まれる）
+EVENT_GAME_CREATED = "game_created"
+# 乱択のイベントには seed と、それを導いた draw_key（draw_seed() の key）が入る
+# 役職配布: seed, draw_key, order=[member_id, ...]（shuffle 後の並び）, roles=[[role_type, team], ...]
+EVENT_ROLES_ASSIGNED = "roles_assigned"
+EVENT_GAME_STARTED = "game_started"
+# デバッグ用の強制変更: status / members={id: {role_type, team, alive}}, reset_votes
+EVENT_STATUS_FORCED = "status_forced"
+EVENT_MEMBERS_OVERRIDDEN = "members_overridden"
+# 投票: day_no, votes={voter_id: target_id} / night_no, votes={wolf_id: {target_member_id, priority_level, points}}
+EVENT_DAY_VOTE = "day_vote"
+EVENT_WOLF_VOTE = "wolf_vote"
+# 夜行動: night_no（霊媒は day_no）, *_member_id, target_member_id, is_wolf
+EVENT_SEER_INSPECT = "seer_inspect"
+EVENT_KNIGHT_GUARD = "knight_guard"
+EVENT_MEDIUM_INSPECT = "medium_inspect"
+# 投票・夜行動の行（卓のファイルの GAME_TABLES）を書く transaction のイベント
+ACTION_EVENTS = frozenset({
+    EVENT_DAY_VOTE, EVENT_WOLF_VOTE, EVENT_SEER_INSPECT, EVENT_KNIGHT_GUARD, EVENT_MEDIUM_INSPECT,
+})
+# 初日白通知: seed, seer_member_id, target_member_id
+EVENT_SEER_FIRST_WHITE = "seer_first_white"
+# 決選投票の開始（当日の投票は消える）: day_no, candidate_ids
+EVENT_RUNOFF_STARTED = "runoff_started"
+# 昼の処刑: day_no, seed, candidate_ids, executed_member_id
+EVENT_DAY_RESOLVED = "day_resolved"
+# 夜明け: night_no, seed, candidate_ids, target_member_id, guarded, killed_member_id
+EVENT_NIGHT_RESOLVED = "night_resolved"
+
+# フェーズ遷移のあるイベントは、遷移後の値を payload にそのまま入れる（再生時に上書きする）
+PHASE_KEYS = ("status", "started", "curr_day", "curr_night", "vote_round")
+
+
+class ReplayError(Exception):
+    """再生で引き直した乱択が記録と食い違った（ログか乱択の手順が壊れている）。"""
+
+
+# -----------------------------
+# 乱択
+# -----------------------------
+def new_seed() -> int:
+    """ゲームの seed（作成時に指定が無ければこれ）。"""
+    return random.getrandbits(63)
+
+
+def draw_seed(game_seed: int, *key) -> int:
+    """
+    ゲームの seed と key（JSON にできる値の並び）から、乱択1回ぶんの seed（63bit）を導く。
+    同じ (game_seed, key) なら常に同じ値。
+    """
+    data = json.dumps([game_seed, *key], separators=(",", ":")).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big") >> 1
+
+
+def shuffled(seed: int, items: Iterable) -> list:
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    return items
+
+
+def choice(seed: int, items: Iterable):
+    return random.Random(seed).choice(list(items))
+
+
+# -----------------------------
+# 書き込み・読み込み
+# -----------------------------
+def append(db: Session, game_id: str, version, events: Iterable[tuple[str, dict]]) -> None:
+    """
+    events（(種類, payload) の列）をその場で INSERT する。commit は呼び出し側。
+    version は int か、同じ transaction で進めた games.version を読む SQL 式。
+    書き込みロック中に呼ばれるので、ORM の flush を通さず Core の INSERT 1文で入れる。
+    """
+    rows = [
+        {
+            "game_id": game_id,
+            "type": kind,
+            "payload": json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+        }
+        for kind, payload in events
+    ]
+    if not rows:
+        return
+    stmt = insert(GameEvent.__table__)
+    if isinstance(version, int):
+        for row in rows:
+            row["version"] = version
+    else:
+        stmt = stmt.values(version=version)
+    if not routes_games(db):
+        db.connection().execute(stmt, rows)
+        return
+    # PER_GAME: 行動の行は卓のファイルに入る。その commit が本体の後で失敗したら、行動のイベントを消す
+    written = db.connection().execute(stmt.returning(GameEvent.id, GameEvent.type), rows).all()
+    discard_if_game_commit_fails(
+        db, GameEvent.__table__, [event_id for event_id, kind in written if kind in ACTION_EVENTS],
+    )
+
+
+def load_events(
+    db: Session,
+    game_id: str,
+    *,
+    after_id: int = 0,
+    limit: int | None = None,
+) -> list[GameEvent]:
+    """game_id のイベントを発生順に読む（after_id より後ろだけ / 先頭から limit 件まで）。"""
+    query = (
+        db.query(GameEvent)
+        .filter(GameEvent.game_id == game_id, GameEvent.id > after_id)
+        .order_by(GameEvent.id.asc())
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+# -----------------------------
+# 再生
+# -----------------------------
+@dataclass
+class ReplayMember:
+    id: str
+    room_member_id: str
+    display_name: str
+    order_no: int
+    role_type: str | None = None
+    team: str | None = None
+    alive: bool = True
+
+
+@dataclass
+class ReplayState:
+    """ログを offset 件目まで適用したゲームの状態（Game の列の初期値は app/models/game.py と同じ）。"""
+    game_id: str
+    room_id: str | None = None
+    # ゲームの seed（ログを書く前から続くゲームでは None。乱択の seed は突き合わせない）
+    rng_seed: int | None = None
+    status: str = "WAITING"
+    started: bool = False
+    curr_day: int = 1
+    curr_night: int = 1
+    vote_round: int = 0
+    # 適用したイベントの数・最後のイベントの id / version
+    offset: int = 0
+    last_event_id: int = 0
+    version: int = 0
+    settings: dict = field(default_factory=dict)
+    members: dict[str, ReplayMember] = field(default_factory=dict)
+    # {day_no: {voter_id: target_id}}（決選投票で消された分は含まない）
+    day_votes: dict[int, dict[str, str]] = field(default_factory=dict)
+    # {night_no: {wolf_id: {target_member_id, priority_level, points}}}
+    wolf_votes: dict[int, dict[str, dict]] = field(default_factory=dict)
+    seer_inspects: list[dict] = field(default_factory=list)
+    knight_guards: list[dict] = field(default_factory=list)
+    medium_inspects: list[dict] = field(default_factory=list)
+    runoff_candidate_ids: list[str] = field(default_factory=list)
+    seer_first_white_target_id: str | None = None
+    last_executed_member_id: str | None = None
+
+    def ordered_members(self) -> list[ReplayMember]:
+        return sorted(self.members.values(), key=lambda m: (m.order_no, m.id))
+
+
+def _check_draw(kind: str, expected, recorded) -> None:
+    if expected != recorded:
+        raise ReplayError(f"{kind}: replayed {expected!r}, recorded {recorded!r}")
+
+
+def _check_seed(kind: str, state: ReplayState, p: dict) -> None:
+    """記録した seed がゲームの seed と draw_key から導いたものか確かめる。"""
+    if state.rng_seed is not None and "draw_key" in p:
+        _check_draw(kind, draw_seed(state.rng_seed, *p["draw_key"]), p["seed"])
+
+
+def _apply_game_created(state: ReplayState, p: dict, verify: bool) -> None:
+    state.room_id = p["room_id"]
+    if state.rng_seed is None:
+        # 以前のログは payload に seed を入れていた
+        state.rng_seed = p.get("rng_seed")
+    state.settings = dict(p.get("settings") or {})
+    state.members = {
+        m["id"]: ReplayMember(
+            id=m["id"],
+            room_member_id=m["room_member_id"],
+            display_name=m["display_name"],
+            order_no=m["order_no"],
+        )
+        for m in p["members"]
+    }
+
+
+def _apply_roles_assigned(state: ReplayState, p: dict, verify: bool) -> None:
+    if verify:
+        _check_seed(EVENT_ROLES_ASSIGNED, state, p)
+        order = shuffled(p["seed"], [m.id for m in state.ordered_members()])
+        _check_draw(EVENT_ROLES_ASSIGNED, order, p["order"])
+    for member_id, (role_type, team) in zip(p["order"], p["roles"]):
+        member = state.members[member_id]
+        member.role_type, member.team = role_type, team
+
+
+def _apply_members_overridden(state: ReplayState, p: dict, verify: bool) -> None:
+    for member_id, values in p["members"].items():
+        member = state.members[member_id]
+        member.role_type = values["role_type"]
+        member.team = values["team"]
+        member.alive = values["alive"]
+    if p.get("reset_votes"):
+        # debug の set_game_members と同じく霊媒の結果は残す
+        state.day_votes.clear()
+        state.wolf_votes.clear()
+        state.seer_inspects.clear()
+        state.knight_guards.clear()
+
+
+def _apply_day_vote(state: ReplayState, p: dict, verify: bool) -> None:
+    state.day_votes.setdefault(p["day_no"], {}).update(p["votes"])
+
+
+def _apply_wolf_vote(state: ReplayState, p: dict, verify: bool) -> None:
+    state.wolf_votes.setdefault(p["night_no"], {}).update(p["votes"])
+
+
+def _apply_seer_inspect(state: ReplayState, p: dict, verify: bool) -> None:
+    state.seer_inspects.append(p)
+
+
+def _apply_knight_guard(state: ReplayState, p: dict, verify: bool) -> None:
+    state.knight_guards.append(p)
+
+
+def _apply_medium_inspect(state: ReplayState, p: dict, verify: bool) -> None:
+    state.medium_inspects.append(p)
+
+
+def seer_white_candidates(members: Iterable, seer_id: str) -> list:
+    """初日白通知の候補（人狼・役職未配布・占い師本人以外）。members は order_no 順で渡す。"""
+    return [m for m in members if m.role_type is not None and m.role_type != "WEREWOLF" and m.id != seer_id]
+
+
+def _apply_seer_first_white(state: ReplayState, p: dict, verify: bool) -> None:
+    if verify:
+        _check_seed(EVENT_SEER_FIRST_WHITE, state, p)
+        candidates = [m.id for m in seer_white_candidates(state.ordered_members(), p["seer_member_id"])]
+        _check_draw(EVENT_SEER_FIRST_WHITE, choice(p["seed"], candidates), p["target_member_id"])
+    state.seer_first_white_target_id = p["target_member_id"]
+
+
+def _apply_runoff_started(state: ReplayState, p: dict, verify: bool) -> None:
+    state.runoff_candidate_ids = list(p["candidate_ids"])
+    state.day_votes.pop(p["day_no"], None)
+
+
+def day_vote_leaders(votes: dict[str, str]) -> list[str]:
+    """昼投票の最多得票者（target_member_id の昇順）。"""
+    counts: dict[str, int] = {}
+    for target_id in votes.values():
+        counts[target_id] = counts.get(target_id, 0) + 1
+    if not counts:
+        return []
+    max_votes = max(counts.values())
+    return sorted(target_id for target_id, count in counts.items() if count == max_votes)
+
+
+def _apply_day_resolved(state: ReplayState, p: dict, verify: bool) -> None:
+    executed_id = p["executed_member_id"]
+    if verify:
+        _check_seed(EVENT_DAY_RESOLVED, state, p)
+        candidates = day_vote_leaders(state.day_votes.get(p["day_no"], {}))
+        _check_draw(EVENT_DAY_RESOLVED, candidates, p["candidate_ids"])
+        _check_draw(EVENT_DAY_RESOLVED, choice(p["seed"], candidates), executed_id)
+    state.members[executed_id].alive = False
+    state.last_executed_member_id = executed_id
+    state.runoff_candidate_ids = []
+
+
+def _apply_night_resolved(state: ReplayState, p: dict, verify: bool) -> None:
+    if verify:
+        _check_seed(EVENT_NIGHT_RESOLVED, state, p)
+        points: dict[str, int] = {}
+        for vote in state.wolf_votes.get(p["night_no"], {}).values():
+            points[vote["target_member_id"]] = points.get(vote["target_member_id"], 0) + (vote["points"] or 0)
+        candidates = []
+        if points:
+            max_points = max(points.values())
+            candidates = [m.id for m in state.ordered_members() if points.get(m.id) == max_points]
+        _check_draw(EVENT_NIGHT_RESOLVED, candidates, p["candidate_ids"])
+        if candidates:
+            _check_draw(EVENT_NIGHT_RESOLVED, choice(p["seed"], candidates), p["target_member_id"])
+    if p["killed_member_id"]:
+        state.members[p["killed_member_id"]].alive = False
+
+
+def _apply_nothing(state: ReplayState, p: dict, verify: bool) -> None:
+    pass
+
+
+_APPLY = {
+    EVENT_GAME_CREATED: _apply_game_created,
+    EVENT_ROLES_ASSIGNED: _apply_roles_assigned,
+    EVENT_GAME_STARTED: _apply_nothing,
+    EVENT_STATUS_FORCED: _apply_nothing,
+    EVENT_MEMBERS_OVERRIDDEN: _apply_members_overridden,
+    EVENT_DAY_VOTE: _apply_day_vote,
+    EVENT_WOLF_VOTE: _apply_wolf_vote,
+    EVENT_SEER_INSPECT: _apply_seer_inspect,
+    EVENT_KNIGHT_GUARD: _apply_knight_guard,
+    EVENT_MEDIUM_INSPECT: _apply_medium_inspect,
+    EVENT_SEER_FIRST_WHITE: _apply_seer_first_white,
+    EVENT_RUNOFF_STARTED: _apply_runoff_started,
+    EVENT_DAY_RESOLVED: _apply_day_resolved,
+    EVENT_NIGHT_RESOLVED: _apply_night_resolved,
+}
+
+
+def replay(
+    game_id: str,
+    events: Iterable[GameEvent],
+    *,
+    rng_seed: int | None = None,
+    verify: bool = True,
+) -> ReplayState:
+    """
+    events を発生順に適用した状態を返す。verify=True なら乱択を seed から引き直して
+    記録と突き合わせ、食い違えば ReplayError。rng_seed はゲームの seed（games.rng_seed）。
+    """
+    state = ReplayState(game_id=game_id, rng_seed=rng_seed)
+    for event in events:
+        payload = json.loads(event.payload)
+        _APPLY[event.type](state, payload, verify)
+        for key in PHASE_KEYS:
+            if key in payload:
+                setattr(state, key, payload[key])
+        state.offset += 1
+        state.last_event_id = event.id
+        state.version = event.version
+    return state
+
+
+def replay_game(
+    db: Session,
+    game_id: str,
+    *,
+    offset: int | None = None,
+    verify: bool = True,
+) -> ReplayState | None:
+    """game_id のログを先頭から offset 件（省略時は全部）再生する。イベントが1件も無ければ None。"""
+    events = load_events(db, game_id, limit=offset)
+    if not events:
+        return None
+    rng_seed = db.query(Game.rng_seed).filter(Game.id == game_id).scalar()
+    return replay(game_id, events, rng_seed=rng_seed, verify=verify)
+
+
+def public_payload(event: GameEvent) -> dict:
+    """/log で返す payload。以前のログの game_created に入っている seed は外す。"""
+    payload = json.loads(event.payload)
+    if event.type == EVENT_GAME_CREATED:
+        payload.pop("rng_seed", None)
+    return payload
@@ -1,17 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from .db import Base, engine, ensure_room_members_schema
+from . import archive, config
+from .db import Base, async_engine, engine, ensure_schema
+from .metrics import metrics_middleware, router as metrics_router
+from .query_stats import query_stats_middleware
+from .static import CachedStaticFiles
 from .api.v1 import api_router as api_v1_router
 
 # モデルからテーブル作成（開発用）
 Base.metadata.create_all(bind=engine)
-ensure_room_members_schema()
+ensure_schema()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # 終了したゲームのアーカイブ（JINROU_ARCHIVE_INTERVAL_SEC=0 で止める）
+    archive_task = None
+    if config.ARCHIVE_INTERVAL_SEC > 0:
+        archive_task = asyncio.create_task(archive.run_periodically(config.ARCHIVE_INTERVAL_SEC))
+    yield
+    if archive_task is not None:
+        archive_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await archive_task
+    # aiosqlite の接続（接続ごとのスレッド）を閉じる
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title="Jinrou API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # ローカル開発用のCORS許可（静的サーバからのアクセス用）
@@ -26,15 +49,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# SQL 実行回数・DB 時間の計測（JINROU_QUERY_STATS=1 のときだけ数える）
+app.middleware("http")(query_stats_middleware)
+# ルートごとのリクエスト数・レイテンシ（/metrics）
+app.middleware("http")(metrics_middleware)
+
 # ▼ 追加：frontend ディレクトリを静的ファイルとして公開
+# （起動時に圧縮しておき、強い ETag / Cache-Control を付けて返す）
 app.mount(
     "/frontend",
-    StaticFiles(directory="frontend", html=True),
+    CachedStaticFiles(directory="frontend", html=True),
     name="frontend",
 )
 
 # ▼ 既存：API ルーター
 app.include_router(api_v1_router, prefix="/api")
+# Prometheus 形式のメトリクス
+app.include_router(metrics_router)
 
 
 @app.get("/")
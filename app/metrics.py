@@ -0,0 +1,176 @@
+# app/metrics.py
+"""
+Prometheus のテキスト形式で出す /metrics（外部ライブラリ・外部サービスなし）。
+
+- HTTP: ルートテンプレート（/api/games/{game_id}/day_vote など）ごとの
+  リクエスト数（ステータス別）・レイテンシのヒストグラム、処理中リクエスト数
+- ゲーム: 状態別のゲーム数・進行中のゲーム数（スクレイプ時に DB から数える）
+- リアルタイム: SSE / WebSocket / long-poll の購読数（app/realtime.py の hub）
+
+値はプロセスごと。--workers N で動かすときはワーカーごとの値になる。
+"""
+import threading
+import time
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .api.deps import get_db_dep
+from .models.game import ENDED_STATUSES, Game
+from .query_stats import route_template
+from .realtime import hub
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# レイテンシのバケット（秒）。Prometheus クライアントの既定値と同じ
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# ルートにマッチしなかったリクエスト（404、/frontend の静的ファイル）のラベル
+UNMATCHED_ROUTE = "unmatched"
+
+# 開始前・終了後以外を「進行中」とみなす
+INACTIVE_STATUSES = ("WAITING", *ENDED_STATUSES)
+
+_lock = threading.Lock()
+# {(method, route, status): n}
+_requests: dict[tuple[str, str, str], int] = {}
+# {(method, route): [bucket ごとの件数..., +Inf の件数, 合計秒]}
+_latency: dict[tuple[str, str], list[float]] = {}
+_in_flight = 0
+
+
+def _observe(method: str, route: str, status: int, seconds: float) -> None:
+    with _lock:
+        key = (method, route, str(status))
+        _requests[key] = _requests.get(key, 0) + 1
+        hist = _latency.get((method, route))
+        if hist is None:
+            hist = _latency[(method, route)] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[len(LATENCY_BUCKETS)] += 1
+        hist[-1] += seconds
+
+
+async def metrics_middleware(request: Request, call_next):
+    """
+    リクエスト数・レイテンシを数える。SSE などのストリーミングはレスポンス開始までの時間。
+    （WebSocket は HTTP ミドルウェアを通らないので、購読数のほうで見る）
+    """
+    global _in_flight
+    with _lock:
+        _in_flight += 1
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _in_flight -= 1
+        _observe(request.method, route_template(request) or UNMATCHED_ROUTE, status, elapsed)
+
+
+def reset() -> None:
+    """HTTP の累計を消す（テスト用）。"""
+    with _lock:
+        _requests.clear()
+        _latency.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+    return "{" + body + "}"
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def _http_lines() -> list[str]:
+    with _lock:
+        requests = sorted(_requests.items())
+        latency = sorted((key, list(hist)) for key, hist in _latency.items())
+        in_flight = _in_flight
+
+    lines = [
+        "# HELP jinrou_http_requests_total HTTP requests by route template and status code.",
+        "# TYPE jinrou_http_requests_total counter",
+    ]
+    for (method, route, status), n in requests:
+        lines.append(f"jinrou_http_requests_total{_labels(method=method, route=route, status=status)} {n}")
+
+    lines += [
+        "# HELP jinrou_http_request_duration_seconds HTTP request latency by route template.",
+        "# TYPE jinrou_http_request_duration_seconds histogram",
+    ]
+    for (method, route), hist in latency:
+        for bound, n in zip(LATENCY_BUCKETS, hist):
+            labels = _labels(method=method, route=route, le=_format_float(bound))
+            lines.append(f"jinrou_http_request_duration_seconds_bucket{labels} {n}")
+        count = hist[len(LATENCY_BUCKETS)]
+        lines.append(
+            f"jinrou_http_request_duration_seconds_bucket{_labels(method=method, route=route, le='+Inf')} {count}"
+        )
+        lines.append(f"jinrou_http_request_duration_seconds_sum{_labels(method=method, route=route)} "
+                     f"{_format_float(hist[-1])}")
+        lines.append(f"jinrou_http_request_duration_seconds_count{_labels(method=method, route=route)} {count}")
+
+    lines += [
+        "# HELP jinrou_http_requests_in_flight HTTP requests currently being handled.",
+        "# TYPE jinrou_http_requests_in_flight gauge",
+        f"jinrou_http_requests_in_flight {in_flight}",
+    ]
+    return lines
+
+
+def _game_lines(db: Session) -> list[str]:
+    by_status = dict(db.query(Game.status, func.count(Game.id)).group_by(Game.status).all())
+    active = sum(n for status, n in by_status.items() if status not in INACTIVE_STATUSES)
+
+    lines = [
+        "# HELP jinrou_games Games by status.",
+        "# TYPE jinrou_games gauge",
+    ]
+    for status, n in sorted(by_status.items()):
+        lines.append(f"jinrou_games{_labels(status=status)} {n}")
+    lines += [
+        "# HELP jinrou_active_games Games that have started and not finished.",
+        "# TYPE jinrou_active_games gauge",
+        f"jinrou_active_games {active}",
+    ]
+    return lines
+
+
+def _realtime_lines() -> list[str]:
+    lines = [
+        "# HELP jinrou_realtime_subscribers Open realtime subscriptions (game: SSE / long-poll, room: WebSocket).",
+        "# TYPE jinrou_realtime_subscribers gauge",
+    ]
+    for channel, n in sorted(hub.subscriber_counts_by_channel().items()):
+        lines.append(f"jinrou_realtime_subscribers{_labels(channel=channel)} {n}")
+    return lines
+
+
+def render(db: Session) -> str:
+    lines = _http_lines() + _game_lines(db) + _realtime_lines()
+    return "\n".join(lines) + "\n"
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(db: Session = Depends(get_db_dep)):
+    return PlainTextResponse(render(db), media_type=CONTENT_TYPE)
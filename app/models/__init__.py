@@ -2,6 +2,9 @@ from .profile import Profile
 from .room import Room, RoomRoster, RoomMember
 from .game import Game, GameMember, WolfVote
 from .knight import KnightGuard  # ← 追加
+from .shared_state import SharedState
+from .archive import GameArchive
+from .game_event import GameEvent
 
 __all__ = [
     "Profile",
@@ -12,4 +15,7 @@ __all__ = [
     "GameMember",
     "WolfVote",
     "KnightGuard",  # ← 追加
+    "SharedState",
+    "GameArchive",
+    "GameEvent",
 ]
@@ -0,0 +1,31 @@
+# app/models/archive.py
+
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String
+from datetime import datetime
+
+from ..db import Base
+
+
+class GameArchive(Base):
+    """
+    終了から一定時間たったゲームの圧縮スナップショット（app/archive.py）。
+    games / game_members / 投票・行動の行は消し、ここに1ゲーム1行で残す。
+    payload は gzip 圧縮した JSON。
+    """
+    __tablename__ = "game_archives"
+
+    # games.id（元の行は消えているので外部キーにはしない）
+    game_id = Column(String, primary_key=True)
+    room_id = Column(String, nullable=False)
+    # 終了時の status（FINISHED / VILLAGE_WIN / WOLF_WIN）
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # 圧縮前の JSON のバイト数（圧縮率の確認用）
+    raw_bytes = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index("ix_game_archives_room", "room_id"),
+    )
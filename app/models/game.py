@@ -1,11 +1,14 @@
 # app/models/game.py
 from sqlalchemy import (
+    BigInteger,
     Column,
     String,
     Integer,
     Boolean,
     ForeignKey,
     DateTime,
+    Index,
+    Text,
     func,
 )
 from sqlalchemy.orm import relationship
@@ -13,6 +16,9 @@ from datetime import datetime
 
 from ..db import Base
 
+# 終了したゲームの status（resolve_day は FINISHED、resolve_night は勝敗をそのまま入れる）
+ENDED_STATUSES = ("FINISHED", "VILLAGE_WIN", "WOLF_WIN")
+
 
 class Game(Base):
     __tablename__ = "games"
@@ -26,6 +32,20 @@ class Game(Base):
     vote_round = Column(Integer, nullable=False, default=0)
     tie_streak = Column(Integer, nullable=False, default=0)
 
+    # 状態が変わるたびに +1 する（ETag / 変更待ちに使う）
+    version = Column(Integer, nullable=False, default=0)
+
+    # ゲームごとの乱数の seed（役職配布・同票の決着・初日白通知）。app/game_log.py の draw_seed() で
+    # 乱択ごとの seed を導くので、同じ seed・同じ操作なら同じ結果になる。プレイヤーには返さない。
+    # NULL は導入前のゲーム（最初の乱択で付ける）
+    rng_seed = Column(BigInteger, nullable=True)
+
+    # 生存者数のカウンタ（勝敗判定用）。人狼（WEREWOLF）とそれ以外。
+    # 役職配布時に初期化し、alive が False になるたびに同じ transaction で減らす。
+    # NULL は未初期化（役職配布前・カウンタ導入前のゲーム）で、判定時にメンバーから数え直す
+    alive_wolf_count = Column(Integer, nullable=True)
+    alive_village_count = Column(Integer, nullable=True)
+
     show_votes_public = Column(Boolean, nullable=False, default=True)
     day_timer_sec = Column(Integer, nullable=False, default=300)
 
@@ -41,11 +61,22 @@ class Game(Base):
     started = Column(Boolean, nullable=False, default=False)
     finished_at = Column(DateTime, nullable=True)
 
+    # games ⇔ game_members は互いに参照し合うので、この2つの外部キーは名前を付けて
+    # テーブル作成後に ALTER TABLE で張る（PostgreSQL で drop_all / create_all できるように）
+
     # ★ 初日白通知ターゲット（GameMember.id）
-    seer_first_white_target_id = Column(String(36), ForeignKey("game_members.id"), nullable=True)
+    seer_first_white_target_id = Column(
+        String(36),
+        ForeignKey("game_members.id", use_alter=True, name="fk_games_seer_first_white_target_id"),
+        nullable=True,
+    )
 
     # ★ 直前の昼に処刑されたプレイヤー（霊媒用）
-    last_executed_member_id = Column(String(36), ForeignKey("game_members.id"), nullable=True)
+    last_executed_member_id = Column(
+        String(36),
+        ForeignKey("game_members.id", use_alter=True, name="fk_games_last_executed_member_id"),
+        nullable=True,
+    )
 
     members = relationship(
         "GameMember",
@@ -92,6 +123,12 @@ class GameMember(Base):
         foreign_keys=[game_id],   # ★ 明示
     )
 
+    __table_args__ = (
+        # 生存者の取得（勝敗判定・進捗）と order_no 順の一覧
+        Index("ix_game_members_game_alive", "game_id", "alive"),
+        Index("ix_game_members_game_order", "game_id", "order_no"),
+    )
+
 
 
 class WolfVote(Base):
@@ -109,6 +146,11 @@ class WolfVote(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # 人狼1人につき1夜1票（再投票は上書き）
+        Index("uq_wolf_vote_once_per_night", "game_id", "night_no", "wolf_member_id", unique=True),
+    )
+
 class DayVote(Base):
     __tablename__ = "day_votes"
 
@@ -119,6 +161,11 @@ class DayVote(Base):
     target_member_id = Column(String, ForeignKey("game_members.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # 1人1日1票（再投票は上書き、決選投票では当日分を消してから入れ直す）
+        Index("uq_day_vote_once_per_day", "game_id", "day_no", "voter_member_id", unique=True),
+    )
+
 class SeerInspect(Base):
     __tablename__ = "seer_inspects"
 
@@ -134,6 +181,11 @@ class SeerInspect(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # 占いは1夜1回
+        Index("uq_seer_inspect_once_per_night", "game_id", "night_no", "seer_member_id", unique=True),
+    )
+
 
 # app/models/game.py のどこかに追加
 class MediumInspect(Base):
@@ -150,3 +202,28 @@ class MediumInspect(Base):
     is_wolf = Column(Boolean, nullable=False)
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # 霊媒は1日1回
+        Index("uq_medium_inspect_once_per_day", "game_id", "day_no", "medium_member_id", unique=True),
+    )
+
+
+class NightOutcome(Base):
+    """
+    夜明けの確定結果。resolve_night_simple が1夜1行書き、night_result はこれを返す（app/night_outcome.py）。
+    投票の行が後で消えても、確定時点の結果と集計はここに残る。
+    """
+    __tablename__ = "night_outcomes"
+
+    game_id = Column(String, ForeignKey("games.id"), primary_key=True)
+    night_no = Column(Integer, primary_key=True)
+
+    # 襲撃先（投票が無ければ NULL）と、実際に死亡したメンバー（護衛成功・既に死亡なら NULL）
+    target_member_id = Column(String, ForeignKey("game_members.id"), nullable=True)
+    killed_member_id = Column(String, ForeignKey("game_members.id"), nullable=True)
+    guarded = Column(Boolean, nullable=False)
+    # 確定時点の狼投票の集計（JSON: {target_member_id: 合計ポイント}）
+    tally = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
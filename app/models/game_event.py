@@ -0,0 +1,27 @@
+# app/models/game_event.py
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from datetime import datetime
+
+from ..db import Base
+
+
+class GameEvent(Base):
+    """
+    ゲームで起きたこと（行動・フェーズ遷移）の追記専用ログ。app/game_log.py が書き、読み直して再生する。
+    id の昇順がゲーム内の発生順。version はその transaction で確定した Game.version。
+    payload は JSON 文字列（種類ごとの中身は app/game_log.py を参照）。
+    """
+    __tablename__ = "game_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game_id = Column(String, ForeignKey("games.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # ゲームごとに発生順で読む（再生・差分取得）
+        Index("ix_game_events_game_id", "game_id", "id"),
+    )
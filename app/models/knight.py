@@ -5,6 +5,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -41,4 +42,6 @@ class KnightGuard(Base):
             "game_id", "night_no", "knight_member_id",
             name="uq_knight_guard_once_per_night",
         ),
+        # 夜明け処理で「襲撃先が護衛されているか」を引く
+        Index("ix_knight_guards_game_night_target", "game_id", "night_no", "target_member_id"),
     )
@@ -1,5 +1,5 @@
 # app/models/room.py
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -16,6 +16,8 @@ class Room(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     # ★追加：現在進行中のゲーム
     current_game_id = Column(String, nullable=True)
+    # ルーム側の状態（roster / members / current_game_id）が変わるたびに +1 する
+    version = Column(Integer, nullable=False, default=0)
     roster = relationship("RoomRoster", back_populates="room", cascade="all, delete-orphan")
     members = relationship("RoomMember", back_populates="room", cascade="all, delete-orphan")
 
@@ -31,6 +33,10 @@ class RoomRoster(Base):
 
     room = relationship("Room", back_populates="roster")
 
+    __table_args__ = (
+        Index("ix_room_roster_room", "room_id"),
+    )
+
 
 class RoomMember(Base):
     __tablename__ = "room_members"
@@ -43,3 +49,8 @@ class RoomMember(Base):
     joined_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     room = relationship("Room", back_populates="members")
+
+    __table_args__ = (
+        # 部屋ごとの参加者一覧（joined_at 順）
+        Index("ix_room_members_room_joined", "room_id", "joined_at"),
+    )
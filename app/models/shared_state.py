@@ -0,0 +1,19 @@
+# app/models/shared_state.py
+
+from sqlalchemy import Column, String, Text, DateTime
+from datetime import datetime
+
+from ..db import Base
+
+
+class SharedState(Base):
+    """
+    ワーカー間で共有する小さな状態（決選投票の候補・役職公開フラグなど）。
+    app/state_store.py の DB バックエンドが使う。value は JSON 文字列。
+    """
+    __tablename__ = "shared_state"
+
+    namespace = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
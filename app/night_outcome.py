@@ -0,0 +1,109 @@
+# app/night_outcome.py
+"""
+夜明けの確定結果（襲撃先・護衛成功・集計）の保存と、プロセス内の LRU キャッシュ。
+
+resolve_night_simple は結果を night_outcomes に1夜1行書き、commit 後に put() でキャッシュへ入れる。
+朝画面がポーリングする night_result は、閉じた夜（過去の夜・当夜の解決後）なら
+キャッシュから返し、無ければ1行読んでキャッシュする。集計し直したり乱択を引き直したりしない。
+
+閉じた夜の結果は変わらないので、キャッシュは version で確かめずに使い続ける。
+例外は debug_set_status で同じ夜に戻したときで、そのときは discard() で捨ててから解決し直す
+（他のワーカーのキャッシュには古い結果が残る。デバッグ専用の操作なので許容する）。
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .models.game import Game, GameMember, NightOutcome
+from .schemas.night import NightResultOut, NightResultVictimOut
+
+# メモリに残す夜の数の上限（古いものから捨てる）
+MAX_CACHED_OUTCOMES = 1024
+
+_OUTCOMES: "OrderedDict[tuple[str, int], NightResultOut]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def is_closed(game: Game, night_no: int) -> bool:
+    """night_no の夜がもう動かないか（過去の夜、または当夜でも NIGHT フェーズを抜けた後）。"""
+    curr_night = game.curr_night or 0
+    return night_no < curr_night or (night_no == curr_night and game.status != "NIGHT")
+
+
+def build_result(game_id: str, night_no: int, target, guarded: bool) -> NightResultOut:
+    """襲撃先 target（id / display_name を持つ行、無ければ None）から night_result の応答を作る。"""
+    victim = None
+    if target is not None and not guarded:
+        victim = NightResultVictimOut(id=target.id, display_name=target.display_name)
+    return NightResultOut(game_id=game_id, night_no=night_no, guarded_success=guarded, victim=victim)
+
+
+def record(
+    db: Session,
+    game_id: str,
+    night_no: int,
+    *,
+    target,
+    guarded: bool,
+    killed_member_id: str | None,
+    tally: dict[str, int],
+) -> NightResultOut:
+    """
+    確定した結果を INSERT し（commit は呼び出し側）、commit 後に put() する応答を返す。
+    書き込みロック中に呼ばれるので、app/game_log.py の append と同じく Core の INSERT 1文で入れる。
+    """
+    db.connection().execute(insert(NightOutcome.__table__), {
+        "game_id": game_id,
+        "night_no": night_no,
+        "target_member_id": target.id if target is not None else None,
+        "killed_member_id": killed_member_id,
+        "guarded": guarded,
+        "tally": json.dumps(tally, separators=(",", ":")),
+    })
+    return build_result(game_id, night_no, target, guarded)
+
+
+def load(db: Session, game_id: str, night_no: int) -> NightResultOut | None:
+    """保存した結果を1クエリで読む（襲撃先の表示名は game_members から）。無ければ None。"""
+    row = (
+        db.query(NightOutcome.guarded, GameMember.id, GameMember.display_name)
+        .outerjoin(GameMember, GameMember.id == NightOutcome.target_member_id)
+        .filter(NightOutcome.game_id == game_id, NightOutcome.night_no == night_no)
+        .one_or_none()
+    )
+    if row is None:
+        return None
+    target = row if row.id is not None else None
+    return build_result(game_id, night_no, target, row.guarded)
+
+
+def get(game_id: str, night_no: int) -> NightResultOut | None:
+    with _LOCK:
+        result = _OUTCOMES.get((game_id, night_no))
+        if result is not None:
+            _OUTCOMES.move_to_end((game_id, night_no))
+        return result
+
+
+def put(result: NightResultOut) -> None:
+    with _LOCK:
+        _OUTCOMES[(result.game_id, result.night_no)] = result
+        _OUTCOMES.move_to_end((result.game_id, result.night_no))
+        while len(_OUTCOMES) > MAX_CACHED_OUTCOMES:
+            _OUTCOMES.popitem(last=False)
+
+
+def discard(game_id: str) -> None:
+    """game_id の夜の結果をすべて捨てる。"""
+    with _LOCK:
+        for key in [key for key in _OUTCOMES if key[0] == game_id]:
+            del _OUTCOMES[key]
+
+
+def clear() -> None:
+    """全ゲーム分を捨てる（DB を作り直すデバッグ API 用）。"""
+    with _LOCK:
+        _OUTCOMES.clear()
@@ -0,0 +1,135 @@
+# app/query_stats.py
+"""
+リクエストごとの SQL 実行回数・DB 時間の計測（JINROU_QUERY_STATS=1 で有効）。
+
+engine / async_engine の cursor イベントで数え、ミドルウェアが
+- レスポンスヘッダ X-DB-Queries（回数）/ X-DB-Time（ミリ秒）
+- ルート（"GET /api/games/{game_id}/view" など）ごとの累計（/api/debug/query_stats）
+に出す。計測中でないときのイベント処理は ContextVar を1回読むだけ。
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi import Request
+from sqlalchemy import event
+
+from . import config
+
+QUERIES_HEADER = "X-DB-Queries"
+TIME_HEADER = "X-DB-Time"
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+# 計測中のリクエスト（ミドルウェアがセットする）。ハンドラのスレッド / greenlet にも引き継がれる
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# ルートごとの累計: {"GET /api/games/{game_id}": {"requests": n, "queries": n, "seconds": s, "max_queries": n}}
+_routes: dict[str, dict] = {}
+_routes_lock = threading.Lock()
+
+# JINROU_QUERY_STATS で決まる既定値。テストでは True にして使う
+enabled = config.QUERY_STATS
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_stats_started")
+    stats.queries += 1
+    if started:
+        stats.seconds += time.perf_counter() - started.pop()
+
+
+def install(target_engine) -> None:
+    """engine（async なら .sync_engine）に計測用のイベントを付ける。"""
+    event.listen(target_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def collect():
+    """with の中で実行された SQL を数える（同じスレッド / タスク内のみ）。"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def route_template(request: Request) -> str | None:
+    """
+    マッチしたルートのパステンプレート（例: /api/games/{game_id}/view）。
+    ルート未解決（404 等）なら None。
+    """
+    template = getattr(request.scope.get("route"), "path", None)
+    if not template:
+        return None
+    # include_router した APIRoute の path には外側の prefix（/api）が含まれないので、
+    # 実パスの先頭から補う（テンプレートと同じ段数を末尾から対応させる）
+    segments = request.url.path.split("/")
+    depth = len(template.split("/")) - 1
+    return "/".join(segments[: len(segments) - depth]) + template
+
+
+def _route_key(request: Request) -> str:
+    """集計キー（例: GET /api/games/{game_id}/view）。ルート未解決（404 等）は実パスのまま。"""
+    return f"{request.method} {route_template(request) or request.url.path}"
+
+
+def _record_route(key: str, stats: QueryStats) -> None:
+    with _routes_lock:
+        agg = _routes.setdefault(key, {"requests": 0, "queries": 0, "seconds": 0.0, "max_queries": 0})
+        agg["requests"] += 1
+        agg["queries"] += stats.queries
+        agg["seconds"] += stats.seconds
+        agg["max_queries"] = max(agg["max_queries"], stats.queries)
+
+
+async def query_stats_middleware(request: Request, call_next):
+    if not enabled:
+        return await call_next(request)
+    with collect() as stats:
+        response = await call_next(request)
+    response.headers[QUERIES_HEADER] = str(stats.queries)
+    response.headers[TIME_HEADER] = f"{stats.seconds * 1000:.2f}"
+    _record_route(_route_key(request), stats)
+    return response
+
+
+def route_summary() -> list[dict]:
+    """ルートごとの累計（1リクエストあたりの平均つき）。クエリの多い順。"""
+    with _routes_lock:
+        items = [(key, dict(agg)) for key, agg in _routes.items()]
+    summary = []
+    for key, agg in items:
+        n = agg["requests"] or 1
+        summary.append({
+            "route": key,
+            "requests": agg["requests"],
+            "queries": agg["queries"],
+            "avg_queries": round(agg["queries"] / n, 2),
+            "max_queries": agg["max_queries"],
+            "avg_db_ms": round(agg["seconds"] * 1000 / n, 3),
+        })
+    summary.sort(key=lambda row: row["avg_queries"], reverse=True)
+    return summary
+
+
+def reset_routes() -> None:
+    with _routes_lock:
+        _routes.clear()
@@ -0,0 +1,101 @@
+# app/realtime.py
+"""
+ゲーム / ルーム単位の変更通知を配信するプロセス内ハブ。
+
+同期ハンドラ（スレッドプール上）からも publish できるように、
+購読側のイベントループへ call_soon_threadsafe で積む。
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+# 1購読あたりに溜める最大イベント数（クライアントは最新状態だけ分かればよい）
+SUBSCRIBER_QUEUE_SIZE = 16
+# SSE / long-poll / ルームチャネルの待機中に DB を読み直す間隔（秒）。
+# hub はプロセス内なので、別のワーカー（uvicorn --workers N）での更新はこちらで拾う
+WAIT_RECHECK_SEC = 2
+
+
+def game_topic(game_id: str) -> str:
+    return f"game:{game_id}"
+
+
+def room_topic(room_id: str) -> str:
+    return f"room:{room_id}"
+
+
+def _put_latest(queue: asyncio.Queue, event: dict) -> None:
+    """キューが詰まっていたら古いイベントを捨てて最新を積む。"""
+    while queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+    queue.put_nowait(event)
+
+
+class EventHub:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        """実行中のイベントループ上で購読キューを作る。"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[topic].add((loop, queue))
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subs = self._subscribers.get(topic)
+            if not subs:
+                return
+            for entry in [e for e in subs if e[1] is queue]:
+                subs.discard(entry)
+            if not subs:
+                self._subscribers.pop(topic, None)
+
+    @asynccontextmanager
+    async def subscription(self, topic: str):
+        queue = self.subscribe(topic)
+        try:
+            yield queue
+        finally:
+            self.unsubscribe(topic, queue)
+
+    def publish(self, topic: str, event: dict) -> None:
+        """どのスレッドからでも呼べる。購読者がいなければ何もしない。"""
+        with self._lock:
+            subs = list(self._subscribers.get(topic, ()))
+        for loop, queue in subs:
+            try:
+                loop.call_soon_threadsafe(_put_latest, queue, event)
+            except RuntimeError:
+                # ループ終了済み（切断直後など）は無視
+                pass
+
+    def subscriber_count(self, topic: str | None = None) -> int:
+        with self._lock:
+            if topic is not None:
+                return len(self._subscribers.get(topic, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def subscriber_counts_by_channel(self) -> dict[str, int]:
+        """トピックの種類（"game" / "room"）ごとの購読数。"""
+        counts = {"game": 0, "room": 0}
+        with self._lock:
+            for topic, subs in self._subscribers.items():
+                channel = topic.split(":", 1)[0]
+                counts[channel] = counts.get(channel, 0) + len(subs)
+        return counts
+
+
+hub = EventHub()
+
+
+def publish_room_event(room_id: str, event_type: str, **payload) -> None:
+    """ルームチャネル（/api/rooms/{room_id}/ws）向けのイベントを配信する。"""
+    hub.publish(room_topic(room_id), {"type": event_type, "room_id": room_id, **payload})
@@ -1,6 +1,6 @@
 # app/schemas/day.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class DayVoteCreate(BaseModel):
@@ -19,6 +19,32 @@ class DayVoteOut(BaseModel):
         from_attributes = True
 
 
+class DayVoteBatchCreate(BaseModel):
+    """ホスト端末などからまとめて送る昼投票（同じ voter が複数あれば後勝ち。前の件はエラーになる）"""
+    votes: list[DayVoteCreate] = Field(min_length=1, max_length=100)
+
+
+class VoteBatchItemError(BaseModel):
+    """一括投票で受け付けなかった1件分の理由（単発 API の HTTPException と同じ内容）"""
+    status_code: int
+    detail: str
+
+
+class DayVoteBatchItemOut(BaseModel):
+    index: int
+    voter_member_id: str
+    vote: DayVoteOut | None = None
+    error: VoteBatchItemError | None = None
+
+
+class DayVoteBatchOut(BaseModel):
+    game_id: str
+    day_no: int
+    accepted: int
+    rejected: int
+    results: list[DayVoteBatchItemOut]
+
+
 class DayTallyItem(BaseModel):
     target_member_id: str
     vote_count: int
@@ -1,6 +1,6 @@
 # app/schemas/game.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Literal
 
 RoleLiteral = Literal[
@@ -28,6 +28,8 @@ class GameSettings(BaseModel):
 class GameCreate(BaseModel):
     room_id: str
     settings: Optional[GameSettings] = None
+    # 乱数の seed（省略時はランダム）。同じ seed・同じ操作で同じ役職配布・決着を再現する（負荷試験・不具合の再現用）
+    seed: Optional[int] = Field(None, ge=0, lt=2**63)
 
 
 class GameOut(BaseModel):
@@ -38,6 +40,8 @@ class GameOut(BaseModel):
     curr_day: int
     curr_night: int
     last_executed_member_id: Optional[str] = None
+    # 状態が変わるたびに増える（long-poll の wait_for_version に渡す）
+    version: int = 0
 
     class Config:
         from_attributes = True
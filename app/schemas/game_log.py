@@ -0,0 +1,59 @@
+# app/schemas/game_log.py
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class GameEventOut(BaseModel):
+    """イベントログの1件（payload の中身は app/game_log.py の EVENT_* を参照）"""
+    id: int
+    version: int
+    type: str
+    payload: dict
+    created_at: datetime
+
+
+class GameLogOut(BaseModel):
+    """after_id より後ろのイベント。続きは next_after_id を after_id に渡して読む"""
+    game_id: str
+    events: list[GameEventOut]
+    next_after_id: int
+
+
+class ReplayMemberOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    room_member_id: str
+    display_name: str
+    order_no: int
+    role_type: str | None = None
+    team: str | None = None
+    alive: bool
+
+
+class ReplayStateOut(BaseModel):
+    """ログを offset 件目まで再生したゲームの状態（ゲームの seed は含めない）"""
+    model_config = ConfigDict(from_attributes=True)
+
+    game_id: str
+    room_id: str | None = None
+    status: str
+    started: bool
+    curr_day: int
+    curr_night: int
+    vote_round: int
+    offset: int
+    last_event_id: int
+    version: int
+    settings: dict
+    members: list[ReplayMemberOut]
+    day_votes: dict[int, dict[str, str]]
+    wolf_votes: dict[int, dict[str, dict]]
+    seer_inspects: list[dict]
+    knight_guards: list[dict]
+    medium_inspects: list[dict]
+    runoff_candidate_ids: list[str]
+    seer_first_white_target_id: str | None = None
+    last_executed_member_id: str | None = None
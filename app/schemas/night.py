@@ -1,8 +1,10 @@
 # app/schemas/night.py
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Literal
 
+from .day import VoteBatchItemError
+
 
 class WolfVoteCreate(BaseModel):
     """人狼が夜に投票する際のリクエストボディ"""
@@ -26,6 +28,26 @@ class WolfVoteOut(BaseModel):
     priority_level: int
 
 
+class WolfVoteBatchCreate(BaseModel):
+    """まとめて送る人狼投票（同じ wolf が複数あれば後勝ち。前の件はエラーになる）"""
+    votes: list[WolfVoteCreate] = Field(min_length=1, max_length=100)
+
+
+class WolfVoteBatchItemOut(BaseModel):
+    index: int
+    wolf_member_id: str
+    vote: WolfVoteOut | None = None
+    error: VoteBatchItemError | None = None
+
+
+class WolfVoteBatchOut(BaseModel):
+    game_id: str
+    night_no: int
+    accepted: int
+    rejected: int
+    results: list[WolfVoteBatchItemOut]
+
+
 class WolfTallyItem(BaseModel):
     """集計結果の1ターゲット分"""
     target_member_id: str
@@ -0,0 +1,28 @@
+# app/schemas/view.py
+from pydantic import BaseModel
+
+from .game import GameOut, GameMemberOut
+from .game_member import GameMemberMe
+from .day import DayVoteStatusOut
+from .night import NightActionsStatusOut
+
+
+class GameJudgeOut(BaseModel):
+    """勝敗判定（/judge と同じ内容）"""
+    result: str  # "ONGOING" / "VILLAGE_WIN" / "WOLF_WIN"
+    wolf_alive: int
+    village_alive: int
+    reason: str
+
+
+class GameViewOut(BaseModel):
+    """プレイ画面1枚分の描画に必要な情報をまとめたスナップショット"""
+    game: GameOut
+    me: GameMemberMe
+    members: list[GameMemberOut]
+    # 現在フェーズの進捗（昼なら day_vote、夜なら night_actions。それ以外は None）
+    day_vote: DayVoteStatusOut | None = None
+    night_actions: NightActionsStatusOut | None = None
+    judge: GameJudgeOut
+    is_runoff: bool = False
+    runoff_candidate_ids: list[str] = []
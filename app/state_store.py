@@ -0,0 +1,258 @@
+# app/state_store.py
+"""
+ワーカー（プロセス）間で共有する小さな状態のストア。
+
+決選投票の候補や役職公開フラグのように、DB のモデルに列を持たないが
+どのワーカーからも同じ値が見えなければならないものを namespace / key で保存する。
+値は JSON にできるもの（dict / list / bool / 数値 / 文字列）。
+
+バックエンドは JINROU_STATE_BACKEND で選ぶ（app/config.py）。
+- MEMORY: プロセス内の dict。uvicorn をワーカー1つで動かすとき用
+- DB:     shared_state テーブル。呼び出し側のセッションに載せるので、
+          ゲーム本体の更新と同じ commit で確定する（既定）
+- FILE:   JINROU_STATE_DIR 配下の JSON ファイル。同じマシン上のワーカーで共有する
+MEMORY / FILE も、set / delete は db の commit が成功した後に反映する（rollback なら捨てる）。
+"""
+import abc
+import json
+import os
+import tempfile
+import threading
+from typing import Any
+from urllib.parse import quote
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import config
+from .models.shared_state import SharedState
+
+# ゲームごとの状態の namespace（key は game_id）
+# 決選投票: {"day_no": int, "candidate_ids": [GameMember.id, ...]}
+RUNOFF_STATE_NS = "runoff"
+# 役職公開フラグ: bool
+REVEAL_ROLES_STATE_NS = "reveal_roles"
+
+
+class StateStore(abc.ABC):
+    """
+    共有状態ストアの共通インターフェース。
+    書き込みは db の transaction に合わせて確定する（commit で反映、rollback で破棄）。
+    """
+
+    @abc.abstractmethod
+    def get(self, db: Session, namespace: str, key: str, default: Any = None) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def set(self, db: Session, namespace: str, key: str, value: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    def delete(self, db: Session, namespace: str, key: str) -> None:
+        ...
+
+    def delete_keys(self, db: Session, namespace: str, keys: list[str]) -> None:
+        """keys をまとめて消す（ゲームのアーカイブ・削除用）。"""
+        for key in keys:
+            self.delete(db, namespace, key)
+
+
+# _CommitBoundStateStore の保留中の書き込みで、削除を表す値
+_DELETED = object()
+
+
+class _CommitBoundStateStore(StateStore):
+    """
+    DB の外に保存するストア（MEMORY / FILE）の共通部分。
+    set / delete はすぐには書かず db.info に溜め、db の commit が成功したら反映する。
+    rollback・close で transaction が終われば捨てるので、commit されなかった更新
+    （resolve_day_simple の決選投票の候補など）が残って DB と食い違うことはない。
+    同じセッションの get は溜めている値を返す。db が None なら即座に書く。
+    commit 後の反映自体が失敗した場合（ディスクフルなど）は、DB だけが確定した状態になる。
+    """
+
+    def get(self, db, namespace, key, default=None):
+        pending = self._pending(db)
+        if pending and (namespace, key) in pending:
+            raw = pending[(namespace, key)]
+        else:
+            raw = self._read(namespace, key)
+        # 呼び出し側で書き換えても共有値に影響しないよう JSON で持つ
+        return default if raw is None or raw is _DELETED else json.loads(raw)
+
+    def set(self, db, namespace, key, value):
+        self._stage(db, namespace, key, json.dumps(value))
+
+    def delete(self, db, namespace, key):
+        self._stage(db, namespace, key, _DELETED)
+
+    @abc.abstractmethod
+    def _read(self, namespace: str, key: str) -> str | None:
+        """確定済みの値（JSON 文字列）。無ければ None。"""
+
+    @abc.abstractmethod
+    def _write(self, namespace: str, key: str, raw: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _remove(self, namespace: str, key: str) -> None:
+        ...
+
+    def _pending(self, db) -> dict | None:
+        if db is None:
+            return None
+        return _sync_session(db).info.get(self._info_key)
+
+    @property
+    def _info_key(self) -> tuple[str, int]:
+        return ("state_store_pending", id(self))
+
+    def _stage(self, db, namespace: str, key: str, raw) -> None:
+        if db is None:
+            self._apply({(namespace, key): raw})
+            return
+        session = _sync_session(db)
+        if ("state_store_listening", id(self)) not in session.info:
+            session.info[("state_store_listening", id(self))] = True
+            event.listen(session, "after_commit", self._on_commit)
+            event.listen(session, "after_transaction_end", self._on_transaction_end)
+        if not session.in_transaction():
+            # まだ何も読み書きしていないセッションでも、rollback・close で捨てられるように始めておく
+            session.begin()
+        session.info.setdefault(self._info_key, {})[(namespace, key)] = raw
+
+    def _on_commit(self, session: Session) -> None:
+        # 一番外側の transaction の commit 後にだけ呼ばれる
+        pending = session.info.get(self._info_key)
+        if pending:
+            self._apply(pending)
+
+    def _on_transaction_end(self, session: Session, transaction) -> None:
+        # commit（_on_commit の後）・rollback・close のどれでも、外側の transaction が終われば捨てる
+        if transaction.parent is None:
+            session.info.pop(self._info_key, None)
+
+    def _apply(self, pending: dict) -> None:
+        for (namespace, key), raw in pending.items():
+            if raw is _DELETED:
+                self._remove(namespace, key)
+            else:
+                self._write(namespace, key, raw)
+
+
+def _sync_session(db) -> Session:
+    """AsyncSession なら裏の Session（イベントと info はそちらにある）。"""
+    return getattr(db, "sync_session", db)
+
+
+class MemoryStateStore(_CommitBoundStateStore):
+    def __init__(self):
+        self._data: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def _read(self, namespace, key):
+        with self._lock:
+            return self._data.get((namespace, key))
+
+    def _write(self, namespace, key, raw):
+        with self._lock:
+            self._data[(namespace, key)] = raw
+
+    def _remove(self, namespace, key):
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+
+class DatabaseStateStore(StateStore):
+    """shared_state テーブルに保存する。commit は呼び出し側で行う。"""
+
+    def get(self, db, namespace, key, default=None):
+        row = db.get(SharedState, (namespace, key))
+        return default if row is None else json.loads(row.value)
+
+    def set(self, db, namespace, key, value):
+        raw = json.dumps(value)
+        row = db.get(SharedState, (namespace, key))
+        if row is None:
+            db.add(SharedState(namespace=namespace, key=key, value=raw))
+        else:
+            row.value = raw
+
+    def delete(self, db, namespace, key):
+        row = db.get(SharedState, (namespace, key))
+        if row is not None:
+            db.delete(row)
+
+    def delete_keys(self, db, namespace, keys):
+        # 1件ずつ読まずに DELETE 1文で消す
+        (
+            db.query(SharedState)
+            .filter(SharedState.namespace == namespace, SharedState.key.in_(keys))
+            .delete(synchronize_session=False)
+        )
+
+
+class FileStateStore(_CommitBoundStateStore):
+    """
+    1 key = 1 ファイル（<dir>/<namespace>/<key>.json）で保存する。
+    書き込みは一時ファイルからの os.replace なので、読み手が書きかけを見ることはない。
+    ファイルへの書き込みは db の commit 後（_CommitBoundStateStore）。
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.directory, quote(namespace, safe=""), quote(key, safe="") + ".json")
+
+    def _read(self, namespace, key):
+        try:
+            with open(self._path(namespace, key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, namespace, key, raw):
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove(self, namespace, key):
+        try:
+            os.remove(self._path(namespace, key))
+        except FileNotFoundError:
+            pass
+
+
+def build_state_store(backend: str, directory: str | None = None) -> StateStore:
+    backend = backend.upper()
+    if backend == "MEMORY":
+        return MemoryStateStore()
+    if backend == "DB":
+        return DatabaseStateStore()
+    if backend == "FILE":
+        return FileStateStore(directory or config.STATE_DIR)
+    raise ValueError(f"unknown state backend: {backend!r}")
+
+
+_store: StateStore = build_state_store(config.STATE_BACKEND, config.STATE_DIR)
+
+
+def get_state_store() -> StateStore:
+    return _store
+
+
+def set_state_store(store: StateStore) -> StateStore:
+    """ストアを差し替える（テスト用）。直前のストアを返す。"""
+    global _store
+    previous, _store = _store, store
+    return previous
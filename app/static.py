@@ -0,0 +1,164 @@
+# app/static.py
+"""
+/frontend 配信用の StaticFiles。
+
+起動時に frontend/ 配下を読み込み、gzip（brotli モジュールがあれば br も）で圧縮しておく。
+- 強い ETag（内容の SHA-256）と If-None-Match による 304
+- Accept-Encoding に応じて圧縮済みの本文を返す（Vary: Accept-Encoding）
+- Cache-Control: js/css などはキャッシュさせ、HTML は毎回 ETag で再検証させる
+  （フェーズ遷移のたびに day.html ⇔ night_wait.html ⇔ morning.html を開き直しても、
+  共通の JS はキャッシュから、HTML は 304 で済む）
+
+起動後にファイルが変わった場合（開発中の編集）は、次のリクエストで読み直す。
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from . import config
+
+try:  # brotli は任意（pip install brotli）。無ければ gzip だけ
+    import brotli
+except ImportError:  # pragma: no cover - 環境依存
+    brotli = None
+
+# 圧縮する Content-Type（画像などは圧縮済みなのでそのまま）
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+# これより小さいものは圧縮しない（ヘッダのほうが大きくなる）
+MIN_COMPRESS_BYTES = 256
+
+# キャッシュさせる拡張子（HTML 以外の静的アセット）
+ASSET_EXTENSIONS = {".js", ".css", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp", ".woff", ".woff2"}
+
+
+@dataclass(frozen=True)
+class _Asset:
+    mtime_ns: int
+    size: int
+    media_type: str
+    digest: str
+    # {"identity": 本文, "gzip": ..., "br": ...}
+    bodies: dict[str, bytes]
+
+
+def _media_type(path: str) -> str:
+    media_type, _ = mimetypes.guess_type(path)
+    media_type = media_type or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def _load_asset(full_path: str, stat_result: os.stat_result) -> _Asset:
+    with open(full_path, "rb") as f:
+        body = f.read()
+    media_type = _media_type(full_path)
+    bodies = {"identity": body}
+    if len(body) >= MIN_COMPRESS_BYTES and media_type.startswith(COMPRESSIBLE_TYPES):
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            bodies["gzip"] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                bodies["br"] = compressed
+    return _Asset(
+        mtime_ns=stat_result.st_mtime_ns,
+        size=stat_result.st_size,
+        media_type=media_type,
+        digest=hashlib.sha256(body).hexdigest()[:32],
+        bodies=bodies,
+    )
+
+
+def _accepted_encodings(headers: Headers) -> set[str]:
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class CachedStaticFiles(StaticFiles):
+    """圧縮済みの本文・強い ETag・Cache-Control を付けて返す StaticFiles。"""
+
+    def __init__(self, *, directory: str, asset_max_age: int | None = None, **kwargs) -> None:
+        super().__init__(directory=directory, **kwargs)
+        self.asset_max_age = config.STATIC_ASSET_MAX_AGE_SEC if asset_max_age is None else asset_max_age
+        # {get_path() と同じ形の相対パス: _Asset}
+        self._assets: dict[str, _Asset] = {}
+        for root, _dirs, files in os.walk(directory):
+            for name in files:
+                full_path = os.path.join(root, name)
+                rel_path = os.path.normpath(os.path.relpath(full_path, directory))
+                self._assets[rel_path] = _load_asset(full_path, os.stat(full_path))
+
+    def _current_asset(self, path: str) -> _Asset | None:
+        """起動時に読んだもの。ファイルが変わっていれば読み直す（消えていれば None）。"""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not os.path.isfile(full_path):
+            self._assets.pop(path, None)
+            return None
+        asset = self._assets.get(path)
+        if asset is None or (asset.mtime_ns, asset.size) != (stat_result.st_mtime_ns, stat_result.st_size):
+            asset = self._assets[path] = _load_asset(full_path, stat_result)
+        return asset
+
+    def _cache_control(self, path: str, scope: Scope) -> str:
+        if os.path.splitext(path)[1].lower() not in ASSET_EXTENSIONS:
+            # HTML: キャッシュは持たせるが、毎回 ETag で再検証（更新をすぐ反映する）
+            return "no-cache"
+        if QueryParams(scope.get("query_string", b"")).get("v"):
+            # ?v=20261017 のようにバージョン付きで参照されるものは変わらない前提（?dev=1 などは対象外）
+            return "public, max-age=31536000, immutable"
+        return f"public, max-age={self.asset_max_age}"
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD") or path not in self._assets:
+            return await super().get_response(path, scope)
+        asset = self._current_asset(path)
+        if asset is None:
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers)
+        encoding = next((e for e in ("br", "gzip") if e in asset.bodies and e in accepted), "identity")
+        body = asset.bodies[encoding]
+
+        # 強い ETag は表現（エンコーディング）ごとに変える
+        etag = f'"{asset.digest}"' if encoding == "identity" else f'"{asset.digest}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self._cache_control(path, scope),
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if scope["method"] == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=asset.media_type, headers=headers)
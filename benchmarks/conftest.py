@@ -0,0 +1,238 @@
+# benchmarks/conftest.py
+"""
+games.py のハンドラを TestClient 経由で計測するベンチマーク（pytest-benchmark）。
+
+tests/ と同じく app の DB（既定 ./werewolf.db。JINROU_DATABASE_URL で変更可）を作り直して使う。
+最初に終了済みゲームを大量に入れておき、「何千卓ぶんの履歴が残った DB」の上で 6 / 15 / 30 人卓を計測する。
+"""
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import game_engine, night_outcome, query_stats  # noqa: E402
+from app.api.etag import bump_version  # noqa: E402
+from app.api.v1.games import _set_alive_counts  # noqa: E402
+from app.db import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.game import (  # noqa: E402
+    Game, GameMember, DayVote, WolfVote, SeerInspect, MediumInspect, NightOutcome,
+)
+from app.models.knight import KnightGuard  # noqa: E402
+from app.models.room import Room, RoomMember  # noqa: E402
+from app.state_store import RUNOFF_STATE_NS, get_state_store  # noqa: E402
+
+# 履歴として入れておく終了済みゲーム数（JINROU_BENCH_HISTORY_GAMES で変更可）
+HISTORY_GAMES = int(os.environ.get("JINROU_BENCH_HISTORY_GAMES", "3000"))
+HISTORY_PLAYERS = 9
+HISTORY_DAYS = 3
+
+PLAYER_COUNTS = (6, 15, 30)
+
+
+def _seed_history(db: Session, games: int) -> None:
+    """終了済みゲーム（メンバー・昼投票・人狼投票つき）を Core の一括 INSERT で入れる。"""
+    now = datetime.utcnow()
+    rooms, game_rows, members, day_votes, wolf_votes = [], [], [], [], []
+    for g in range(games):
+        room_id = str(uuid.uuid4())
+        game_id = str(uuid.uuid4())
+        rooms.append({"id": room_id, "name": f"history{g}"})
+        game_rows.append({
+            "id": game_id, "room_id": room_id, "status": "FINISHED",
+            "curr_day": HISTORY_DAYS, "curr_night": HISTORY_DAYS, "started": True,
+            "finished_at": now,
+        })
+        ids = [str(uuid.uuid4()) for _ in range(HISTORY_PLAYERS)]
+        for i, member_id in enumerate(ids):
+            wolf = i < 2
+            members.append({
+                "id": member_id, "game_id": game_id, "room_member_id": str(uuid.uuid4()),
+                "display_name": f"P{i + 1}", "role_type": "WEREWOLF" if wolf else "VILLAGER",
+                "team": "WOLF" if wolf else "VILLAGE", "alive": i < 4, "order_no": i + 1,
+            })
+        for day in range(1, HISTORY_DAYS + 1):
+            for i, voter in enumerate(ids):
+                day_votes.append({
+                    "id": str(uuid.uuid4()), "game_id": game_id, "day_no": day,
+                    "voter_member_id": voter, "target_member_id": ids[(i + 1) % HISTORY_PLAYERS],
+                })
+            for wolf in ids[:2]:
+                wolf_votes.append({
+                    "id": str(uuid.uuid4()), "game_id": game_id, "night_no": day,
+                    "wolf_member_id": wolf, "target_member_id": ids[2 + day],
+                    "priority_level": 1, "points_at_vote": 3,
+                })
+
+    db.execute(insert(Room), rooms)
+    db.execute(insert(Game), game_rows)
+    db.execute(insert(GameMember), members)
+    db.execute(insert(DayVote), day_votes)
+    db.execute(insert(WolfVote), wolf_votes)
+    db.commit()
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    game_engine.clear()
+    night_outcome.clear()
+    db = SessionLocal()
+    try:
+        _seed_history(db, HISTORY_GAMES)
+    finally:
+        db.close()
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def db(client) -> Session:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class BenchGame:
+    """計測用に開始済みのゲーム1卓。役職ごとのメンバーと、状態を巻き戻すヘルパーを持つ。"""
+
+    def __init__(self, db: Session, game_id: str):
+        self.db = db
+        self.id = game_id
+        self.members = (
+            db.query(GameMember)
+            .filter(GameMember.game_id == game_id)
+            .order_by(GameMember.order_no.asc())
+            .all()
+        )
+        self.host = self.members[0]
+        self.wolves = [m for m in self.members if m.role_type == "WEREWOLF"]
+        self.seer = next(m for m in self.members if m.role_type == "SEER")
+        self.knight = next(m for m in self.members if m.role_type == "KNIGHT")
+        # 霊媒師は 6 人卓にはいない
+        self.medium = next((m for m in self.members if m.role_type == "MEDIUM"), None)
+        # 処刑・襲撃の対象にする人狼以外（村人を先頭に）。1人減ってもゲームは終わらない
+        self.non_wolves = sorted(
+            (m for m in self.members if m.role_type != "WEREWOLF"),
+            key=lambda m: (m.role_type != "VILLAGER", m.order_no),
+        )
+
+    def _clear_actions(self, game: Game) -> None:
+        for model, column, no in (
+            (DayVote, DayVote.day_no, game.curr_day),
+            (WolfVote, WolfVote.night_no, game.curr_night),
+            (SeerInspect, SeerInspect.night_no, game.curr_night),
+            (KnightGuard, KnightGuard.night_no, game.curr_night),
+            (MediumInspect, MediumInspect.day_no, game.curr_day),
+            (NightOutcome, NightOutcome.night_no, game.curr_night),
+        ):
+            self.db.query(model).filter(model.game_id == self.id, column == no).delete(
+                synchronize_session=False
+            )
+        night_outcome.discard(self.id)
+
+    def reset(self, status: str) -> Game:
+        """全員生存・当日/当夜の行動なしで status（DAY_DISCUSSION / NIGHT）に戻す。"""
+        game = self.db.get(Game, self.id)
+        game.status = status
+        game.curr_day = 1
+        game.curr_night = 1
+        game.vote_round = 0
+        game.last_executed_member_id = None
+        game.seer_first_white_target_id = None
+        for m in self.members:
+            m.alive = True
+        _set_alive_counts(game, self.members)
+        self._clear_actions(game)
+        get_state_store().delete(self.db, RUNOFF_STATE_NS, self.id)
+        bump_version(game)
+        self.db.commit()
+        self.db.expire_all()
+        return game
+
+    def reset_with_day_votes(self) -> None:
+        """昼: 全員が同じ村人に投票済み（resolve_day_simple で1人処刑して夜へ進む）。"""
+        self.reset("DAY_DISCUSSION")
+        target = self.non_wolves[0]
+        fallback = self.non_wolves[1]
+        for voter in self.members:
+            self.db.add(DayVote(
+                id=str(uuid.uuid4()), game_id=self.id, day_no=1, voter_member_id=voter.id,
+                target_member_id=(fallback if voter.id == target.id else target).id,
+            ))
+        self.db.commit()
+
+    def reset_after_execution(self) -> None:
+        """2日目の夜: last_executed_member_id に村人を入れ、霊媒はまだ（medium_inspect できる。生死は戻したまま）。"""
+        game = self.reset("NIGHT")
+        game.curr_day = 2
+        game.last_executed_member_id = self.non_wolves[0].id
+        self.db.commit()
+
+    def reset_with_night_actions(self) -> None:
+        """夜: 人狼全員が同じ村人に投票し、騎士が別の村人を護衛済み（襲撃成功で朝へ）。"""
+        self.reset("NIGHT")
+        for wolf in self.wolves:
+            self.db.add(WolfVote(
+                id=str(uuid.uuid4()), game_id=self.id, night_no=1, wolf_member_id=wolf.id,
+                target_member_id=self.non_wolves[0].id, priority_level=1, points_at_vote=3,
+            ))
+        self.db.add(KnightGuard(
+            id=str(uuid.uuid4()), game_id=self.id, night_no=1,
+            knight_member_id=self.knight.id, target_member_id=self.non_wolves[1].id,
+        ))
+        self.db.commit()
+
+
+def _start_game(client: TestClient, db: Session, players: int) -> str:
+    room = Room(id=str(uuid.uuid4()), name=f"bench{players}")
+    db.add(room)
+    for i in range(players):
+        db.add(RoomMember(
+            id=str(uuid.uuid4()), room_id=room.id, display_name=f"Player{i + 1}", is_host=(i == 0),
+        ))
+    db.commit()
+    game_id = client.post("/api/games", json={"room_id": room.id}).json()["id"]
+    res = client.post(f"/api/games/{game_id}/start")
+    assert res.status_code == 200, res.text
+    return game_id
+
+
+@pytest.fixture
+def db_queries():
+    """
+    リクエスト関数を1回呼び、実行した SQL 数（X-DB-Queries）を返す関数。
+    benchmark.extra_info に入れておくと、保存した結果どうしでラウンドトリップ数も比べられる。
+    """
+    def run(call) -> int:
+        previous = query_stats.enabled
+        query_stats.enabled = True
+        try:
+            res = call()
+        finally:
+            query_stats.enabled = previous
+        assert res.status_code == 200, res.text
+        return int(res.headers[query_stats.QUERIES_HEADER])
+
+    return run
+
+
+@pytest.fixture(params=PLAYER_COUNTS, ids=lambda n: f"{n}p")
+def game(request, client: TestClient, db: Session) -> BenchGame:
+    return BenchGame(db, _start_game(client, db, request.param))
+
+
+@pytest.fixture
+def start_game(client: TestClient, db: Session):
+    """players 人のルームを作って /start まで進め、game_id を返す関数。"""
+    return lambda players: _start_game(client, db, players)
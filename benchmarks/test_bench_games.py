@@ -0,0 +1,256 @@
+# benchmarks/test_bench_games.py
+"""
+app/api/v1/games.py のエンドポイントごとのベンチマーク。
+POST /api/games は test_start_game（/start まで）に含めて計る。
+/events（Server-Sent Events のストリーム）は1リクエストが終わらないので対象外。
+
+    pytest benchmarks --benchmark-autosave                 # main で基準を保存
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:15%   # PR で比較
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+# 状態を変えない GET（{host} 等は game フィクスチャ（BenchGame）のメンバー id に置き換える）
+READ_PATHS = {
+    "get_game": "",
+    "list_game_members": "/members",
+    "get_my_info": "/me?player_id={host}",
+    "get_player_view": "/view?player_id={host}",
+    "judge_game": "/judge",
+    "day_timer": "/day_timer",
+    "day_vote_status": "/day_vote_status",
+    "day_vote_state": "/day_vote_state",
+    "day_tally": "/day_tally",
+    "night_actions_status": "/night_actions_status",
+    "wolf_tally": "/wolves/tally",
+    "night_result": "/night_result",
+    "reveal_roles": "/reveal_roles",
+    "seer_inspect_status": "/seer/{seer}/inspect/status",
+    "knight_guard_status": "/knight/{knight}/guard/status",
+    "get_game_log": "/log",
+    "replay_game": "/replay",
+}
+
+# 夜の状態で計測する GET
+NIGHT_READS = {"night_actions_status", "wolf_tally", "night_result"}
+
+# resolve 系は1回ごとに状態を巻き戻すので、回数を絞る
+RESOLVE_ROUNDS = 30
+
+
+def _path(game, suffix: str) -> str:
+    return f"/api/games/{game.id}" + suffix.format(
+        host=game.host.id, seer=game.seer.id, knight=game.knight.id
+    )
+
+
+@pytest.mark.parametrize("name", sorted(READ_PATHS))
+def test_read(benchmark, client: TestClient, game, name: str):
+    if name in NIGHT_READS:
+        game.reset_with_night_actions()
+    else:
+        game.reset_with_day_votes()
+    path = _path(game, READ_PATHS[name])
+    assert client.get(path).status_code == 200
+
+    res = benchmark(client.get, path)
+    assert res.status_code == 200
+
+
+def test_day_vote(benchmark, client: TestClient, game):
+    """投票し直し（既存行の UPDATE）を繰り返す。"""
+    game.reset("DAY_DISCUSSION")
+    voter = game.non_wolves[0]
+    targets = [game.non_wolves[1].id, game.non_wolves[2].id]
+    counter = iter(range(10**9))
+
+    def vote():
+        target = targets[next(counter) % 2]
+        return client.post(
+            f"/api/games/{game.id}/day_vote",
+            json={"voter_member_id": voter.id, "target_member_id": target},
+        )
+
+    res = benchmark(vote)
+    assert res.status_code == 200
+
+
+def test_wolf_vote(benchmark, client: TestClient, game):
+    game.reset("NIGHT")
+    wolf = game.wolves[0]
+    counter = iter(range(10**9))
+
+    def vote():
+        return client.post(
+            f"/api/games/{game.id}/wolves/vote",
+            json={
+                "wolf_member_id": wolf.id,
+                "target_member_id": game.non_wolves[0].id,
+                "priority_level": next(counter) % 3 + 1,
+            },
+        )
+
+    res = benchmark(vote)
+    assert res.status_code == 200
+
+
+def test_resolve_day_simple(benchmark, client: TestClient, game, db_queries):
+    def setup():
+        game.reset_with_day_votes()
+        return (), {}
+
+    def resolve():
+        return client.post(
+            f"/api/games/{game.id}/resolve_day_simple",
+            json={"requester_member_id": game.host.id},
+        )
+
+    res = benchmark.pedantic(resolve, setup=setup, rounds=RESOLVE_ROUNDS)
+    assert res.status_code == 200
+    assert res.json()["status"] == "NIGHT"
+    setup()
+    benchmark.extra_info["db_queries"] = db_queries(resolve)
+
+
+def test_resolve_night_simple(benchmark, client: TestClient, game, db_queries):
+    """投票・護衛・生存者の読み込みは1クエリ（extra_info の db_queries が人数に依らず一定）。"""
+    def setup():
+        game.reset_with_night_actions()
+        return (), {}
+
+    def resolve():
+        return client.post(f"/api/games/{game.id}/resolve_night_simple")
+
+    res = benchmark.pedantic(resolve, setup=setup, rounds=RESOLVE_ROUNDS)
+    assert res.status_code == 200
+    assert res.json()["status"] == "DAY_DISCUSSION"
+    setup()
+    benchmark.extra_info["db_queries"] = db_queries(resolve)
+
+
+def test_seer_inspect(benchmark, client: TestClient, game):
+    def setup():
+        game.reset("NIGHT")
+        return (), {}
+
+    def inspect():
+        return client.post(
+            f"/api/games/{game.id}/seer/{game.seer.id}/inspect",
+            json={"target_member_id": game.non_wolves[0].id},
+        )
+
+    res = benchmark.pedantic(inspect, setup=setup, rounds=RESOLVE_ROUNDS)
+    assert res.status_code == 200
+
+
+def test_knight_guard(benchmark, client: TestClient, game):
+    def setup():
+        game.reset("NIGHT")
+        return (), {}
+
+    def guard():
+        return client.post(
+            f"/api/games/{game.id}/knight/{game.knight.id}/guard",
+            json={"target_member_id": game.non_wolves[0].id},
+        )
+
+    res = benchmark.pedantic(guard, setup=setup, rounds=RESOLVE_ROUNDS)
+    assert res.status_code == 200
+
+
+def test_medium_inspect(benchmark, client: TestClient, game):
+    if game.medium is None:
+        pytest.skip("no medium in this game")
+
+    def setup():
+        game.reset_after_execution()
+        return (), {}
+
+    def inspect():
+        return client.post(f"/api/games/{game.id}/medium/{game.medium.id}/inspect")
+
+    res = benchmark.pedantic(inspect, setup=setup, rounds=RESOLVE_ROUNDS)
+    assert res.status_code == 200
+
+
+def test_seer_first_white(benchmark, client: TestClient, game):
+    """白通知の対象を選んで保存する初回（2回目以降は保存済みを返すだけ）。"""
+    def setup():
+        game.reset("NIGHT")
+        return (), {}
+
+    def first_white():
+        return client.get(f"/api/games/{game.id}/seer/first_white")
+
+    res = benchmark.pedantic(first_white, setup=setup, rounds=RESOLVE_ROUNDS)
+    assert res.status_code == 200
+
+
+def test_day_votes_batch(benchmark, client: TestClient, game):
+    """全員分の昼投票を1リクエストで（2回目以降は既存行の UPDATE）。"""
+    game.reset("DAY_DISCUSSION")
+    target, fallback = game.non_wolves[0], game.non_wolves[1]
+    votes = [
+        {"voter_member_id": m.id, "target_member_id": (fallback if m.id == target.id else target).id}
+        for m in game.members
+    ]
+
+    res = benchmark(client.post, f"/api/games/{game.id}/day_votes:batch", json={"votes": votes})
+    assert res.status_code == 200
+    assert res.json()["accepted"] == len(votes)
+
+
+def test_wolf_votes_batch(benchmark, client: TestClient, game):
+    game.reset("NIGHT")
+    votes = [
+        {"wolf_member_id": w.id, "target_member_id": game.non_wolves[0].id, "priority_level": 1}
+        for w in game.wolves
+    ]
+
+    res = benchmark(client.post, f"/api/games/{game.id}/wolves/votes:batch", json={"votes": votes})
+    assert res.status_code == 200
+    assert res.json()["accepted"] == len(votes)
+
+
+def test_set_reveal_roles(benchmark, client: TestClient, game):
+    counter = iter(range(10**9))
+
+    def toggle():
+        return client.post(
+            f"/api/games/{game.id}/reveal_roles",
+            json={"requester_member_id": game.host.id, "enabled": next(counter) % 2 == 0},
+        )
+
+    res = benchmark(toggle)
+    assert res.status_code == 200
+
+
+def test_debug_set_status(benchmark, client: TestClient, game):
+    statuses = ["NIGHT", "DAY_DISCUSSION"]
+    counter = iter(range(10**9))
+
+    def set_status():
+        return client.post(
+            f"/api/games/{game.id}/debug_set_status",
+            params={"status": statuses[next(counter) % 2]},
+        )
+
+    res = benchmark(set_status)
+    assert res.status_code == 200
+
+
+def test_role_assign(benchmark, client: TestClient, game):
+    """役職の配り直し（開始前の ROLE_ASSIGN に戻した卓で繰り返す）。"""
+    game.reset("ROLE_ASSIGN")
+
+    res = benchmark(client.post, f"/api/games/{game.id}/role_assign")
+    assert res.status_code == 200
+
+
+@pytest.mark.parametrize("players", [6, 15, 30], ids=lambda n: f"{n}p")
+def test_start_game(benchmark, start_game, players: int):
+    """役職配布（GameMember 作成）を含むゲーム開始。毎回新しいルームを作る。"""
+    game_id = benchmark.pedantic(start_game, args=(players,), rounds=RESOLVE_ROUNDS)
+    assert uuid.UUID(game_id)
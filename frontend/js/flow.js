@@ -10,8 +10,11 @@
     return v;
   }
 
-  async function fetchGame(gameId) {
-    const res = await fetch(`/api/games/${encodeURIComponent(gameId)}`);
+  async function fetchGame(gameId, { waitForVersion = null, timeoutSec = 25 } = {}) {
+    // waitForVersion を渡すと、version が変わるまでサーバ側で待ってから返る（long-poll）
+    const query =
+      waitForVersion == null ? "" : `?wait_for_version=${waitForVersion}&timeout=${timeoutSec}`;
+    const res = await fetch(`/api/games/${encodeURIComponent(gameId)}${query}`);
     if (!res.ok) throw new Error(`game取得失敗(${res.status})`);
     return await res.json();
   }
@@ -71,14 +74,14 @@
     else location.href = url;
   }
 
-  // 状態変化を待つ（ポーリング）
+  // 状態変化を待つ（SSE。使えない間は long-poll）
   async function watchPhase({ intervalMs = 1500 } = {}) {
     const gameId = mustParam("game_id");
     let prev = null;
 
-    setInterval(async () => {
+    async function check(state) {
       try {
-        const g = await fetchGame(gameId);
+        const g = state || (await fetchGame(gameId));
         const cur = String(g.status || "").toUpperCase();
         if (prev && prev !== cur) {
           // statusが変わったら現在フェーズへ自動遷移
@@ -88,7 +91,27 @@
       } catch (e) {
         console.warn(e);
       }
-    }, intervalMs);
+    }
+
+    if (global.JinrouEvents?.watchGame) {
+      global.JinrouEvents.watchGame(gameId, check, { intervalMs });
+      return;
+    }
+
+    // game_events.js がないページ: 常に1リクエストだけ張って version の変化を待つ
+    let version = null;
+    for (;;) {
+      try {
+        const g = await fetchGame(gameId, { waitForVersion: version });
+        if (g.version !== version) {
+          version = g.version;
+          await check(g);
+        }
+      } catch (e) {
+        console.warn(e);
+        await new Promise((resolve) => setTimeout(resolve, intervalMs));
+      }
+    }
   }
 
   global.JinrouFlow = { gotoCurrentPhase, watchPhase };
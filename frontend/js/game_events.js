@@ -0,0 +1,197 @@
+// frontend/js/game_events.js
+// ゲーム（SSE）/ ルーム（WebSocket）の変化を受け取る。
+// ストリームが切れている間だけポーリングに切り替える。
+(function (global) {
+  const API_BASE = "/api";
+
+  function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+  }
+
+  /**
+   * onChange(state) を状態変化ごとに呼ぶ。
+   * - SSE 受信時: state はサーバのスナップショット（status / curr_day / alive_ids など）
+   * - long-poll 時: state は null（呼び出し側で必要な API を取り直す）
+   * SSE が使えない間は GET /api/games/{id}?wait_for_version=N で変化を待つ
+   * （1台あたり常に1リクエストだけ。失敗時は intervalMs 空けて再試行）。
+   */
+  function watchGame(gameId, onChange, opts = {}) {
+    const intervalMs = opts.intervalMs || 1500;
+    const retryMs = opts.retryMs || 5000;
+    const waitSec = opts.waitSec || 25;
+    let source = null;
+    let polling = false;
+    let pollAbort = null;
+    let version = null;
+    let retryTimer = null;
+    let stopped = false;
+
+    function fire(state) {
+      try {
+        const r = onChange(state);
+        if (r && typeof r.catch === "function") r.catch((e) => console.warn(e));
+      } catch (e) {
+        console.warn(e);
+      }
+    }
+
+    async function longPoll() {
+      while (polling && !stopped) {
+        const query = version == null ? "" : `?wait_for_version=${version}&timeout=${waitSec}`;
+        pollAbort = typeof global.AbortController === "function" ? new AbortController() : null;
+        try {
+          const res = await fetch(`${API_BASE}/games/${encodeURIComponent(gameId)}${query}`, {
+            signal: pollAbort ? pollAbort.signal : undefined,
+          });
+          if (!res.ok) throw new Error(`game取得失敗(${res.status})`);
+          const game = await res.json();
+          if (!polling || stopped) break;
+          if (game.version !== version) {
+            version = game.version;
+            fire(null);
+          }
+        } catch (e) {
+          if (!polling || stopped) break;
+          await sleep(intervalMs);
+        }
+      }
+      pollAbort = null;
+    }
+
+    function startPolling() {
+      if (polling || stopped) return;
+      polling = true;
+      longPoll();
+    }
+
+    function stopPolling() {
+      if (!polling) return;
+      polling = false;
+      if (pollAbort) pollAbort.abort();
+    }
+
+    function connect() {
+      if (stopped) return;
+      if (typeof global.EventSource !== "function") {
+        startPolling();
+        return;
+      }
+
+      source = new EventSource(`${API_BASE}/games/${encodeURIComponent(gameId)}/events`);
+      source.addEventListener("game_state", (ev) => {
+        stopPolling();
+        let state = null;
+        try {
+          state = JSON.parse(ev.data);
+        } catch (_) {}
+        if (state && state.version != null) version = state.version;
+        fire(state);
+      });
+      source.onerror = () => {
+        // 切断中はポーリングで補う（EventSource は自動再接続する）
+        startPolling();
+        if (source && source.readyState === EventSource.CLOSED) {
+          source = null;
+          if (!retryTimer) {
+            retryTimer = setTimeout(() => {
+              retryTimer = null;
+              connect();
+            }, retryMs);
+          }
+        }
+      };
+    }
+
+    connect();
+
+    return {
+      stop() {
+        stopped = true;
+        stopPolling();
+        if (retryTimer) clearTimeout(retryTimer);
+        if (source) source.close();
+        source = null;
+      },
+    };
+  }
+
+  /**
+   * GET /api/rooms/{id}/ws（WebSocket）でルームの変化を受け取る。
+   * onEvent(event) はサーバからのイベント（room_state / roster_added / members_changed /
+   * current_game_changed / game_started / room_deleted）で呼ばれる。
+   * 切断中は intervalMs ごとに onEvent(null) を呼び、retryMs 後に再接続する。
+   */
+  function watchRoom(roomId, onEvent, opts = {}) {
+    const intervalMs = opts.intervalMs || 2000;
+    const retryMs = opts.retryMs || 5000;
+    let socket = null;
+    let pollTimer = null;
+    let retryTimer = null;
+    let stopped = false;
+
+    function fire(event) {
+      try {
+        const r = onEvent(event);
+        if (r && typeof r.catch === "function") r.catch((e) => console.warn(e));
+      } catch (e) {
+        console.warn(e);
+      }
+    }
+
+    function startPolling() {
+      if (pollTimer || stopped) return;
+      pollTimer = setInterval(() => fire(null), intervalMs);
+    }
+
+    function stopPolling() {
+      if (!pollTimer) return;
+      clearInterval(pollTimer);
+      pollTimer = null;
+    }
+
+    function connect() {
+      if (stopped) return;
+      if (typeof global.WebSocket !== "function") {
+        startPolling();
+        return;
+      }
+
+      const proto = location.protocol === "https:" ? "wss:" : "ws:";
+      socket = new WebSocket(`${proto}//${location.host}${API_BASE}/rooms/${encodeURIComponent(roomId)}/ws`);
+      socket.onmessage = (ev) => {
+        stopPolling();
+        let event = null;
+        try {
+          event = JSON.parse(ev.data);
+        } catch (_) {}
+        fire(event);
+      };
+      socket.onclose = () => {
+        socket = null;
+        if (stopped) return;
+        // 切断中はポーリングで補い、しばらくしてから再接続
+        startPolling();
+        if (!retryTimer) {
+          retryTimer = setTimeout(() => {
+            retryTimer = null;
+            connect();
+          }, retryMs);
+        }
+      };
+    }
+
+    connect();
+
+    return {
+      stop() {
+        stopped = true;
+        stopPolling();
+        if (retryTimer) clearTimeout(retryTimer);
+        if (socket) socket.close();
+        socket = null;
+      },
+    };
+  }
+
+  global.JinrouEvents = { watchGame, watchRoom };
+})(window);
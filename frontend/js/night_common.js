@@ -333,11 +333,14 @@
     const intervalMs = opts.intervalMs || 1500;
     if (!gameId || !playerId) return;
 
-    setInterval(async () => {
+    async function check(state) {
       try {
-        const res = await fetch(`${API_BASE}/games/${encodeURIComponent(gameId)}`);
-        if (!res.ok) return;
-        const g = await res.json();
+        let g = state;
+        if (!g) {
+          const res = await fetch(`${API_BASE}/games/${encodeURIComponent(gameId)}`);
+          if (!res.ok) return;
+          g = await res.json();
+        }
         const st = String(g.status || "").toUpperCase();
         if (st === "DAY_DISCUSSION") {
           location.href = `/frontend/morning.html?game_id=${encodeURIComponent(gameId)}&player_id=${encodeURIComponent(playerId)}`;
@@ -347,7 +350,14 @@
       } catch (_) {
         // ポーリング失敗は無視
       }
-    }, intervalMs);
+    }
+
+    // SSE が使えればそれで待つ（切断中だけポーリング）
+    if (global.JinrouEvents?.watchGame) {
+      global.JinrouEvents.watchGame(gameId, check, { intervalMs });
+    } else {
+      setInterval(check, intervalMs);
+    }
   }
 
   global.JinrouNight = {
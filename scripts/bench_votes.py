@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+昼投票（day_vote）の同時書き込みスループットを計測する。
+
+一時ファイルの SQLite に卓（Game）を複数作り、全員が同じ瞬間に投票する状況を
+スレッドで再現する。SQLite の既定設定と app/db.py の PRAGMA 設定を同じ負荷で比較する。
+per-game は PRAGMA 設定に加えて、投票・行動テーブルを卓ごとのファイルに置く
+（JINROU_GAME_DB_MODE=PER_GAME、app/db.py の GameDatabases）。
+
+書き込みロックの保持時間（投票の最初の INSERT/UPDATE から commit まで）も測る。
+lock% は計測時間のうちロックが握られていた割合で、これが 100% に近づくまでは
+卓数・ワーカー数を増やしても DB ファイル1つの書き込みロックは詰まらない。
+per-game の lock% は全ファイルの合計なので 100% を超えうる。
+
+    python scripts/bench_votes.py
+    python scripts/bench_votes.py --tables 10 --players 9 --rounds 5 --workers 16 --readers 4
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, event, func  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db import (  # noqa: E402
+    GAME_ENGINE_FOR, Base, GameDatabases, GameRoutedSession, bind_game, install_sqlite_pragmas, sqlite_pragmas,
+)
+from app.models.room import Room, RoomMember  # noqa: E402
+from app.models.game import Game, GameMember, DayVote  # noqa: E402
+from app.schemas.day import DayVoteCreate  # noqa: E402
+from app.api.v1.games import _day_vote  # noqa: E402
+
+
+def seed(SessionFactory, tables: int, players: int) -> list[tuple[str, list[str]]]:
+    """昼議論中のゲームを tables 卓作る。戻り値: [(game_id, [member_id, ...]), ...]"""
+    games = []
+    db = SessionFactory()
+    try:
+        for t in range(tables):
+            room = Room(id=str(uuid.uuid4()), name=f"bench{t}")
+            game = Game(id=str(uuid.uuid4()), room_id=room.id, status="DAY_DISCUSSION",
+                        curr_day=1, curr_night=0, started=True)
+            db.add_all([room, game])
+            member_ids = []
+            for i in range(players):
+                rm = RoomMember(id=str(uuid.uuid4()), room_id=room.id,
+                                display_name=f"P{i+1}", is_host=(i == 0))
+                gm = GameMember(id=str(uuid.uuid4()), game_id=game.id, room_member_id=rm.id,
+                                display_name=rm.display_name, role_type="VILLAGER",
+                                team="VILLAGE", alive=True, order_no=i + 1)
+                db.add_all([rm, gm])
+                member_ids.append(gm.id)
+            games.append((game.id, member_ids))
+        db.commit()
+    finally:
+        db.close()
+    return games
+
+
+def run(label: str, pragmas: dict | None, args, per_game: bool = False) -> dict:
+    fd, path = tempfile.mkstemp(prefix="jinrou_bench_", suffix=".db")
+    os.close(fd)
+    game_dir = tempfile.mkdtemp(prefix="jinrou_bench_games_")
+
+    # 書き込みロックの保持時間。pysqlite は最初の DML の直前に BEGIN し、その DML が
+    # 返った時点でロックを取れている。そこから commit（rollback）が返るまでを1回分とする
+    lock_holds: list[float] = []
+
+    class TimedConnection(sqlite3.Connection):
+        write_started: float | None = None
+
+        def commit(self):
+            try:
+                super().commit()
+            finally:
+                if self.write_started is not None:
+                    lock_holds.append(time.perf_counter() - self.write_started)
+                    self.write_started = None
+
+        def rollback(self):
+            try:
+                super().rollback()
+            finally:
+                self.write_started = None
+
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "factory": TimedConnection},
+        pool_size=args.workers + args.readers,
+    )
+
+    def _write_started(conn, _cursor, statement, _params, _context, _executemany):
+        dbapi_conn = conn.connection.dbapi_connection
+        if dbapi_conn.write_started is None and statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE"):
+            dbapi_conn.write_started = time.perf_counter()
+
+    class TimedGameDatabases(GameDatabases):
+        def _open(self, game_id: str):
+            game_engine = super()._open(game_id)
+            event.listen(game_engine, "after_cursor_execute", _write_started)
+            return game_engine
+
+    event.listen(engine, "after_cursor_execute", _write_started)
+    if pragmas:
+        install_sqlite_pragmas(engine, pragmas)
+    game_dbs = TimedGameDatabases(
+        game_dir,
+        pragmas=pragmas,
+        engine_options={"pool_size": args.workers + args.readers},
+        connect_args={"factory": TimedConnection},
+        max_open=args.tables,
+    )
+    if per_game:
+        SessionFactory = sessionmaker(
+            autocommit=False, autoflush=False, bind=engine,
+            class_=GameRoutedSession, info={GAME_ENGINE_FOR: game_dbs.engine},
+        )
+    else:
+        SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    games = seed(SessionFactory, args.tables, args.players)
+
+    errors = 0
+    errors_lock = threading.Lock()
+    stop_readers = threading.Event()
+    reads = [0] * args.readers
+
+    def vote(game_id: str, voter_id: str, target_id: str) -> None:
+        nonlocal errors
+        db = SessionFactory()
+        bind_game(db, game_id)  # app/api/deps.py と同じく、パスの game_id で卓のファイルを選ぶ
+        try:
+            _day_vote(game_id=game_id,
+                      data=DayVoteCreate(voter_member_id=voter_id, target_member_id=target_id),
+                      db=db)
+        except OperationalError:
+            db.rollback()
+            with errors_lock:
+                errors += 1
+        finally:
+            db.close()
+
+    def reader(idx: int) -> None:
+        # 投票状況のポーリングを模す
+        while not stop_readers.is_set():
+            game_id, _ = random.choice(games)
+            db = SessionFactory()
+            try:
+                db.query(func.count(DayVote.id)).filter(DayVote.game_id == game_id).scalar()
+                reads[idx] += 1
+            except OperationalError:
+                pass
+            finally:
+                db.close()
+
+    # 1ラウンド = 全卓の全員が一斉に投票（同じ人の投票はラウンドをまたいで重ならない）
+    rounds = []
+    for _ in range(args.rounds):
+        jobs = []
+        for game_id, member_ids in games:
+            for voter in member_ids:
+                target = random.choice([m for m in member_ids if m != voter])
+                jobs.append((game_id, voter, target))
+        rounds.append(jobs)
+    total_votes = sum(len(jobs) for jobs in rounds)
+
+    reader_threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for th in reader_threads:
+        th.start()
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for jobs in rounds:
+                list(pool.map(lambda job: vote(*job), jobs))
+        elapsed = time.perf_counter() - started
+    finally:
+        stop_readers.set()
+        for th in reader_threads:
+            th.join()
+        engine.dispose()
+        game_dbs.drop_all()
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.rmdir(game_dir)
+
+    ok = total_votes - errors
+    lock_holds.sort()
+    return {
+        "label": label,
+        "votes": total_votes,
+        "errors": errors,
+        "elapsed": elapsed,
+        "votes_per_sec": ok / elapsed if elapsed else 0.0,
+        "reads_per_sec": sum(reads) / elapsed if elapsed else 0.0,
+        "lock_p50_ms": lock_holds[len(lock_holds) // 2] * 1000 if lock_holds else 0.0,
+        "lock_p95_ms": lock_holds[int(len(lock_holds) * 0.95)] * 1000 if lock_holds else 0.0,
+        "lock_util": sum(lock_holds) / elapsed if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=10, help="同時進行する卓数")
+    parser.add_argument("--players", type=int, default=9, help="1卓あたりの人数")
+    parser.add_argument("--rounds", type=int, default=5, help="全員が投票し直す回数")
+    parser.add_argument("--workers", type=int, default=16, help="投票を送るスレッド数")
+    parser.add_argument("--readers", type=int, default=4, help="状況ポーリングのスレッド数")
+    args = parser.parse_args()
+
+    results = [
+        # SQLite 既定（rollback journal / synchronous=FULL）。pysqlite の timeout=5s のみ
+        run("default", None, args),
+        run("tuned", sqlite_pragmas(), args),
+        run("per-game", sqlite_pragmas(), args, per_game=True),
+    ]
+
+    print(
+        f"{'mode':<8} {'votes':>6} {'errors':>6} {'sec':>7} {'votes/s':>9} {'reads/s':>9} "
+        f"{'lock p50':>9} {'lock p95':>9} {'lock%':>6}"
+    )
+    for r in results:
+        print(
+            f"{r['label']:<8} {r['votes']:>6} {r['errors']:>6} {r['elapsed']:>7.2f} "
+            f"{r['votes_per_sec']:>9.1f} {r['reads_per_sec']:>9.1f} "
+            f"{r['lock_p50_ms']:>7.2f}ms {r['lock_p95_ms']:>7.2f}ms {r['lock_util'] * 100:>5.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+複数卓が同時に進行する状況を、起動中のサーバ（uvicorn）に対して再現する負荷試験。
+
+1卓 = smoke_flow.py のシナリオ（case_runoff など）を1本、司会の操作として流す。
+あわせて各卓の参加者の端末（phones）が画面更新のためにポーリングするのを asyncio で模す。
+終了後にエンドポイントごとの p50 / p95 / p99 レイテンシ・エラー率・スループットを出す。
+
+    uvicorn app.main:app --workers 4 &
+    python scripts/load_test.py --tables 30 --phones 9
+    python scripts/load_test.py --tables 10 --phones 12 --poll-mode long --cases runoff,wolf_win
+
+注意: 最初に /api/debug/reset_and_seed で DB を作り直す（--no-reset で既存データを残す）。
+--seed N を付けると i 卓目のゲームの乱数の seed を N+i にする（役職配布・同票の決着が毎回同じになり、
+実行ごとの差が乱択によるものか切り分けられる）。
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import smoke_flow  # noqa: E402
+
+CASES = {
+    "runoff": smoke_flow.case_runoff,
+    "wolf_win": smoke_flow.case_wolf_win,
+    "village_win_and_host_dead": smoke_flow.case_village_win_and_host_dead,
+    "reveal_roles_shared": smoke_flow.case_reveal_roles_shared,
+    "knight_guard_success": smoke_flow.case_knight_guard_success,
+    "day2_wolf_win": smoke_flow.case_day2_wolf_win,
+    "day2_village_win": smoke_flow.case_day2_village_win,
+    "spectator_result_ready": smoke_flow.case_spectator_result_ready,
+}
+
+# /api/games/<uuid>/... → /api/games/{id}/...（エンドポイント単位で集計する）
+_ID_SEGMENT = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+class Recorder:
+    """スレッド（司会シナリオ）と asyncio（端末）の両方から記録される。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, method: str, path: str, status: int, elapsed: float) -> None:
+        key = f"{method} {_ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])}"
+        with self._lock:
+            self.latencies[key].append(elapsed)
+            # 304 は ETag による正常応答。4xx はシナリオ上の想定内（403 確認など）もあるので
+            # 接続失敗（0）と 5xx だけをエラーに数える
+            if status == 0 or status >= 500:
+                self.errors[key] += 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+async def phone(client: httpx.AsyncClient, recorder: Recorder, table: dict, player_id: str, args):
+    """参加者1人の端末。卓の進行が終わるまで画面更新のリクエストを送り続ける。"""
+    game_id = table["game_id"]
+    version = None
+    etag = None
+    # 全端末が同じ瞬間に叩かないよう、開始をずらす
+    await asyncio.sleep(random.uniform(0, args.poll_interval))
+    while not table["done"].is_set():
+        started = time.perf_counter()
+        try:
+            if args.poll_mode == "long":
+                params = {"timeout": args.long_poll_timeout}
+                if version is not None:
+                    params["wait_for_version"] = version
+                path = f"/api/games/{game_id}"
+                res = await client.get(path, params=params, timeout=args.long_poll_timeout + 10)
+            else:
+                path = f"/api/games/{game_id}/view"
+                headers = {"If-None-Match": etag} if etag else {}
+                res = await client.get(path, params={"player_id": player_id}, headers=headers)
+            status = res.status_code
+        except httpx.HTTPError:
+            status = 0
+        recorder.record("GET", path, status, time.perf_counter() - started)
+
+        if status == 200 and args.poll_mode == "long":
+            version = res.json().get("version")
+            # 状態が変わったら画面を描き直す（/view を1回取る）
+            started = time.perf_counter()
+            view_path = f"/api/games/{game_id}/view"
+            try:
+                view = await client.get(view_path, params={"player_id": player_id})
+                view_status = view.status_code
+            except httpx.HTTPError:
+                view_status = 0
+            recorder.record("GET", view_path, view_status, time.perf_counter() - started)
+        elif status == 200:
+            etag = res.headers.get("etag")
+
+        if args.poll_mode == "interval" or status != 200:
+            await asyncio.sleep(args.poll_interval)
+
+
+# smoke_flow のシナリオは reset_and_seed() で卓を作るので、スレッドごとに
+# 作った game_id を受け取れるよう差し替える（DB は消さない: smoke_flow.RESET_DB = False）
+_original_reset_and_seed = smoke_flow.reset_and_seed
+_scenario_state = threading.local()
+
+
+def _reset_and_seed_for_table(names):
+    state = _scenario_state.table
+    game_id = _original_reset_and_seed(names, seed=state["seed"])
+    state["game_id"] = game_id
+    state["seeded"].set()
+    return game_id
+
+
+def run_scenario(case_name: str, player_count: int, state: dict) -> None:
+    """司会の操作（smoke_flow のシナリオ）を1卓分流す。executor のスレッドで動く。"""
+    _scenario_state.table = state
+    try:
+        CASES[case_name](player_count)
+    except Exception as e:  # noqa: BLE001
+        state["error"] = f"{case_name}: {e}"
+    finally:
+        state["seeded"].set()
+        _scenario_state.table = None
+
+
+async def run_table(client, recorder, case_name: str, player_count: int, seed, args) -> dict:
+    table = {
+        "case": case_name,
+        "seed": seed,
+        "game_id": None,
+        "error": None,
+        "seeded": threading.Event(),
+        "done": asyncio.Event(),
+    }
+    loop = asyncio.get_running_loop()
+    scenario = loop.run_in_executor(None, run_scenario, case_name, player_count, table)
+    await loop.run_in_executor(None, table["seeded"].wait)
+
+    phones = []
+    if table["game_id"]:
+        res = await client.get(f"/api/games/{table['game_id']}/members")
+        if res.status_code == 200:
+            phones = [
+                asyncio.create_task(phone(client, recorder, table, m["id"], args))
+                for m in res.json()[: args.phones]
+            ]
+    try:
+        await scenario
+    finally:
+        table["done"].set()
+        # long-poll 中の端末は待たずに止める
+        for task in phones:
+            task.cancel()
+        await asyncio.gather(*phones, return_exceptions=True)
+    return table
+
+
+async def main_async(args) -> int:
+    recorder = Recorder()
+    smoke_flow.BASE_URL = args.base_url
+    smoke_flow.ON_RESPONSE = recorder.record
+    smoke_flow.RESET_DB = False
+    smoke_flow.reset_and_seed = _reset_and_seed_for_table
+
+    case_names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [c for c in case_names if c not in CASES]
+    if unknown:
+        raise SystemExit(f"unknown cases: {unknown} (choices: {sorted(CASES)})")
+
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        if not args.no_reset:
+            res = await client.post(
+                "/api/debug/reset_and_seed", json={"player_count": 4, "start_game": False}
+            )
+            res.raise_for_status()
+
+        # 1卓につきシナリオ1本 + seed 待ち1本のスレッドを使う
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=args.tables * 2 + 4)
+        )
+
+        started = time.perf_counter()
+        # smoke_flow のシナリオは print で進捗を出すので、計測中は捨てる
+        with contextlib.redirect_stdout(io.StringIO()):
+            tables = await asyncio.gather(*(
+                run_table(
+                    client, recorder, case_names[i % len(case_names)], args.players,
+                    None if args.seed is None else args.seed + i, args,
+                )
+                for i in range(args.tables)
+            ))
+        elapsed = time.perf_counter() - started
+
+    report(recorder, tables, elapsed)
+    return 1 if any(t["error"] for t in tables) else 0
+
+
+def report(recorder: Recorder, tables: list[dict], elapsed: float) -> None:
+    total = sum(len(v) for v in recorder.latencies.values())
+    total_errors = sum(recorder.errors.values())
+    print(f"tables={len(tables)} requests={total} errors={total_errors} "
+          f"elapsed={elapsed:.1f}s throughput={total / elapsed if elapsed else 0:.1f} req/s")
+    print()
+    print(f"{'endpoint':<58} {'count':>6} {'err%':>6} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}")
+    for key in sorted(recorder.latencies, key=lambda k: -len(recorder.latencies[k])):
+        values = sorted(recorder.latencies[key])
+        err_pct = 100.0 * recorder.errors.get(key, 0) / len(values)
+        print(
+            f"{key:<58} {len(values):>6} {err_pct:>6.1f} "
+            f"{percentile(values, 50) * 1000:>8.1f} "
+            f"{percentile(values, 95) * 1000:>8.1f} "
+            f"{percentile(values, 99) * 1000:>8.1f}"
+        )
+    failed = [t for t in tables if t["error"]]
+    if failed:
+        print()
+        print(f"failed tables: {len(failed)}")
+        for t in failed:
+            print(f"  {t['error']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default=smoke_flow.BASE_URL)
+    parser.add_argument("--tables", type=int, default=30, help="同時に進行させる卓数")
+    parser.add_argument("--players", type=int, default=9, help="1卓あたりの人数")
+    parser.add_argument("--phones", type=int, default=9, help="1卓あたりのポーリング端末数")
+    parser.add_argument("--cases", default="", help="使うシナリオ（カンマ区切り、既定は全部を順に割り当て）")
+    parser.add_argument("--poll-mode", choices=("interval", "long"), default="interval",
+                        help="interval: /view を一定間隔で取得（ETag 付き） / long: wait_for_version の long-poll")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="interval モードの間隔（秒）")
+    parser.add_argument("--long-poll-timeout", type=float, default=25.0)
+    parser.add_argument("--connections", type=int, default=200, help="端末側の最大同時接続数")
+    parser.add_argument("--no-reset", action="store_true", help="開始時に DB を作り直さない")
+    parser.add_argument("--seed", type=int, default=None, help="ゲームの乱数の seed（i 卓目は seed+i、既定はランダム）")
+    args = parser.parse_args()
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
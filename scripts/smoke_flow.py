@@ -5,6 +5,13 @@ import time
 from urllib import request, error
 
 BASE_URL = "http://127.0.0.1:8000"
+# scripts/load_test.py から差し替える
+# ON_RESPONSE(method, path, status, elapsed_sec): 1リクエストごとに呼ばれる計測フック
+ON_RESPONSE = None
+# False なら reset_and_seed で DB を消さずに卓を追加する（複数卓を同時に回す用）
+RESET_DB = True
+# None 以外なら作るゲームの乱数の seed に使う（役職配布・同票の決着を毎回同じにする）
+GAME_SEED = None
 
 
 def api(method, path, body=None):
@@ -15,6 +22,14 @@ def api(method, path, body=None):
         data = json.dumps(body).encode("utf-8")
         headers["Content-Type"] = "application/json"
     req = request.Request(url, data=data, headers=headers, method=method)
+    started = time.perf_counter()
+    status, result = _send(req)
+    if ON_RESPONSE is not None:
+        ON_RESPONSE(method, path, status, time.perf_counter() - started)
+    return status, result
+
+
+def _send(req):
     try:
         with request.urlopen(req, timeout=10) as resp:
             payload = resp.read().decode("utf-8")
@@ -35,12 +50,13 @@ def must_ok(status, data, label):
     return data
 
 
-def reset_and_seed(names):
-    status, data = api(
-        "POST",
-        "/api/debug/reset_and_seed",
-        {"player_names": names, "start_game": True},
-    )
+def reset_and_seed(names, seed=None):
+    body = {"player_names": names, "start_game": True, "reset": RESET_DB}
+    if seed is None:
+        seed = GAME_SEED
+    if seed is not None:
+        body["seed"] = seed
+    status, data = api("POST", "/api/debug/reset_and_seed", body)
     data = must_ok(status, data, "reset_and_seed")
     return data["game_id"]
 
@@ -3,13 +3,30 @@ import pytest
 from sqlalchemy.orm import Session
 from fastapi.testclient import TestClient
 
-from app.db import Base, engine, SessionLocal
+from app import query_stats
+from app.db import PER_GAME_DB, Base, engine, SessionLocal, drop_all_game_databases
 from app.main import app
 
 # Room を Base に登録しておく（他のモデルも __init__ 経由で import 済みなら不要）
 from app.models.room import Room  # noqa: F401
 
 
+def pytest_collection_modifyitems(config, items):
+    """
+    JINROU_DATABASE_URL が SQLite 以外なら sqlite_only のテストを、
+    JINROU_GAME_DB_MODE=PER_GAME なら shared_game_db のテストを skip する。
+    """
+    skips = {}
+    if engine.dialect.name != "sqlite":
+        skips["sqlite_only"] = pytest.mark.skip(reason=f"SQLite only (running on {engine.dialect.name})")
+    if PER_GAME_DB:
+        skips["shared_game_db"] = pytest.mark.skip(reason="votes live in per-game databases")
+    for item in items:
+        for keyword, skip in skips.items():
+            if keyword in item.keywords:
+                item.add_marker(skip)
+
+
 @pytest.fixture(scope="function")
 def db() -> Session:
     """
@@ -19,6 +36,7 @@ def db() -> Session:
     # 既存テーブルを全部削除してから、再作成
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    drop_all_game_databases()
 
     session = SessionLocal()
     try:
@@ -35,3 +53,29 @@ def client() -> TestClient:
     """
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture(scope="function")
+def query_budget():
+    """
+    SQL の実行回数に上限（予算）を設けて N+1 の混入を検出するフィクスチャ。
+    テスト中は app/query_stats.py の計測を有効にし、X-DB-Queries を確認する関数を返す。
+
+        res = query_budget(client.get(f"/api/games/{game_id}/view", ...), 3)
+    """
+    previous = query_stats.enabled
+    query_stats.enabled = True
+    query_stats.reset_routes()
+
+    def check(response, max_queries: int):
+        used = int(response.headers[query_stats.QUERIES_HEADER])
+        assert used <= max_queries, (
+            f"{response.request.method} {response.request.url.path}: "
+            f"{used} queries (budget {max_queries})"
+        )
+        return response
+
+    try:
+        yield check
+    finally:
+        query_stats.enabled = previous
@@ -0,0 +1,125 @@
+# tests/test_alive_counts.py
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models.game import Game, GameMember
+from tests.test_night_phase import _setup_started_game
+
+
+@pytest.fixture(autouse=True)
+def check_alive_counts(monkeypatch):
+    """カウンタで判定するたびにメンバーから数え直して突き合わせる。"""
+    monkeypatch.setattr(config, "CHECK_ALIVE_COUNTS", True)
+
+
+def _counts(db: Session, game_id: str) -> tuple[int | None, int | None]:
+    db.expire_all()
+    game = db.get(Game, game_id)
+    return game.alive_wolf_count, game.alive_village_count
+
+
+def _day_execute(client: TestClient, game_id: str, members: list[GameMember], target: GameMember):
+    for voter in members:
+        if not voter.alive or voter.id == target.id:
+            continue
+        if voter.role_type == "WEREWOLF" and target.role_type == "WEREWOLF":
+            # 人狼は人狼に投票できない
+            continue
+        res = client.post(
+            f"/api/games/{game_id}/day_vote",
+            json={"voter_member_id": voter.id, "target_member_id": target.id},
+        )
+        assert res.status_code == 200, res.text
+    return client.post(
+        f"/api/games/{game_id}/resolve_day_simple",
+        json={"requester_member_id": members[0].id},
+    )
+
+
+def test_start_initializes_alive_counts(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    wolves = sum(1 for m in members if m.role_type == "WEREWOLF")
+    assert _counts(db, game_id) == (wolves, 9 - wolves)
+
+
+def test_day_and_night_deaths_decrement_counts(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    wolves = [m for m in members if m.role_type == "WEREWOLF"]
+    villagers = [m for m in members if m.role_type != "WEREWOLF"]
+
+    res = _day_execute(client, game_id, members, wolves[0])
+    assert res.json()["status"] == "NIGHT"
+    assert _counts(db, game_id) == (len(wolves) - 1, len(villagers))
+
+    for wolf in wolves[1:]:
+        res = client.post(
+            f"/api/games/{game_id}/wolves/vote",
+            json={"wolf_member_id": wolf.id, "target_member_id": villagers[0].id, "priority_level": 1},
+        )
+        assert res.status_code == 200, res.text
+    res = client.post(f"/api/games/{game_id}/resolve_night_simple")
+    assert res.status_code == 200, res.text
+    if res.json()["killed_member_id"]:
+        assert _counts(db, game_id) == (len(wolves) - 1, len(villagers) - 1)
+    else:
+        assert res.json()["guarded_success"] is True
+        assert _counts(db, game_id) == (len(wolves) - 1, len(villagers))
+
+
+def test_resolve_day_ends_game_from_counts(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=6)
+    first_wolf, last_wolf = [m for m in members if m.role_type == "WEREWOLF"]
+
+    # debug で生死を書き換えるとカウンタは数え直される
+    res = client.post(
+        "/api/debug/set_game_members",
+        json={"game_id": game_id, "updates": [{"member_id": first_wolf.id, "alive": False}]},
+    )
+    assert res.status_code == 200
+    assert _counts(db, game_id) == (1, 4)
+
+    first_wolf.alive = False
+    body = _day_execute(client, game_id, members, last_wolf).json()
+    assert body["status"] == "VILLAGE_WIN"
+    assert body["victim"]["alive"] is False
+    assert _counts(db, game_id) == (0, 4)
+    assert db.get(Game, game_id).status == "FINISHED"
+
+
+def test_legacy_game_without_counts_is_backfilled(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    game = db.get(Game, game_id)
+    game.alive_wolf_count = None
+    game.alive_village_count = None
+    db.commit()
+
+    villager = next(m for m in members if m.role_type == "VILLAGER")
+    assert _day_execute(client, game_id, members, villager).status_code == 200
+    wolves = sum(1 for m in members if m.role_type == "WEREWOLF")
+    assert _counts(db, game_id) == (wolves, 9 - wolves - 1)
+
+
+def test_drifted_counts_are_reported_and_repaired(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    wolves = sum(1 for m in members if m.role_type == "WEREWOLF")
+    game = db.get(Game, game_id)
+    game.alive_village_count = 1
+    db.commit()
+
+    body = client.get(f"/api/debug/games/{game_id}/alive_counts").json()
+    assert body["ok"] is False
+    assert body["stored"] == [wolves, 1]
+    assert body["actual"] == [wolves, 9 - wolves]
+
+    # 突き合わせが有効なら、ずれたカウンタで勝敗を決めずに 500 にする
+    villager = next(m for m in members if m.role_type == "VILLAGER")
+    res = _day_execute(client, game_id, members, villager)
+    assert res.status_code == 500
+    assert "out of sync" in res.json()["detail"]
+
+    body = client.get(f"/api/debug/games/{game_id}/alive_counts", params={"repair": True}).json()
+    assert body["repaired"] is True
+    assert client.get(f"/api/debug/games/{game_id}/alive_counts").json()["ok"] is True
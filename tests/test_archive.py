@@ -0,0 +1,121 @@
+# tests/test_archive.py
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import archive
+from app.db import engine
+from app.models.archive import GameArchive
+from app.models.game import DayVote, Game, GameMember
+from app.models.room import Room
+from app.state_store import RUNOFF_STATE_NS, get_state_store
+from tests.test_alive_counts import _day_execute
+from tests.test_night_phase import _setup_started_game
+
+
+def _finish_game(db: Session, client: TestClient, member_count: int = 6) -> tuple[str, list[GameMember]]:
+    """人狼を1人ずつ吊って村人勝ちで終わらせる。"""
+    game_id, members = _setup_started_game(db, client, member_count=member_count)
+    first_wolf, last_wolf = [m for m in members if m.role_type == "WEREWOLF"]
+    res = client.post(
+        "/api/debug/set_game_members",
+        json={"game_id": game_id, "updates": [{"member_id": first_wolf.id, "alive": False}]},
+    )
+    assert res.status_code == 200
+    first_wolf.alive = False
+    assert _day_execute(client, game_id, members, last_wolf).json()["status"] == "VILLAGE_WIN"
+    return game_id, members
+
+
+def test_finished_game_is_archived_and_purged(db: Session, client: TestClient):
+    game_id, members = _finish_game(db, client)
+    game = db.get(Game, game_id)
+    room_id = game.room_id
+    assert game.status == "FINISHED"
+    assert game.finished_at is not None
+    votes = db.query(DayVote).filter(DayVote.game_id == game_id).count()
+    assert votes > 0
+    get_state_store().set(db, RUNOFF_STATE_NS, game_id, {"day_no": 1, "candidate_ids": []})
+    db.commit()
+    db.close()
+
+    # 終わったばかりなので、既定の保持期間では残る
+    assert archive.run_once()["archived"] == 0
+
+    result = client.post("/api/debug/archive/run", params={"older_than_sec": 0}).json()
+    assert result["archived"] == 1
+    assert result["vacuum"] in ("incremental", "full", "skipped")
+
+    assert db.get(Game, game_id) is None
+    assert db.query(GameMember).filter(GameMember.game_id == game_id).count() == 0
+    assert db.query(DayVote).filter(DayVote.game_id == game_id).count() == 0
+    assert get_state_store().get(db, RUNOFF_STATE_NS, game_id) is None
+    assert db.get(Room, room_id).current_game_id is None
+
+    row = db.get(GameArchive, game_id)
+    assert (row.room_id, row.status) == (room_id, "FINISHED")
+    assert len(row.payload) < row.raw_bytes
+
+    snapshot = client.get(f"/api/debug/archive/games/{game_id}").json()
+    assert snapshot["game"]["id"] == game_id
+    assert snapshot["game"]["status"] == "FINISHED"
+    assert {m["id"] for m in snapshot["members"]} == {m.id for m in members}
+    assert len(snapshot["day_votes"]) == votes
+    assert client.get("/api/debug/archive/games/no-such-game").status_code == 404
+
+    # ルームは残っていて、次のゲームを始められる
+    assert client.get(f"/api/rooms/{room_id}").status_code == 200
+
+
+def test_running_and_recent_games_are_kept(db: Session, client: TestClient):
+    old_game_id, _ = _finish_game(db, client)
+    recent_game_id, _ = _finish_game(db, client)
+    running_game_id, _ = _setup_started_game(db, client, member_count=6)
+
+    # 古いほうだけ保持期間を過ぎたことにする
+    old_game = db.get(Game, old_game_id)
+    old_game.finished_at = datetime.utcnow() - timedelta(days=30)
+    running_game = db.get(Game, running_game_id)
+    running_game.created_at = datetime.utcnow() - timedelta(days=30)
+    db.commit()
+    db.close()
+
+    result = archive.run_once(older_than_sec=7 * 24 * 3600, batch_size=1)
+    assert result["archived"] == 1
+    assert [row.game_id for row in db.query(GameArchive).all()] == [old_game_id]
+    assert db.get(Game, recent_game_id) is not None
+    assert db.get(Game, running_game_id) is not None
+
+
+def test_vacuum_full(db: Session, client: TestClient):
+    _finish_game(db, client)
+    db.close()
+    result = archive.run_once(older_than_sec=0, vacuum_mode="FULL")
+    assert result["archived"] == 1
+    assert result["vacuum"] == ("full" if engine.dialect.name == "sqlite" else "skipped")
+
+
+def test_delete_room_keeps_archives_unless_purged(db: Session, client: TestClient):
+    archived_game_id, _ = _finish_game(db, client)
+    room_id = db.get(Game, archived_game_id).room_id
+    db.close()
+    archive.run_once(older_than_sec=0)
+    assert db.get(GameArchive, archived_game_id) is not None
+
+    # 既定ではアーカイブは残り、ルームが無くても読める
+    res = client.delete(f"/api/rooms/{room_id}")
+    assert res.status_code == 204
+    assert db.get(Room, room_id) is None
+    assert client.get(f"/api/debug/archive/games/{archived_game_id}").status_code == 200
+
+    # purge_archives=true ならルームのアーカイブも消す
+    other_game_id, _ = _finish_game(db, client)
+    other_room_id = db.get(Game, other_game_id).room_id
+    db.close()
+    archive.run_once(older_than_sec=0)
+    res = client.delete(f"/api/rooms/{other_room_id}", params={"purge_archives": True})
+    assert res.status_code == 204
+    assert db.query(GameArchive).filter(GameArchive.room_id == other_room_id).count() == 0
+    assert db.get(GameArchive, archived_game_id) is not None
@@ -0,0 +1,69 @@
+# tests/test_async_endpoints.py
+
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db import async_engine
+from app.main import app
+from app.models.game import DayVote
+
+
+def _setup_started_game(db: Session, client: TestClient, member_count: int = 9):
+    from tests.test_night_phase import _setup_started_game as _orig
+    return _orig(db, client, member_count=member_count)
+
+
+def test_concurrent_day_votes_on_async_endpoints(client: TestClient, db: Session):
+    """
+    全員の投票と進捗ポーリングを同じイベントループ上で一斉に送っても、
+    すべて処理されて票数が揃うこと。
+    """
+    game_id, members = _setup_started_game(db, client)
+
+    def target_for(voter):
+        return next(
+            m for m in members
+            if m.id != voter.id and not (voter.role_type == "WEREWOLF" and m.role_type == "WEREWOLF")
+        )
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            votes = [
+                ac.post(
+                    f"/api/games/{game_id}/day_vote",
+                    json={"voter_member_id": v.id, "target_member_id": target_for(v).id},
+                )
+                for v in members
+            ]
+            polls = [ac.get(f"/api/games/{game_id}/day_vote_status") for _ in range(len(members))]
+            results = await asyncio.gather(*votes, *polls)
+            status = await ac.get(f"/api/games/{game_id}/day_vote_status")
+        # このテスト用ループで開いた接続を閉じておく
+        await async_engine.dispose()
+        return results, status
+
+    results, status = asyncio.run(run())
+
+    assert all(r.status_code == 200 for r in results)
+    assert status.json()["voted_count"] == len(members)
+    assert status.json()["all_done"] is True
+    assert db.query(DayVote).filter(DayVote.game_id == game_id).count() == len(members)
+
+
+def test_async_read_endpoints_match_sync_session(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client)
+
+    res = client.get(f"/api/games/{game_id}/members")
+    assert res.status_code == 200
+    assert [m["id"] for m in res.json()] == [m.id for m in members]
+
+    res = client.get(f"/api/games/{game_id}/me", params={"player_id": members[0].id})
+    assert res.status_code == 200
+    assert res.json()["is_host"] is True
+
+    res = client.get("/api/games/nonexistent-id/day_vote_status")
+    assert res.status_code == 404
@@ -0,0 +1,37 @@
+# tests/test_db_pool.py
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+from app import config, query_stats
+from app.db import engine, pool_options
+from tests.test_night_phase import _create_room_with_members
+
+
+def test_default_pool_is_sized_queue_pool():
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == config.DB_POOL_SIZE
+    assert engine.pool.timeout() == config.DB_POOL_TIMEOUT_SEC
+
+
+def test_pool_options_follow_config(monkeypatch):
+    monkeypatch.setattr(config, "DB_POOL_CLASS", "STATIC")
+    monkeypatch.setattr(config, "DB_POOL_PRE_PING", True)
+    assert pool_options() == {"pool_pre_ping": True, "poolclass": StaticPool}
+
+    monkeypatch.setattr(config, "DB_POOL_CLASS", "NULL")
+    assert pool_options()["poolclass"] is NullPool
+
+    monkeypatch.setattr(config, "DB_POOL_CLASS", "QUEUE")
+    monkeypatch.setattr(config, "DB_POOL_SIZE", 3)
+    options = pool_options()
+    assert "poolclass" not in options
+    assert options["pool_size"] == 3
+
+
+def test_objects_stay_loaded_after_commit(db: Session):
+    """expire_on_commit=False: commit 後に属性を読んでも SELECT しない。"""
+    room = _create_room_with_members(db, 6)
+    with query_stats.collect() as stats:
+        assert room.name
+        assert room.id
+    assert stats.queries == 0
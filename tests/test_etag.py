@@ -0,0 +1,140 @@
+# tests/test_etag.py
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db import async_engine, engine
+from app.models.game import Game
+
+
+def _setup_started_game(db: Session, client: TestClient, member_count: int = 8):
+    from tests.test_night_phase import _setup_started_game as _orig
+    return _orig(db, client, member_count=member_count)
+
+
+def test_game_get_returns_304_until_version_changes(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client)
+
+    first = client.get(f"/api/games/{game_id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get(f"/api/games/{game_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    voter = members[1]
+    target = next(
+        m for m in members
+        if m.id != voter.id and not (voter.role_type == "WEREWOLF" and m.role_type == "WEREWOLF")
+    )
+    res = client.post(
+        f"/api/games/{game_id}/day_vote",
+        json={"voter_member_id": voter.id, "target_member_id": target.id},
+    )
+    assert res.status_code == 200
+
+    status = client.get(f"/api/games/{game_id}/day_vote_status", headers={"If-None-Match": etag})
+    assert status.status_code == 200
+    assert status.json()["voted_count"] == 1
+    new_etag = status.headers["etag"]
+    assert new_etag != etag
+
+    # 同じ version の ETag なら別のエンドポイントでも 304
+    for path in ("", "/members", "/day_vote_status", "/night_actions_status", "/judge"):
+        res = client.get(f"/api/games/{game_id}{path}", headers={"If-None-Match": new_etag})
+        assert res.status_code == 304, path
+
+
+def test_version_increments_on_each_mutation(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client)
+
+    before = db.get(Game, game_id).version
+    res = client.post(f"/api/games/{game_id}/debug_set_status", params={"status": "NIGHT"})
+    assert res.status_code == 200
+
+    db.expire_all()
+    assert db.get(Game, game_id).version == before + 1
+
+
+def test_if_none_match_list_and_wildcard(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client)
+    etag = client.get(f"/api/games/{game_id}").headers["etag"]
+
+    res = client.get(
+        f"/api/games/{game_id}",
+        headers={"If-None-Match": f'W/"other:1", {etag.removeprefix("W/")}'},
+    )
+    assert res.status_code == 304
+
+    res = client.get(f"/api/games/{game_id}", headers={"If-None-Match": "*"})
+    assert res.status_code == 304
+
+
+def test_room_etag_changes_when_members_change(client: TestClient, db: Session):
+    room_id = client.post("/api/rooms", json={"name": "ETag Room"}).json()["id"]
+
+    first = client.get(f"/api/rooms/{room_id}/members")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get(
+        f"/api/rooms/{room_id}/members", headers={"If-None-Match": etag}
+    ).status_code == 304
+
+    added = client.post(f"/api/rooms/{room_id}/members", json={"display_name": "New"})
+    assert added.status_code == 200
+
+    res = client.get(f"/api/rooms/{room_id}/members", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert [m["display_name"] for m in res.json()] == ["New"]
+    assert res.headers["etag"] != etag
+
+
+@pytest.mark.shared_game_db
+def test_vote_write_ends_with_version_returning(client: TestClient, db: Session):
+    """
+    投票の書き込みは 行の INSERT → version の UPDATE ... RETURNING → イベントログの INSERT → commit で、
+    間に SELECT を挟まない。
+    """
+    game_id, members = _setup_started_game(db, client)
+    voter, target = next(
+        (v, t) for v in members for t in members
+        if v.id != t.id and not (v.role_type == "WEREWOLF" and t.role_type == "WEREWOLF")
+    )
+    before = db.get(Game, game_id).version
+
+    statements = []
+
+    def capture(_conn, _cursor, statement, *_args):
+        statements.append(" ".join(statement.split()))
+
+    # day_vote は async エンドポイント（async_engine）
+    engines = (engine, async_engine.sync_engine)
+    for target_engine in engines:
+        event.listen(target_engine, "before_cursor_execute", capture)
+    try:
+        res = client.post(
+            f"/api/games/{game_id}/day_vote",
+            json={"voter_member_id": voter.id, "target_member_id": target.id},
+        )
+    finally:
+        for target_engine in engines:
+            event.remove(target_engine, "before_cursor_execute", capture)
+    assert res.status_code == 200
+
+    first_write = next(i for i, sql in enumerate(statements) if not sql.startswith("SELECT"))
+    writes = statements[first_write:]
+    assert writes[0].startswith("INSERT INTO day_votes")
+    assert writes[1].startswith("UPDATE games SET version=(games.version + ")
+    assert "RETURNING" in writes[1]
+    assert writes[2].startswith("INSERT INTO game_events")
+    assert len(writes) == 3
+
+    db.expire_all()
+    assert db.get(Game, game_id).version == before + 1
+
@@ -0,0 +1,157 @@
+# tests/test_game_db.py
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import game_log
+from app.api.v1.games import _day_vote
+from app.db import GAME_ENGINE_FOR, GameDatabases, GameRoutedSession, bind_game, engine, routes_games
+from app.models.game import DayVote, Game, GameMember
+from app.schemas.day import DayVoteCreate
+from tests.test_night_phase import _setup_started_game
+
+# 本体の DB を1ファイルのまま、tmp_path に卓のファイルを置いて振り分けを確かめる
+pytestmark = [pytest.mark.sqlite_only, pytest.mark.shared_game_db]
+
+
+def _voter_and_targets(members):
+    """役職は乱択なので、狼どうしの投票にならないよう狼以外を投票者にする。"""
+    voter = next(m for m in members if m.role_type != "WEREWOLF")
+    return voter, [m for m in members if m.id != voter.id]
+
+
+@pytest.fixture
+def game_dbs(tmp_path):
+    dbs = GameDatabases(str(tmp_path))
+    yield dbs
+    dbs.close_all()
+
+
+@pytest.fixture
+def routed(game_dbs):
+    """本体は app.db の engine、投票・行動テーブルは tmp_path の卓ごとのファイルに向く Session。"""
+    factory = sessionmaker(
+        bind=engine, class_=GameRoutedSession, info={GAME_ENGINE_FOR: game_dbs.engine}, expire_on_commit=False,
+    )
+    session = factory()
+    yield session
+    session.close()
+
+
+def test_votes_are_written_to_the_game_database(db: Session, client: TestClient, game_dbs, routed):
+    game_id, members = _setup_started_game(db, client)
+    voter, targets = _voter_and_targets(members)
+    assert routes_games(routed) and not routes_games(db)
+
+    bind_game(routed, game_id)
+    _day_vote(
+        game_id=game_id,
+        data=DayVoteCreate(voter_member_id=voter.id, target_member_id=targets[0].id),
+        db=routed,
+    )
+
+    # 本体の DB には入らず、卓のファイルに入る
+    assert db.query(DayVote).filter(DayVote.game_id == game_id).count() == 0
+    assert os.path.exists(game_dbs.path(game_id))
+    with game_dbs.engine(game_id).connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM day_votes").scalar() == 1
+
+    # bind_game していない Session でも、game_id の等号条件から卓のファイルを選ぶ
+    other = sessionmaker(bind=engine, class_=GameRoutedSession, info={GAME_ENGINE_FOR: game_dbs.engine})()
+    try:
+        assert other.query(func.count(DayVote.id)).filter(DayVote.game_id == game_id).scalar() == 1
+    finally:
+        other.close()
+
+    game_dbs.drop([game_id])
+    assert not os.path.exists(game_dbs.path(game_id))
+
+
+def test_routed_session_rejects_statements_it_cannot_route(db: Session, client: TestClient, routed):
+    game_id, _ = _setup_started_game(db, client)
+
+    # 本体のテーブルとの JOIN は1つの接続で実行できない
+    with pytest.raises(RuntimeError, match="different files"):
+        (
+            routed.query(DayVote, GameMember.display_name)
+            .join(GameMember, GameMember.id == DayVote.voter_member_id)
+            .filter(DayVote.game_id == game_id)
+            .all()
+        )
+
+    # 複数の卓をまとめて読む条件では卓を選べない
+    with pytest.raises(RuntimeError, match="no game bound"):
+        routed.query(DayVote).filter(DayVote.game_id.in_([game_id])).all()
+
+
+def _fail_commit(conn):
+    raise RuntimeError("commit failed")
+
+
+def _logged_day_votes(db: Session, game_id: str) -> int:
+    db.expire_all()
+    return sum(e.type == game_log.EVENT_DAY_VOTE for e in game_log.load_events(db, game_id))
+
+
+def test_game_file_is_rolled_back_when_the_main_commit_fails(db: Session, client: TestClient, game_dbs, routed):
+    """本体を先に commit するので、本体が失敗したら卓のファイルにも投票が残らないこと。"""
+    game_id, members = _setup_started_game(db, client)
+    voter, targets = _voter_and_targets(members)
+    version = db.get(Game, game_id).version
+    bind_game(routed, game_id)
+
+    # 他のテストのスレッドの commit に当たらないよう、この Session の本体の接続だけを失敗させる
+    main_conn = routed.connection()
+    event.listen(main_conn, "commit", _fail_commit)
+    try:
+        with pytest.raises(RuntimeError, match="commit failed"):
+            _day_vote(
+                game_id=game_id,
+                data=DayVoteCreate(voter_member_id=voter.id, target_member_id=targets[0].id),
+                db=routed,
+            )
+    finally:
+        event.remove(main_conn, "commit", _fail_commit)
+    routed.rollback()
+
+    with game_dbs.engine(game_id).connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM day_votes").scalar() == 0
+    assert _logged_day_votes(db, game_id) == 0
+    assert db.get(Game, game_id).version == version
+
+
+def test_logged_vote_is_discarded_when_the_game_file_commit_fails(db: Session, client: TestClient, game_dbs, routed):
+    """本体の後で卓のファイルの commit が失敗したら、入らなかった投票のイベントを本体から消すこと。"""
+    game_id, members = _setup_started_game(db, client)
+    voter, targets = _voter_and_targets(members)
+    bind_game(routed, game_id)
+    game_engine = game_dbs.engine(game_id)
+
+    event.listen(game_engine, "commit", _fail_commit)
+    try:
+        with pytest.raises(RuntimeError, match="commit failed"):
+            _day_vote(
+                game_id=game_id,
+                data=DayVoteCreate(voter_member_id=voter.id, target_member_id=targets[0].id),
+                db=routed,
+            )
+    finally:
+        event.remove(game_engine, "commit", _fail_commit)
+
+    with game_engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM day_votes").scalar() == 0
+    assert _logged_day_votes(db, game_id) == 0
+
+    # 次の投票は普通に入り、ログと投票テーブルが揃ったまま
+    _day_vote(
+        game_id=game_id,
+        data=DayVoteCreate(voter_member_id=voter.id, target_member_id=targets[1].id),
+        db=routed,
+    )
+    with game_engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM day_votes").scalar() == 1
+    assert _logged_day_votes(db, game_id) == 1
@@ -0,0 +1,114 @@
+# tests/test_game_engine.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import game_engine
+from app.api.etag import bump_version
+from app.db import async_engine, engine
+from app.game_engine import get_game_engine
+from app.models.game import Game, GameMember
+
+
+def _setup_started_game(db: Session, client: TestClient, member_count: int = 6):
+    from tests.test_night_phase import _setup_started_game as _orig
+    return _orig(db, client, member_count=member_count)
+
+
+class _StatementLog:
+    """engine / async_engine に流れた SQL を記録する。"""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", self)
+
+
+def _vote_target(members, voter):
+    return next(
+        m for m in members
+        if m.id != voter.id and not (voter.role_type == "WEREWOLF" and m.role_type == "WEREWOLF")
+    )
+
+
+def test_cached_engine_only_reads_game_version(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client)
+    game_engine.clear()
+
+    first = get_game_engine(db, game_id)
+    assert first is not None
+    assert [m.id for m in first.members] == [m.id for m in members]
+    db.rollback()
+
+    with _StatementLog() as log:
+        second = get_game_engine(db, game_id)
+
+    assert second is first
+    assert len(log.statements) == 1
+    assert "game_members" not in log.statements[0]
+
+
+def test_engine_reloads_when_version_changes(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client)
+    before = get_game_engine(db, game_id)
+    db.rollback()
+
+    victim = db.get(GameMember, members[1].id)
+    victim.alive = False
+    game = db.get(Game, game_id)
+    bump_version(game)
+    db.commit()
+
+    after = get_game_engine(db, game_id)
+    assert after.version == before.version + 1
+    assert after.member(victim.id).alive is False
+
+    res = client.get(f"/api/games/{game_id}/day_vote_status")
+    assert res.json()["alive_total"] == len(members) - 1
+
+
+def test_votes_are_applied_to_cached_engine(client: TestClient, db: Session):
+    """投票は commit 後に差分で反映され、再構築せずに進捗 API に出ること。"""
+    game_id, members = _setup_started_game(db, client)
+    assert client.get(f"/api/games/{game_id}/day_vote_status").json()["voted_count"] == 0
+    cached = get_game_engine(db, game_id)
+    db.rollback()
+
+    voter = members[1]
+    res = client.post(
+        f"/api/games/{game_id}/day_vote",
+        json={"voter_member_id": voter.id, "target_member_id": _vote_target(members, voter).id},
+    )
+    assert res.status_code == 200
+
+    updated = game_engine._ENGINES[game_id]
+    assert updated.version == cached.version + 1
+    assert updated.day_voters == {voter.id}
+    # 差分反映なのでメンバーは同じタプルを使い回している
+    assert updated.members is cached.members
+
+    with _StatementLog() as log:
+        status = client.get(f"/api/games/{game_id}/day_vote_status").json()
+    assert status["voted_count"] == 1
+    assert not any("day_votes" in s for s in log.statements)
+
+
+def test_record_action_drops_engine_when_versions_skip(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client)
+    cached = get_game_engine(db, game_id)
+    db.rollback()
+
+    game_engine.record_action(game_id, cached.version + 2, game_engine.ACTION_DAY_VOTE, members[0].id)
+
+    assert game_id not in game_engine._ENGINES
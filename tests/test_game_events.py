@@ -0,0 +1,145 @@
+# tests/test_game_events.py
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.v1 import games as games_api
+from app.api.v1.games import _game_event_stream
+from app.models.game import Game, GameMember
+from app.realtime import hub, game_topic
+
+
+def _setup_started_game(db: Session, client: TestClient, member_count: int = 6):
+    from tests.test_night_phase import _setup_started_game as _orig
+    return _orig(db, client, member_count=member_count)
+
+
+class _FakeRequest:
+    """is_disconnected だけを持つ Request の代用品。"""
+
+    def __init__(self) -> None:
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+def _parse_sse(chunk: str) -> tuple[str, dict]:
+    lines = chunk.strip().splitlines()
+    event = lines[0].removeprefix("event: ")
+    data = json.loads(lines[1].removeprefix("data: "))
+    return event, data
+
+
+def test_game_events_unknown_game_returns_404(client: TestClient, db: Session):
+    res = client.get("/api/games/nonexistent-id/events")
+    assert res.status_code == 404
+
+
+def test_game_event_stream_sends_snapshot_first(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client)
+
+    async def first_chunk():
+        stream = _game_event_stream(_FakeRequest(), game_id)
+        try:
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+    event, data = _parse_sse(asyncio.run(first_chunk()))
+    assert event == "game_state"
+    assert data["game_id"] == game_id
+    assert data["status"] == "DAY_DISCUSSION"
+    assert data["curr_day"] == 1
+    assert sorted(data["alive_ids"]) == sorted(m.id for m in members)
+    # 切断後は購読が残らない
+    assert hub.subscriber_count(game_topic(game_id)) == 0
+
+
+# 待機中の version の読み直しは async エンジンを使う（test_long_poll.py と同じ理由で SQLite のみ）
+@pytest.mark.sqlite_only
+def test_game_event_stream_resends_snapshot_on_update_from_another_worker(client: TestClient, db: Session, monkeypatch):
+    """hub に publish されない更新（別ワーカーでの commit）も、version の読み直しで送ること。"""
+    monkeypatch.setattr(games_api, "WAIT_RECHECK_SEC", 0.05)
+    game_id, _ = _setup_started_game(db, client)
+    game = db.get(Game, game_id)
+
+    async def run():
+        stream = _game_event_stream(_FakeRequest(), game_id)
+        try:
+            first = _parse_sse(await stream.__anext__())
+            game.status = "NIGHT"
+            game.version += 1
+            await asyncio.to_thread(db.commit)
+            second = _parse_sse(await asyncio.wait_for(stream.__anext__(), timeout=5))
+        finally:
+            await stream.aclose()
+        return first, second
+
+    (_, first), (event, second) = asyncio.run(run())
+    assert event == "game_state"
+    assert second["version"] == first["version"] + 1
+    assert second["status"] == "NIGHT"
+
+
+def test_day_vote_and_resolve_publish_game_state(client: TestClient, db: Session):
+    """昼投票・処刑確定の commit 後に購読者へ状態が届くこと。"""
+    game_id, members = _setup_started_game(db, client)
+    host = members[0]
+    wolves = [m for m in members if m.role_type == "WEREWOLF"]
+    target = next(m for m in members if m.role_type != "WEREWOLF" and m.id != host.id)
+
+    async def run():
+        received = []
+        async with hub.subscription(game_topic(game_id)) as queue:
+            for voter in members:
+                if voter.id == target.id:
+                    continue
+                res = await asyncio.to_thread(
+                    client.post,
+                    f"/api/games/{game_id}/day_vote",
+                    json={"voter_member_id": voter.id, "target_member_id": target.id},
+                )
+                assert res.status_code == 200
+                received.append(await asyncio.wait_for(queue.get(), timeout=2))
+
+            res = await asyncio.to_thread(
+                client.post,
+                f"/api/games/{game_id}/resolve_day_simple",
+                json={"requester_member_id": host.id},
+            )
+            assert res.status_code == 200
+            received.append(await asyncio.wait_for(queue.get(), timeout=2))
+        return received
+
+    events = asyncio.run(run())
+
+    assert all(e["type"] == "game_state" for e in events)
+    assert events[0]["status"] == "DAY_DISCUSSION"
+    last = events[-1]
+    assert last["status"] == "NIGHT"
+    assert last["curr_night"] == 1
+    assert target.id not in last["alive_ids"]
+    assert len(last["alive_ids"]) == len(members) - 1
+    assert wolves and all(w.id in last["alive_ids"] for w in wolves)
+
+
+def test_publish_without_subscribers_is_noop(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client)
+    assert hub.subscriber_count(game_topic(game_id)) == 0
+    # 購読者がいなくても投票処理はそのまま成功する
+    members = db.query(GameMember).filter(GameMember.game_id == game_id).all()
+    voter = members[0]
+    target = next(
+        m for m in members
+        if m.id != voter.id and not (voter.role_type == "WEREWOLF" and m.role_type == "WEREWOLF")
+    )
+    res = client.post(
+        f"/api/games/{game_id}/day_vote",
+        json={"voter_member_id": voter.id, "target_member_id": target.id},
+    )
+    assert res.status_code == 200
@@ -0,0 +1,166 @@
+# tests/test_game_log.py
+
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import game_log
+from app.models.game import DayVote, Game, GameMember
+from app.models.game_event import GameEvent
+from tests.test_night_phase import _setup_started_game
+
+
+def _play_two_days(db: Session, client: TestClient) -> tuple[str, list[GameMember]]:
+    """
+    9人で 昼（同票→決選投票→処刑）→ 夜（占い・護衛・霊媒・襲撃）まで進め、(game_id, members) を返す。
+    """
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    host = members[0]
+    by_role = {}
+    for m in members:
+        by_role.setdefault(m.role_type, []).append(m)
+    wolves = by_role["WEREWOLF"]
+    seer, knight, medium = by_role["SEER"][0], by_role["KNIGHT"][0], by_role["MEDIUM"][0]
+    a, b = [m for m in members[1:] if m.role_type in ("VILLAGER", "MADMAN")][:2]
+
+    assert client.get(f"/api/games/{game_id}/seer/first_white").status_code == 200
+
+    # 1回目: a と b が4票ずつで同票 → 決選投票（この投票は day_votes から消える）
+    others = [m for m in members if m.id not in (a.id, b.id)]
+    last = others[-1]
+    c = next(m for m in others if m.id != last.id and m.role_type != "WEREWOLF")
+    votes = [
+        {"voter_member_id": a.id, "target_member_id": b.id},
+        {"voter_member_id": b.id, "target_member_id": a.id},
+    ]
+    for i, voter in enumerate(others[:-1]):
+        votes.append({"voter_member_id": voter.id, "target_member_id": (a if i < 3 else b).id})
+    votes.append({"voter_member_id": last.id, "target_member_id": c.id})
+    res = client.post(f"/api/games/{game_id}/day_votes:batch", json={"votes": votes})
+    assert res.json()["rejected"] == 0, res.text
+    requester = {"requester_member_id": host.id}
+    res = client.post(f"/api/games/{game_id}/resolve_day_simple", json=requester)
+    assert res.json()["status"] == "RUNOFF", res.text
+
+    # 決選投票: a を処刑
+    for voter in members:
+        target = b if voter.id == a.id else a
+        res = client.post(
+            f"/api/games/{game_id}/day_vote",
+            json={"voter_member_id": voter.id, "target_member_id": target.id},
+        )
+        assert res.status_code == 200, res.text
+    res = client.post(f"/api/games/{game_id}/resolve_day_simple", json=requester)
+    assert res.json()["status"] == "NIGHT", res.text
+
+    # 夜: 人狼は b を襲い、騎士は占い師を守る
+    for wolf in wolves:
+        res = client.post(
+            f"/api/games/{game_id}/wolves/vote",
+            json={"wolf_member_id": wolf.id, "target_member_id": b.id, "priority_level": 1},
+        )
+        assert res.status_code == 200, res.text
+    res = client.post(f"/api/games/{game_id}/seer/{seer.id}/inspect", json={"target_member_id": wolves[0].id})
+    assert res.status_code == 200, res.text
+    res = client.post(f"/api/games/{game_id}/knight/{knight.id}/guard", json={"target_member_id": seer.id})
+    assert res.status_code == 200, res.text
+    res = client.post(f"/api/games/{game_id}/medium/{medium.id}/inspect")
+    assert res.status_code == 200, res.text
+    res = client.post(f"/api/games/{game_id}/resolve_night_simple")
+    assert res.json()["killed_member_id"] == b.id, res.text
+
+    db.expire_all()
+    return game_id, members
+
+
+def test_replay_rebuilds_current_state(db: Session, client: TestClient):
+    game_id, members = _play_two_days(db, client)
+    game = db.get(Game, game_id)
+
+    state = client.get(f"/api/games/{game_id}/replay").json()
+    assert (state["status"], state["curr_day"], state["curr_night"], state["vote_round"]) == (
+        game.status, game.curr_day, game.curr_night, game.vote_round,
+    )
+    assert state["version"] == game.version
+    assert state["last_executed_member_id"] == game.last_executed_member_id
+    assert state["seer_first_white_target_id"] == game.seer_first_white_target_id
+    assert state["settings"]["wolf_vote_lvl1_point"] == game.wolf_vote_lvl1_point
+
+    db_members = {
+        m.id: (m.role_type, m.team, m.alive)
+        for m in db.query(GameMember).filter(GameMember.game_id == game_id)
+    }
+    assert {m["id"]: (m["role_type"], m["team"], m["alive"]) for m in state["members"]} == db_members
+
+    day_votes = {v.voter_member_id: v.target_member_id for v in db.query(DayVote).filter(DayVote.game_id == game_id)}
+    assert state["day_votes"] == {"1": day_votes}
+    assert len(state["seer_inspects"]) == len(state["knight_guards"]) == len(state["medium_inspects"]) == 1
+
+
+def test_log_keeps_votes_cleared_by_runoff(db: Session, client: TestClient):
+    game_id, members = _play_two_days(db, client)
+
+    # limit ずつ読み進めても、まとめて読んでも同じ
+    events, after_id = [], 0
+    while True:
+        body = client.get(f"/api/games/{game_id}/log", params={"after_id": after_id, "limit": 4}).json()
+        if not body["events"]:
+            break
+        events += body["events"]
+        after_id = body["next_after_id"]
+    assert events == client.get(f"/api/games/{game_id}/log").json()["events"]
+
+    types = [e["type"] for e in events]
+    assert types[:3] == [game_log.EVENT_GAME_CREATED, game_log.EVENT_ROLES_ASSIGNED, game_log.EVENT_GAME_STARTED]
+    assert types.index(game_log.EVENT_RUNOFF_STARTED) < types.index(game_log.EVENT_DAY_RESOLVED)
+    assert types[-1] == game_log.EVENT_NIGHT_RESOLVED
+
+    # 決選投票の前の1回目の投票（DB からは消えている）が9人分残っている
+    first_round = events[types.index(game_log.EVENT_RUNOFF_STARTED) - 1]
+    assert first_round["type"] == game_log.EVENT_DAY_VOTE
+    assert len(first_round["payload"]["votes"]) == len(members)
+
+    # version は発生順に増える（同じ commit のイベントは同じ version）
+    versions = [e["version"] for e in events[1:]]
+    assert versions == sorted(versions)
+    assert events[-1]["version"] == db.get(Game, game_id).version
+
+    assert client.get("/api/games/no-such-game/log").status_code == 404
+
+
+def test_replay_at_offset(db: Session, client: TestClient):
+    game_id, members = _play_two_days(db, client)
+
+    created = client.get(f"/api/games/{game_id}/replay", params={"offset": 1}).json()
+    assert created["status"] == "WAITING"
+    assert all(m["role_type"] is None for m in created["members"])
+
+    started = client.get(f"/api/games/{game_id}/replay", params={"offset": 3}).json()
+    assert (started["status"], started["started"], started["curr_day"], started["curr_night"]) == (
+        "DAY_DISCUSSION", True, 1, 0,
+    )
+    assert all(m["alive"] for m in started["members"])
+    assert {m["id"]: m["role_type"] for m in started["members"]} == {m.id: m.role_type for m in members}
+
+    assert client.get(f"/api/games/{game_id}/replay", params={"offset": 0}).status_code == 422
+    assert client.get("/api/games/no-such-game/replay").status_code == 404
+
+
+def test_replay_detects_draw_that_does_not_match_seed(db: Session, client: TestClient):
+    game_id, _ = _play_two_days(db, client)
+    event = (
+        db.query(GameEvent)
+        .filter(GameEvent.game_id == game_id, GameEvent.type == game_log.EVENT_ROLES_ASSIGNED)
+        .one()
+    )
+    payload = json.loads(event.payload)
+    payload["seed"] += 1
+    event.payload = json.dumps(payload)
+    db.commit()
+
+    res = client.get(f"/api/games/{game_id}/replay")
+    assert res.status_code == 500
+    assert game_log.EVENT_ROLES_ASSIGNED in res.json()["detail"]
+    # 突き合わせをしなければ、記録した結果のまま再生できる
+    assert game_log.replay_game(db, game_id, verify=False).status == db.get(Game, game_id).status
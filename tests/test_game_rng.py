@@ -0,0 +1,108 @@
+# tests/test_game_rng.py
+
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import game_log
+from app.models.game import Game, GameMember
+from app.models.game_event import GameEvent
+from tests.test_night_phase import _create_room_with_members, _setup_started_game
+
+
+def _start_seeded_game(db: Session, client: TestClient, seed: int, member_count: int = 9) -> str:
+    room = _create_room_with_members(db, member_count)
+    res = client.post("/api/games", json={"room_id": room.id, "seed": seed})
+    assert res.status_code == 200, res.text
+    game_id = res.json()["id"]
+    assert client.post(f"/api/games/{game_id}/start").status_code == 200
+    return game_id
+
+
+def _roles_by_order(db: Session, game_id: str) -> list[str]:
+    return [
+        m.role_type
+        for m in db.query(GameMember).filter(GameMember.game_id == game_id).order_by(GameMember.order_no.asc())
+    ]
+
+
+def test_same_seed_assigns_same_roles(db: Session, client: TestClient):
+    first = _start_seeded_game(db, client, seed=12345)
+    second = _start_seeded_game(db, client, seed=12345)
+    assert db.get(Game, first).rng_seed == 12345
+    assert _roles_by_order(db, first) == _roles_by_order(db, second)
+
+    # seed はプレイヤー向けのレスポンスには出さない
+    assert "rng_seed" not in client.get(f"/api/games/{first}").json()
+
+    room = _create_room_with_members(db, 6)
+    for seed in (-1, 2**63):
+        res = client.post("/api/games", json={"room_id": room.id, "seed": seed})
+        assert res.status_code == 422, res.text
+
+
+def test_night_result_matches_resolved_tie(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    wolves = [m for m in members if m.role_type == "WEREWOLF"]
+    villagers = [m for m in members if m.team == "VILLAGE"]
+    assert len(wolves) >= 2
+
+    game = db.get(Game, game_id)
+    game.status = "NIGHT"
+    night_no = game.curr_night
+    db.commit()
+
+    # 人狼が別々の相手に同じポイントで投票 → 同点（乱択で決まる）
+    for wolf, target in zip(wolves, villagers):
+        res = client.post(
+            f"/api/games/{game_id}/wolves/vote",
+            json={"wolf_member_id": wolf.id, "target_member_id": target.id, "priority_level": 1},
+        )
+        assert res.status_code == 200, res.text
+
+    previews = {client.get(f"/api/games/{game_id}/night_result").json()["victim"]["id"] for _ in range(5)}
+    assert len(previews) == 1
+
+    res = client.post(f"/api/games/{game_id}/resolve_night_simple")
+    assert res.status_code == 200, res.text
+    killed_id = res.json()["killed_member_id"]
+    assert previews == {killed_id}
+
+    after = client.get(f"/api/games/{game_id}/night_result", params={"night_no": night_no}).json()
+    assert after["victim"]["id"] == killed_id
+
+    event = (
+        db.query(GameEvent)
+        .filter(GameEvent.game_id == game_id, GameEvent.type == game_log.EVENT_NIGHT_RESOLVED)
+        .one()
+    )
+    payload = json.loads(event.payload)
+    assert payload["draw_key"] == ["night", night_no]
+    assert payload["seed"] == game_log.draw_seed(db.get(Game, game_id).rng_seed, "night", night_no)
+
+
+def test_seed_is_not_exposed_by_log_or_replay(db: Session, client: TestClient):
+    """ゲームの seed が分かると先の乱択（同票の決着など）を計算できるので、ログにも再生結果にも出さない。"""
+    game_id = _start_seeded_game(db, client, seed=777)
+
+    res = client.get(f"/api/games/{game_id}/log")
+    assert res.status_code == 200, res.text
+    assert "rng_seed" not in res.json()["events"][0]["payload"]
+
+    res = client.get(f"/api/games/{game_id}/replay")
+    assert res.status_code == 200, res.text
+    assert "rng_seed" not in res.json()
+
+
+def test_replay_detects_seed_that_does_not_match_game(db: Session, client: TestClient):
+    game_id = _start_seeded_game(db, client, seed=777)
+    assert game_log.replay_game(db, game_id).status == "DAY_DISCUSSION"
+
+    # 再生はゲームの seed（games.rng_seed）から乱択を導き直す
+    db.get(Game, game_id).rng_seed = 778
+    db.commit()
+
+    res = client.get(f"/api/games/{game_id}/replay")
+    assert res.status_code == 500
+    assert game_log.EVENT_ROLES_ASSIGNED in res.json()["detail"]
@@ -0,0 +1,146 @@
+# tests/test_indexes.py
+
+import pytest
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import config
+from app.api.v1.games import _commit_upsert
+from app.db import engine, ensure_indexes
+from app.models.game import Game, DayVote
+
+# sqlite_master / EXPLAIN QUERY PLAN を直接読むので、SQLite のときだけ動かす
+pytestmark = pytest.mark.sqlite_only
+
+
+def _setup_started_game(db: Session, client: TestClient, member_count: int = 6):
+    from tests.test_night_phase import _setup_started_game as _orig
+    return _orig(db, client, member_count=member_count)
+
+
+def _index_names(table: str) -> set[str]:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,)
+        ).fetchall()
+        return {name for (name,) in rows}
+
+
+def test_hot_lookups_use_composite_indexes(db: Session):
+    expected = {
+        "day_votes": "uq_day_vote_once_per_day",
+        "wolf_votes": "uq_wolf_vote_once_per_night",
+        "seer_inspects": "uq_seer_inspect_once_per_night",
+        "medium_inspects": "uq_medium_inspect_once_per_day",
+        "knight_guards": "ix_knight_guards_game_night_target",
+        "game_members": "ix_game_members_game_alive",
+    }
+    for table, index in expected.items():
+        assert index in _index_names(table), table
+
+    with engine.connect() as conn:
+        plan = " ".join(
+            str(row[-1])
+            for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM day_votes "
+                "WHERE game_id = 'g' AND day_no = 1 AND voter_member_id = 'm'"
+            ).fetchall()
+        )
+    assert "uq_day_vote_once_per_day" in plan
+
+
+def _drop_day_vote_index_and_vote_twice(game_id: str, voter, targets) -> None:
+    """一意インデックスが無かった頃の DB を再現し、同じ投票者の投票を2行入れる。"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX uq_day_vote_once_per_day")
+        for target in targets:
+            conn.exec_driver_sql(
+                "INSERT INTO day_votes (id, game_id, day_no, voter_member_id, target_member_id) "
+                "VALUES (?, ?, 1, ?, ?)",
+                (str(uuid.uuid4()), game_id, voter.id, target.id),
+            )
+
+
+@pytest.mark.shared_game_db
+def test_ensure_indexes_keeps_duplicates_unless_dedupe_is_enabled(client: TestClient, db: Session, caplog):
+    """重複行がある既存 DB では、既定では行を消さずに重複キーをログに出し、一意インデックスを作らないこと。"""
+    game_id, members = _setup_started_game(db, client)
+    voter = members[0]
+    _drop_day_vote_index_and_vote_twice(game_id, voter, members[1:3])
+
+    with caplog.at_level("WARNING", logger="app.db"):
+        ensure_indexes()
+
+    assert "uq_day_vote_once_per_day" not in _index_names("day_votes")
+    assert db.query(DayVote).filter(DayVote.game_id == game_id).count() == 2
+    assert "not creating unique index uq_day_vote_once_per_day" in caplog.text
+    assert voter.id in caplog.text
+
+    # 後片付け: 重複を消してインデックスを戻す
+    db.query(DayVote).filter(DayVote.game_id == game_id).delete()
+    db.commit()
+    ensure_indexes()
+    assert "uq_day_vote_once_per_day" in _index_names("day_votes")
+
+
+@pytest.mark.shared_game_db
+def test_ensure_indexes_upgrades_legacy_db_and_drops_duplicates(
+    client: TestClient, db: Session, monkeypatch, caplog,
+):
+    """JINROU_DEDUPE_ON_UNIQUE_INDEX が有効なら、重複投票のある既存 DB でも起動時に一意インデックスを張れること。"""
+    monkeypatch.setattr(config, "DEDUPE_ON_UNIQUE_INDEX", True)
+    game_id, members = _setup_started_game(db, client)
+    voter, first_target, second_target = members[0], members[1], members[2]
+    _drop_day_vote_index_and_vote_twice(game_id, voter, [first_target, second_target])
+
+    with caplog.at_level("WARNING", logger="app.db"):
+        ensure_indexes()
+
+    assert "uq_day_vote_once_per_day" in _index_names("day_votes")
+    assert "deleted 1 duplicate rows from day_votes" in caplog.text
+    votes = db.query(DayVote).filter(DayVote.game_id == game_id).all()
+    assert len(votes) == 1
+    # 後から入った投票が残る
+    assert votes[0].target_member_id == second_target.id
+
+    # 2回目は何もしない
+    ensure_indexes()
+
+
+def test_concurrent_insert_falls_back_to_update(client: TestClient, db: Session):
+    """同じ投票者の INSERT が競合したら、既存行の UPDATE としてやり直すこと。"""
+    game_id, members = _setup_started_game(db, client)
+    voter, first_target, second_target = members[0], members[1], members[2]
+    db.add(DayVote(id=str(uuid.uuid4()), game_id=game_id, day_no=1,
+                   voter_member_id=voter.id, target_member_id=first_target.id))
+    db.commit()
+
+    game = db.get(Game, game_id)
+    before = game.version
+    attempts = []
+
+    def upsert():
+        attempts.append(1)
+        if len(attempts) == 1:
+            # 既存行を見ずに INSERT してしまった競合側を再現
+            vote = DayVote(id=str(uuid.uuid4()), game_id=game_id, day_no=1,
+                           voter_member_id=voter.id, target_member_id=second_target.id)
+            db.add(vote)
+            return vote
+        vote = (
+            db.query(DayVote)
+            .filter(DayVote.game_id == game_id, DayVote.voter_member_id == voter.id)
+            .one()
+        )
+        vote.target_member_id = second_target.id
+        return vote
+
+    vote = _commit_upsert(db, game, upsert)
+
+    assert len(attempts) == 2
+    assert vote.target_member_id == second_target.id
+    assert db.query(DayVote).filter(DayVote.game_id == game_id).count() == 1
+    db.refresh(game)
+    assert game.version == before + 1
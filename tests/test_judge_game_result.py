@@ -3,8 +3,18 @@
 import uuid
 from sqlalchemy.orm import Session
 
-from app.models.game import GameMember
+from app.models.game import Game, GameMember
 from app.api.v1.games import _judge_game_result
+from tests.test_night_phase import _add_room_rows
+
+
+def _create_game(db: Session) -> str:
+    """メンバーを入れる器になる Game を1つ作り、id を返す。"""
+    game = Game(id=str(uuid.uuid4()), room_id=str(uuid.uuid4()), status="DAY_DISCUSSION")
+    _add_room_rows(db, game.room_id)
+    db.add(game)
+    db.flush()
+    return game.id
 
 
 def _add_member(
@@ -17,16 +27,18 @@ def _add_member(
     role_type: str | None = None,
 ) -> GameMember:
     """
-    _judge_game_result は Game テーブルを参照しないので、
-    Game 行は作らず GameMember だけを追加するヘルパー。
+    game_id のゲームに GameMember を1人追加するヘルパー（ゲームは _create_game で作っておく）。
+    ゲームの生存者数カウンタは未初期化なので、_judge_game_result はメンバーから数える。
     """
     if role_type is None:
         role_type = "WEREWOLF" if team == "WOLF" else "VILLAGER"
 
+    room_member_id = str(uuid.uuid4())
+    _add_room_rows(db, db.get(Game, game_id).room_id, [room_member_id])
     m = GameMember(
         id=str(uuid.uuid4()),
         game_id=game_id,
-        room_member_id=str(uuid.uuid4()),
+        room_member_id=room_member_id,
         display_name=f"member-{order_no}",
         avatar_url=None,
         role_type=role_type,
@@ -42,7 +54,7 @@ def test_judge_game_result_village_win_when_all_wolves_dead(db: Session):
     """
     生きている人狼が 0 人なら VILLAGE_WIN になること。
     """
-    game_id = str(uuid.uuid4())
+    game_id = _create_game(db)
 
     # 生存村人 3
     _add_member(db, game_id, team="VILLAGE", alive=True, order_no=1)
@@ -67,7 +79,7 @@ def test_judge_game_result_wolf_win_when_wolves_dominate(db: Session):
     """
     生存人狼数 >= 生存村側人数 なら WOLF_WIN になること。
     """
-    game_id = str(uuid.uuid4())
+    game_id = _create_game(db)
 
     # 生存人狼 2
     _add_member(db, game_id, team="WOLF", alive=True, order_no=1, role_type="WEREWOLF")
@@ -92,7 +104,7 @@ def test_judge_game_result_ongoing_when_both_sides_alive_and_village_majority(
     """
     生存人狼 > 0 かつ 生存人狼 < 生存村側人数 なら ONGOING になること。
     """
-    game_id = str(uuid.uuid4())
+    game_id = _create_game(db)
 
     # 生存人狼 1
     _add_member(db, game_id, team="WOLF", alive=True, order_no=1, role_type="WEREWOLF")
@@ -7,6 +7,7 @@ from app.models.game import Game, GameMember
 from app.models.knight import KnightGuard
 from app.api.v1.games import knight_guard
 from app.schemas.knight import KnightGuardCreate
+from tests.test_night_phase import _add_room_rows
 
 
 # -----------------------------
@@ -36,6 +37,7 @@ def _create_game_with_knight_and_target(
         knight_self_guard=knight_self_guard,
         knight_consecutive_guard=knight_consecutive_guard,
     )
+    _add_room_rows(db, game.room_id)
     db.add(game)
     db.commit()
     db.refresh(game)
@@ -64,6 +66,7 @@ def _create_game_with_knight_and_target(
         order_no=2,
     )
 
+    _add_room_rows(db, game.room_id, [knight.room_member_id, target.room_member_id])
     db.add_all([knight, target])
     db.commit()
     db.refresh(knight)
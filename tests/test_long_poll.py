@@ -0,0 +1,121 @@
+# tests/test_long_poll.py
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api.v1 import games as games_api
+from app.api.v1.games import _wait_game_version
+from app.models.game import Game
+from app.realtime import hub, game_topic
+
+
+def _setup_started_game(db: Session, client: TestClient, member_count: int = 6):
+    from tests.test_night_phase import _setup_started_game as _orig
+    return _orig(db, client, member_count=member_count)
+
+
+def test_get_game_returns_immediately_when_version_differs(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client)
+    version = client.get(f"/api/games/{game_id}").json()["version"]
+
+    started = time.monotonic()
+    res = client.get(
+        f"/api/games/{game_id}",
+        params={"wait_for_version": version - 1, "timeout": 10},
+    )
+    assert res.status_code == 200
+    assert res.json()["version"] == version
+    assert time.monotonic() - started < 5
+
+
+def test_get_game_wait_times_out_with_current_state(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client)
+    first = client.get(f"/api/games/{game_id}")
+    version = first.json()["version"]
+
+    res = client.get(
+        f"/api/games/{game_id}",
+        params={"wait_for_version": version, "timeout": 0.2},
+    )
+    assert res.status_code == 200
+    assert res.json() == first.json()
+
+    # ETag を付ければタイムアウト時は 304
+    res = client.get(
+        f"/api/games/{game_id}",
+        params={"wait_for_version": version, "timeout": 0.2},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert res.status_code == 304
+    assert hub.subscriber_count(game_topic(game_id)) == 0
+
+
+def test_get_game_wait_validates_timeout(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client)
+    res = client.get(f"/api/games/{game_id}", params={"wait_for_version": 0, "timeout": 3600})
+    assert res.status_code == 422
+
+    res = client.get("/api/games/nonexistent-id", params={"wait_for_version": 0, "timeout": 1})
+    assert res.status_code == 404
+
+
+# TestClient とは別のイベントループから async エンジンを使う。
+# asyncpg の接続は作ったループでしか使えないので、SQLite（aiosqlite）のときだけ動かす
+@pytest.mark.sqlite_only
+def test_wait_game_version_wakes_on_vote(client: TestClient, db: Session):
+    """待機中に投票が入ると、timeout を待たずに新しい version で返ること。"""
+    game_id, members = _setup_started_game(db, client)
+    version = client.get(f"/api/games/{game_id}").json()["version"]
+    voter = members[1]
+    target = next(
+        m for m in members
+        if m.id != voter.id and not (voter.role_type == "WEREWOLF" and m.role_type == "WEREWOLF")
+    )
+
+    async def run():
+        waiter = asyncio.create_task(_wait_game_version(game_id, version, timeout=10))
+        while hub.subscriber_count(game_topic(game_id)) == 0:
+            await asyncio.sleep(0.01)
+
+        started = time.monotonic()
+        res = await asyncio.to_thread(
+            client.post,
+            f"/api/games/{game_id}/day_vote",
+            json={"voter_member_id": voter.id, "target_member_id": target.id},
+        )
+        assert res.status_code == 200
+        game = await asyncio.wait_for(waiter, timeout=5)
+        return game, time.monotonic() - started
+
+    game, elapsed = asyncio.run(run())
+    assert game.version == version + 1
+    assert elapsed < 5
+    assert hub.subscriber_count(game_topic(game_id)) == 0
+
+
+@pytest.mark.sqlite_only
+def test_wait_game_version_sees_update_from_another_worker(client: TestClient, db: Session, monkeypatch):
+    """hub に publish されない更新（別ワーカーでの commit）も、DB の読み直しで拾うこと。"""
+    monkeypatch.setattr(games_api, "WAIT_RECHECK_SEC", 0.05)
+    game_id, _ = _setup_started_game(db, client)
+    game = db.get(Game, game_id)
+    version = game.version
+
+    async def run():
+        waiter = asyncio.create_task(_wait_game_version(game_id, version, timeout=10))
+        while hub.subscriber_count(game_topic(game_id)) == 0:
+            await asyncio.sleep(0.01)
+
+        started = time.monotonic()
+        game.version = version + 1
+        await asyncio.to_thread(db.commit)
+        result = await asyncio.wait_for(waiter, timeout=5)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result.version == version + 1
+    assert elapsed < 5
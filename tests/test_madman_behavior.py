@@ -10,6 +10,7 @@ from app.api.v1.games import (
     _judge_game_result,  # 勝敗判定のヘルパーを直接使う
 )
 from app.schemas.seer import SeerInspectCreate
+from tests.test_night_phase import _add_room_rows
 
 
 def _create_base_game(db: Session, status: str = "NIGHT") -> Game:
@@ -21,6 +22,7 @@ def _create_base_game(db: Session, status: str = "NIGHT") -> Game:
         curr_day=2,     # 霊媒テストで「前日」が 1日目になるように
         curr_night=2,
     )
+    _add_room_rows(db, game.room_id)
     db.add(game)
     db.commit()
     db.refresh(game)
@@ -57,6 +59,7 @@ def test_seer_inspect_madman_is_white(db: Session):
         order_no=2,
     )
 
+    _add_room_rows(db, game.room_id, [seer.room_member_id, madman.room_member_id])
     db.add_all([seer, madman])
     db.commit()
     db.refresh(seer)
@@ -105,6 +108,7 @@ def test_medium_inspect_madman_is_white(db: Session):
         order_no=2,
     )
 
+    _add_room_rows(db, game.room_id, [medium.room_member_id, executed_madman.room_member_id])
     db.add_all([medium, executed_madman])
     db.commit()
     db.refresh(medium)
@@ -170,6 +174,7 @@ def test_judge_does_not_count_madman_as_werewolf(db: Session):
         order_no=3,
     )
 
+    _add_room_rows(db, game.room_id, [villager.room_member_id, dead_wolf.room_member_id, madman.room_member_id])
     db.add_all([villager, dead_wolf, madman])
     db.commit()
 
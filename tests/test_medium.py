@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from app.db import Base
 from app.models.game import GameMember, Game
 from app.api.v1.games import medium_inspect
+from tests.test_night_phase import _add_room_rows
 
 
 # -----------------------------
@@ -21,8 +22,8 @@ def _create_game_with_medium_and_executed_member(db, executed_team):
         status="NIGHT",
         curr_day=2,
         curr_night=2,
-        last_executed_member_id="executed1",
     )
+    _add_room_rows(db, game.room_id, ["rm1", "rm2"])
     db.add(game)
     db.commit()
 
@@ -53,6 +54,8 @@ def _create_game_with_medium_and_executed_member(db, executed_team):
         order_no=2,
     )
     db.add(executed)
+    db.flush()
+    game.last_executed_member_id = executed.id
 
     db.commit()
 
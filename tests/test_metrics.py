@@ -0,0 +1,91 @@
+# tests/test_metrics.py
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.realtime import game_topic, hub, room_topic
+from tests.test_night_phase import _create_room_with_members, _setup_started_game
+
+
+def _samples(text: str) -> dict[str, float]:
+    """'name{labels} value' の行を {name{labels}: value} にする。"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_count_requests_per_route_template(client: TestClient, db: Session):
+    metrics.reset()
+    game_id, members = _setup_started_game(db, client, member_count=6)
+    for _ in range(3):
+        client.get(f"/api/games/{game_id}/day_vote_status")
+    client.get("/api/games/no-such-game/day_vote_status")
+    client.get("/no/such/path")
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(res.text)
+
+    route = 'method="GET",route="/api/games/{game_id}/day_vote_status"'
+    assert samples[f'jinrou_http_requests_total{{{route},status="200"}}'] == 3
+    assert samples[f'jinrou_http_requests_total{{{route},status="404"}}'] == 1
+    assert samples['jinrou_http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+    assert samples[f"jinrou_http_request_duration_seconds_count{{{route}}}"] == 4
+    assert samples[f'jinrou_http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 4
+    assert samples[f'jinrou_http_request_duration_seconds_bucket{{{route},le="10.0"}}'] == 4
+    # /metrics 自身を処理中
+    assert samples["jinrou_http_requests_in_flight"] == 1
+
+
+def test_metrics_game_gauges(client: TestClient, db: Session):
+    _setup_started_game(db, client, member_count=6)
+    _setup_started_game(db, client, member_count=6)
+    room = _create_room_with_members(db, 6)
+    assert client.post("/api/games", json={"room_id": room.id}).status_code == 200
+
+    samples = _samples(client.get("/metrics").text)
+    assert samples['jinrou_games{status="DAY_DISCUSSION"}'] == 2
+    assert samples['jinrou_games{status="WAITING"}'] == 1
+    assert samples["jinrou_active_games"] == 2
+
+
+def test_metrics_do_not_count_won_games_as_active(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client, member_count=6)
+    _setup_started_game(db, client, member_count=6)
+    wolves = [m for m in members if m.role_type == "WEREWOLF"]
+    others = [m for m in members if m.role_type != "WEREWOLF"]
+
+    # 人狼以外を2人まで減らし、夜に1人襲撃して人狼勝利で終わらせる
+    res = client.post("/api/debug/set_game_members", json={
+        "game_id": game_id,
+        "updates": [{"member_id": m.id, "alive": False} for m in others[2:]],
+    })
+    assert res.status_code == 200, res.text
+    client.post(f"/api/games/{game_id}/debug_set_status", params={"status": "NIGHT"})
+    for wolf in wolves:
+        client.post(
+            f"/api/games/{game_id}/wolves/vote",
+            json={"wolf_member_id": wolf.id, "target_member_id": others[0].id, "priority_level": 1},
+        )
+    assert client.post(f"/api/games/{game_id}/resolve_night_simple").json()["status"] == "WOLF_WIN"
+
+    samples = _samples(client.get("/metrics").text)
+    assert samples['jinrou_games{status="WOLF_WIN"}'] == 1
+    assert samples["jinrou_active_games"] == 1
+
+
+def test_metrics_realtime_subscribers(client: TestClient, db: Session):
+    async def scrape_while_subscribed():
+        async with hub.subscription(game_topic("g1")), hub.subscription(game_topic("g2")):
+            async with hub.subscription(room_topic("r1")):
+                return await asyncio.to_thread(client.get, "/metrics")
+
+    samples = _samples(asyncio.run(scrape_while_subscribed()).text)
+    assert samples['jinrou_realtime_subscribers{channel="game"}'] == 2
+    assert samples['jinrou_realtime_subscribers{channel="room"}'] == 1
@@ -0,0 +1,85 @@
+# tests/test_night_outcome.py
+
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import night_outcome
+from app.models.game import Game, GameMember, NightOutcome, WolfVote
+from tests.test_night_phase import _setup_started_game
+
+
+def _start_night(db: Session, client: TestClient) -> tuple[str, list[GameMember], list[GameMember]]:
+    """9人卓を NIGHT にして (game_id, wolves, villagers) を返す。"""
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    res = client.post(f"/api/games/{game_id}/debug_set_status", params={"status": "NIGHT"})
+    assert res.status_code == 200, res.text
+    wolves = [m for m in members if m.role_type == "WEREWOLF"]
+    villagers = [m for m in members if m.team == "VILLAGE"]
+    return game_id, wolves, villagers
+
+
+def _wolves_vote(client: TestClient, game_id: str, wolves: list[GameMember], target: GameMember) -> None:
+    for wolf in wolves:
+        res = client.post(
+            f"/api/games/{game_id}/wolves/vote",
+            json={"wolf_member_id": wolf.id, "target_member_id": target.id, "priority_level": 1},
+        )
+        assert res.status_code == 200, res.text
+
+
+def test_resolved_night_is_served_from_stored_outcome(db: Session, client: TestClient, query_budget):
+    game_id, wolves, villagers = _start_night(db, client)
+    _wolves_vote(client, game_id, wolves, villagers[0])
+    res = client.post(f"/api/games/{game_id}/resolve_night_simple")
+    assert res.json()["killed_member_id"] == villagers[0].id
+
+    row = db.query(NightOutcome).filter(NightOutcome.game_id == game_id).one()
+    assert (row.target_member_id, row.killed_member_id, row.guarded) == (villagers[0].id, villagers[0].id, False)
+    points = db.get(Game, game_id).wolf_vote_lvl1_point
+    assert json.loads(row.tally) == {villagers[0].id: points * len(wolves)}
+
+    # 解決後は保存した結果をメモリから返す（Game の1行だけ）
+    path = f"/api/games/{game_id}/night_result?night_no={row.night_no}"
+    result = query_budget(client.get(path), 1).json()
+    assert result["victim"] == {"id": villagers[0].id, "display_name": villagers[0].display_name}
+
+    # 投票の行が消えても、キャッシュを捨てても同じ結果（保存した行を読む）
+    db.query(WolfVote).filter(WolfVote.game_id == game_id).delete()
+    db.commit()
+    night_outcome.clear()
+    assert query_budget(client.get(path), 2).json() == result
+    assert query_budget(client.get(path), 1).json() == result
+
+
+def test_open_night_previews_current_votes(db: Session, client: TestClient):
+    game_id, wolves, villagers = _start_night(db, client)
+    path = f"/api/games/{game_id}/night_result"
+    assert client.get(path).json()["victim"] is None
+
+    # NIGHT の間はプレビューなので、投票し直せば変わる
+    _wolves_vote(client, game_id, wolves, villagers[0])
+    assert client.get(path).json()["victim"]["id"] == villagers[0].id
+    _wolves_vote(client, game_id, wolves, villagers[1])
+    assert client.get(path).json()["victim"]["id"] == villagers[1].id
+    assert db.query(NightOutcome).filter(NightOutcome.game_id == game_id).count() == 0
+
+
+def test_forcing_night_again_reopens_outcome(db: Session, client: TestClient):
+    game_id, wolves, villagers = _start_night(db, client)
+    _wolves_vote(client, game_id, wolves, villagers[0])
+    assert client.post(f"/api/games/{game_id}/resolve_night_simple").status_code == 200
+    night_no = db.query(NightOutcome.night_no).filter(NightOutcome.game_id == game_id).scalar()
+
+    # 同じ夜に戻すと確定結果は消え、解決し直した結果に置き換わる
+    res = client.post(f"/api/games/{game_id}/debug_set_status", params={"status": "NIGHT"})
+    assert res.status_code == 200, res.text
+    _wolves_vote(client, game_id, wolves, villagers[1])
+    res = client.post(f"/api/games/{game_id}/resolve_night_simple")
+    assert res.status_code == 200, res.text
+
+    result = client.get(f"/api/games/{game_id}/night_result", params={"night_no": night_no}).json()
+    assert result["victim"]["id"] == villagers[1].id
+    db.expire_all()
+    assert db.query(NightOutcome).filter(NightOutcome.game_id == game_id).one().target_member_id == villagers[1].id
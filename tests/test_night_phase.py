@@ -8,6 +8,20 @@ from app.models.room import Room, RoomMember
 from app.models.game import Game, GameMember
 
 
+def _add_room_rows(db: Session, room_id: str, room_member_ids=()) -> None:
+    """
+    Game / GameMember を直接作るテスト用に、外部キーの先の Room / RoomMember を（無ければ）作って flush する。
+    commit は呼び出し側。
+    """
+    if db.get(Room, room_id) is None:
+        db.add(Room(id=room_id, name=f"room {room_id}"))
+        db.flush()
+    for room_member_id in room_member_ids:
+        if db.get(RoomMember, room_member_id) is None:
+            db.add(RoomMember(id=room_member_id, room_id=room_id, display_name=room_member_id))
+    db.flush()
+
+
 def _create_room_with_members(db: Session, member_count: int = 8) -> Room:
     """DB に部屋と部屋メンバーをまとめて作るヘルパー"""
     room = Room(
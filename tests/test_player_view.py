@@ -0,0 +1,80 @@
+# tests/test_player_view.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.game import Game
+
+
+def _setup_started_game(db: Session, client: TestClient, member_count: int = 8):
+    from tests.test_night_phase import _setup_started_game as _orig
+    return _orig(db, client, member_count=member_count)
+
+
+def test_view_matches_individual_endpoints_in_day(client: TestClient, db: Session):
+    """/view の内容が個別 API（/{id}, /me, /members, /day_vote_status, /judge）と一致すること。"""
+    game_id, members = _setup_started_game(db, client)
+    host = members[0]
+
+    voter = members[1]
+    target = next(
+        m for m in members
+        if m.id != voter.id and not (voter.role_type == "WEREWOLF" and m.role_type == "WEREWOLF")
+    )
+    res = client.post(
+        f"/api/games/{game_id}/day_vote",
+        json={"voter_member_id": voter.id, "target_member_id": target.id},
+    )
+    assert res.status_code == 200
+
+    view = client.get(f"/api/games/{game_id}/view", params={"player_id": host.id})
+    assert view.status_code == 200
+    body = view.json()
+
+    assert body["game"] == client.get(f"/api/games/{game_id}").json()
+    assert body["me"] == client.get(
+        f"/api/games/{game_id}/me", params={"player_id": host.id}
+    ).json()
+    assert body["me"]["is_host"] is True
+    assert body["members"] == client.get(f"/api/games/{game_id}/members").json()
+    assert body["day_vote"] == client.get(f"/api/games/{game_id}/day_vote_status").json()
+    assert body["day_vote"]["voted_count"] == 1
+    assert body["night_actions"] is None
+
+    judge = client.get(f"/api/games/{game_id}/judge").json()
+    for key in ("result", "wolf_alive", "village_alive", "reason"):
+        assert body["judge"][key] == judge[key]
+
+    assert body["is_runoff"] is False
+    assert body["runoff_candidate_ids"] == []
+
+
+def test_view_reports_night_progress(client: TestClient, db: Session):
+    game_id, members = _setup_started_game(db, client)
+
+    game = db.get(Game, game_id)
+    game.status = "NIGHT"
+    game.curr_night = 1
+    db.add(game)
+    db.commit()
+
+    player = members[2]
+    view = client.get(f"/api/games/{game_id}/view", params={"player_id": player.id})
+    assert view.status_code == 200
+    body = view.json()
+
+    assert body["day_vote"] is None
+    assert body["night_actions"] == client.get(
+        f"/api/games/{game_id}/night_actions_status"
+    ).json()
+    assert body["me"]["is_host"] is False
+
+
+def test_view_unknown_player_returns_404(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client)
+
+    res = client.get(f"/api/games/{game_id}/view", params={"player_id": "nobody"})
+    assert res.status_code == 404
+
+    res = client.get("/api/games/no-such-game/view", params={"player_id": "nobody"})
+    assert res.status_code == 404
@@ -0,0 +1,92 @@
+# tests/test_query_budget.py
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import game_engine, query_stats
+from tests.test_night_phase import _create_room_with_members, _setup_started_game
+
+# 1リクエストあたりの SQL 上限: (GameEngine が空のとき, 温まっているとき)
+READ_BUDGETS = {
+    "": (1, 1),
+    "/members": (7, 1),
+    "/me?player_id={host}": (7, 1),
+    "/view?player_id={host}": (9, 3),
+    "/judge": (7, 1),
+    "/day_vote_status": (8, 2),
+    "/day_vote_state": (8, 2),
+    "/night_actions_status": (7, 1),
+    "/day_tally": (2, 2),
+    "/wolves/tally": (2, 2),
+    "/night_result": (3, 1),
+    "/reveal_roles": (2, 2),
+    "/day_timer": (2, 2),
+}
+
+
+def _queries(res) -> int:
+    return int(res.headers[query_stats.QUERIES_HEADER])
+
+
+@pytest.mark.shared_game_db
+def test_read_endpoints_stay_within_budget(client: TestClient, db: Session, query_budget):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    host = members[0]
+
+    for suffix, (cold, warm) in READ_BUDGETS.items():
+        path = f"/api/games/{game_id}" + suffix.format(host=host.id)
+        game_engine.clear()
+        res = client.get(path)
+        assert res.status_code == 200, suffix
+        query_budget(res, cold)
+        query_budget(client.get(path), warm)
+
+
+def test_response_carries_db_time_header(client: TestClient, db: Session, query_budget):
+    game_id, _ = _setup_started_game(db, client, member_count=6)
+    res = query_budget(client.get(f"/api/games/{game_id}"), 1)
+    assert float(res.headers[query_stats.TIME_HEADER]) >= 0.0
+
+
+def test_query_stats_are_off_by_default(client: TestClient, db: Session):
+    game_id, _ = _setup_started_game(db, client, member_count=6)
+    res = client.get(f"/api/games/{game_id}")
+    assert query_stats.QUERIES_HEADER not in res.headers
+
+
+def _game_queries_for(client: TestClient, db: Session, player_count: int) -> dict[str, int]:
+    """player_count 人の卓で、人数分ループしがちなエンドポイントのクエリ数を測る。"""
+    room = _create_room_with_members(db, player_count)
+    game_id = client.post("/api/games", json={"room_id": room.id}).json()["id"]
+    counts = {"role_assign": _queries(client.post(f"/api/games/{game_id}/role_assign"))}
+    counts["start"] = _queries(client.post(f"/api/games/{game_id}/start"))
+
+    members = client.get(f"/api/games/{game_id}/members").json()
+    res = client.post(
+        "/api/debug/set_game_members",
+        json={"game_id": game_id, "updates": [{"member_id": m["id"], "alive": True} for m in members]},
+    )
+    counts["set_game_members"] = _queries(res)
+
+    game_engine.clear()
+    counts["members"] = _queries(client.get(f"/api/games/{game_id}/members"))
+    game_engine.clear()
+    counts["view"] = _queries(
+        client.get(f"/api/games/{game_id}/view", params={"player_id": members[0]["id"]})
+    )
+    return counts
+
+
+def test_query_count_does_not_grow_with_players(client: TestClient, db: Session, query_budget):
+    """N+1 検出: 6人卓と15人卓でクエリ数が変わらないこと。"""
+    small = _game_queries_for(client, db, 6)
+    large = _game_queries_for(client, db, 15)
+    assert large == small
+
+    body = client.get("/api/debug/query_stats", params={"reset": True}).json()
+    routes = {row["route"]: row for row in body["routes"]}
+    assert routes["POST /api/games/{game_id}/role_assign"]["requests"] == 2
+    routes = {row["route"] for row in query_stats.route_summary()}
+    assert "POST /api/games/{game_id}/role_assign" not in routes
@@ -51,6 +51,7 @@ def _create_game_for_day_resolve(
             is_host=(i == 0),
         )
         db.add(rm)
+        db.flush()
 
         m = GameMember(
             id=str(uuid.uuid4()),
@@ -77,6 +78,7 @@ def _create_game_for_day_resolve(
             is_host=False,
         )
         db.add(rm)
+        db.flush()
 
         m = GameMember(
             id=str(uuid.uuid4()),
@@ -1,13 +1,16 @@
 # tests/test_resolve_night.py
 
+import pytest
 from uuid import uuid4
 
 from sqlalchemy.orm import Session
 
+from app import query_stats
 from app.models.game import Game, GameMember, WolfVote
 from app.models.knight import KnightGuard
 
 from app.api.v1.games import resolve_night_simple
+from tests.test_night_phase import _add_room_rows
 
 
 def _create_game_for_night(db: Session, *, wolves: int, villagers: int) -> tuple[Game, list[GameMember], list[GameMember]]:
@@ -19,6 +22,8 @@ def _create_game_for_night(db: Session, *, wolves: int, villagers: int) -> tuple
         curr_night=1,
         curr_day=1,
     )
+    room_member_ids = [f"rm-wolf-{i}" for i in range(wolves)] + [f"rm-vill-{i}" for i in range(villagers)]
+    _add_room_rows(db, game.room_id, room_member_ids)
     db.add(game)
     db.commit()
     db.refresh(game)
@@ -135,7 +140,7 @@ def test_resolve_night_simple_no_kill_when_guarded(db: Session):
         id=str(uuid4()),
         game_id=game.id,
         night_no=game.curr_night,
-        knight_member_id=str(uuid4()),  # テストなのでダミーIDで十分
+        knight_member_id=villages[1].id,  # 役職は見ないので村人を騎士に見立てる
         target_member_id=victim.id,
     )
     db.add(guard)
@@ -186,3 +191,41 @@ def test_resolve_night_simple_game_ends_with_wolf_win(db: Session):
     # 勝敗判定の結果、狼陣営の勝利になっているはず
     assert result["status"] == "WOLF_WIN"
     assert game.status == "WOLF_WIN"
+
+
+@pytest.mark.shared_game_db
+def test_resolve_night_simple_reads_night_state_in_one_query(db: Session):
+    """
+    投票・護衛・生存者はまとめて1クエリで読む:
+    Game の取得 / 夜の集計 / 襲撃の UPDATE / 確定結果の INSERT / Game の UPDATE / イベントログの INSERT
+    の6文で終わる（人数に依らない）。
+    """
+    counts = []
+    for villagers in (3, 12):
+        game, wolves, villages = _create_game_for_night(db, wolves=2, villagers=villagers)
+        for wolf in wolves:
+            db.add(WolfVote(
+                id=str(uuid4()),
+                game_id=game.id,
+                night_no=game.curr_night,
+                wolf_member_id=wolf.id,
+                target_member_id=villages[0].id,
+                priority_level=1,
+                points_at_vote=game.wolf_vote_lvl1_point,
+            ))
+        db.add(KnightGuard(
+            id=str(uuid4()),
+            game_id=game.id,
+            night_no=game.curr_night,
+            knight_member_id=villages[-1].id,
+            target_member_id=villages[1].id,
+        ))
+        db.commit()
+        db.expire_all()
+
+        with query_stats.collect() as stats:
+            result = resolve_night_simple(game_id=game.id, db=db)
+        assert result["victim"]["id"] == villages[0].id
+        counts.append(stats.queries)
+
+    assert counts == [6, 6]
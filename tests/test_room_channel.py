@@ -0,0 +1,99 @@
+# tests/test_room_channel.py
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1 import rooms as rooms_api
+from app.models.room import Room
+
+
+def _create_room(client: TestClient, name: str = "WS Room") -> str:
+    res = client.post("/api/rooms", json={"name": name})
+    assert res.status_code in (200, 201)
+    return res.json()["id"]
+
+
+def test_room_channel_unknown_room_is_rejected(client: TestClient, db: Session):
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/api/rooms/nonexistent/ws") as ws:
+            ws.receive_json()
+    assert exc.value.code == 4404
+
+
+def test_room_channel_pushes_lobby_events(client: TestClient, db: Session):
+    """
+    待機画面が購読するイベントが、roster 追加 → members 確定 → Game 作成 → 開始
+    の順に届くこと。
+    """
+    room_id = _create_room(client)
+
+    with client.websocket_connect(f"/api/rooms/{room_id}/ws") as ws:
+        hello = ws.receive_json()
+        assert hello["type"] == "room_state"
+        assert hello["room_id"] == room_id
+        assert hello["current_game_id"] is None
+        assert hello["game_started"] is False
+
+        for i in range(6):
+            r = client.post(f"/api/rooms/{room_id}/roster", json={"display_name": f"P{i+1}"})
+            assert r.status_code == 200
+            ev = ws.receive_json()
+            assert ev["type"] == "roster_added"
+            assert ev["roster"]["display_name"] == f"P{i+1}"
+
+        b = client.post(f"/api/rooms/{room_id}/members/bulk_from_roster")
+        assert b.status_code == 200
+        assert ws.receive_json()["type"] == "members_changed"
+
+        g = client.post("/api/games", json={"room_id": room_id})
+        assert g.status_code == 200
+        game_id = g.json()["id"]
+        ev = ws.receive_json()
+        assert ev["type"] == "current_game_changed"
+        assert ev["current_game_id"] == game_id
+
+        s = client.post(f"/api/games/{game_id}/start")
+        assert s.status_code == 200
+        ev = ws.receive_json()
+        assert ev == {"type": "game_started", "room_id": room_id, "game_id": game_id}
+
+
+def test_room_channel_member_edit_and_delete(client: TestClient, db: Session):
+    room_id = _create_room(client)
+
+    with client.websocket_connect(f"/api/rooms/{room_id}/ws") as ws:
+        ws.receive_json()  # room_state
+
+        added = client.post(f"/api/rooms/{room_id}/members", json={"display_name": "Late"})
+        assert added.status_code == 200
+        assert ws.receive_json()["type"] == "members_changed"
+
+        removed = client.delete(f"/api/rooms/{room_id}/members/{added.json()['id']}")
+        assert removed.status_code == 204
+        assert ws.receive_json()["type"] == "members_changed"
+
+        deleted = client.delete(f"/api/rooms/{room_id}")
+        assert deleted.status_code == 204
+        assert ws.receive_json()["type"] == "room_deleted"
+
+
+def test_room_channel_sends_room_state_on_update_from_another_worker(
+    client: TestClient, db: Session, monkeypatch
+):
+    """hub に publish されない更新（別ワーカーでの commit）も、読み直して room_state で送ること。"""
+    monkeypatch.setattr(rooms_api, "WAIT_RECHECK_SEC", 0.05)
+    room_id = _create_room(client)
+
+    with client.websocket_connect(f"/api/rooms/{room_id}/ws") as ws:
+        hello = ws.receive_json()
+
+        room = db.get(Room, room_id)
+        room.version += 1
+        db.commit()
+
+        ev = ws.receive_json()
+        assert ev["type"] == "room_state"
+        assert ev["version"] == hello["version"] + 1
+        assert ev["current_game_id"] is None
@@ -0,0 +1,71 @@
+# tests/test_schema_upgrade.py
+"""
+起動時のスキーマアップグレード（app/db.py の ensure_schema）。
+SQL は SQLite / PostgreSQL のどちらでも通る書き方にしてあるので、
+JINROU_DATABASE_URL を PostgreSQL に向けても同じテストが動く。
+"""
+import pytest
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.orm import Session
+
+from app import config
+from app.db import engine, ensure_schema
+from app.models.game import DayVote
+from tests.test_night_phase import _setup_started_game
+
+# 後から追加した列（導入前の DB には無い）
+ADDED_COLUMNS = {
+    "room_members": ["is_host"],
+    "rooms": ["version"],
+    "games": ["version", "alive_wolf_count", "alive_village_count", "rng_seed"],
+}
+
+
+def _columns(table: str) -> set[str]:
+    with engine.connect() as conn:
+        return {col["name"] for col in sa_inspect(conn).get_columns(table)}
+
+
+def _indexes(table: str) -> set[str]:
+    with engine.connect() as conn:
+        return {index["name"] for index in sa_inspect(conn).get_indexes(table)}
+
+
+@pytest.mark.shared_game_db
+def test_ensure_schema_upgrades_legacy_db(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.setattr(config, "DEDUPE_ON_UNIQUE_INDEX", True)
+    game_id, members = _setup_started_game(db, client)
+    voter, first_target, second_target = members[0], members[1], members[2]
+    db.close()
+
+    # 列・インデックスが無かった頃の DB にし、一意制約が無い間に入った二重投票を作る（重複は消す設定で起動）
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            for column in columns:
+                conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+        conn.execute(text("DROP INDEX uq_day_vote_once_per_day"))
+        for target in (first_target, second_target):
+            conn.execute(
+                text(
+                    "INSERT INTO day_votes (id, game_id, day_no, voter_member_id, target_member_id) "
+                    "VALUES (:id, :game_id, 1, :voter, :target)"
+                ),
+                {"id": str(uuid.uuid4()), "game_id": game_id, "voter": voter.id, "target": target.id},
+            )
+
+    ensure_schema()
+
+    for table, columns in ADDED_COLUMNS.items():
+        assert set(columns) <= _columns(table), table
+    assert "uq_day_vote_once_per_day" in _indexes("day_votes")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM room_members WHERE is_host")).scalar() == 0
+
+    votes = db.query(DayVote).filter(DayVote.game_id == game_id).all()
+    assert [v.target_member_id for v in votes] == [second_target.id]
+
+    # 2回目は何もしない
+    ensure_schema()
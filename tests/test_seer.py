@@ -6,6 +6,7 @@ from fastapi import HTTPException
 from app.models.game import Game, GameMember
 from app.api.v1.games import seer_inspect
 from app.schemas.seer import SeerInspectCreate
+from tests.test_night_phase import _add_room_rows
 
 
 # -----------------------------
@@ -32,6 +33,7 @@ def _create_game_with_seer_and_target(
         curr_day=1,
         curr_night=1,
     )
+    _add_room_rows(db, game.room_id)
     db.add(game)
     db.commit()
     db.refresh(game)
@@ -60,6 +62,7 @@ def _create_game_with_seer_and_target(
         order_no=2,
     )
 
+    _add_room_rows(db, game.room_id, [seer.room_member_id, target.room_member_id])
     db.add_all([seer, target])
     db.commit()
     db.refresh(seer)
@@ -0,0 +1,138 @@
+# tests/test_state_store.py
+
+import tempfile
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.v1.games import resolve_day_simple
+from app.db import SessionLocal
+from app.models.game import DayVote
+from app.models.shared_state import SharedState
+from app.schemas.day import DayResolveRequest
+from app.state_store import (
+    RUNOFF_STATE_NS,
+    DatabaseStateStore,
+    FileStateStore,
+    MemoryStateStore,
+    get_state_store,
+    set_state_store,
+)
+from tests.test_resolve_day import _create_game_for_day_resolve
+
+
+@pytest.fixture(params=["memory", "db", "file"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStateStore()
+    if request.param == "db":
+        return DatabaseStateStore()
+    return FileStateStore(str(tmp_path))
+
+
+def test_store_roundtrip(store, db: Session):
+    assert store.get(db, "runoff", "g1") is None
+    assert store.get(db, "reveal_roles", "g1", False) is False
+
+    value = {"day_no": 2, "candidate_ids": ["a", "b"]}
+    store.set(db, "runoff", "g1", value)
+    db.commit()
+    value["candidate_ids"].append("c")
+
+    assert store.get(db, "runoff", "g1") == {"day_no": 2, "candidate_ids": ["a", "b"]}
+    assert store.get(db, "runoff", "g2") is None
+
+    store.set(db, "runoff", "g1", {"day_no": 3, "candidate_ids": []})
+    db.commit()
+    assert store.get(db, "runoff", "g1")["day_no"] == 3
+
+    store.delete(db, "runoff", "g1")
+    db.commit()
+    assert store.get(db, "runoff", "g1") is None
+    # 無いものを消してもエラーにしない
+    store.delete(db, "runoff", "g1")
+
+
+def test_file_store_is_shared_between_instances(tmp_path, db: Session):
+    """同じディレクトリを指す別プロセス（別インスタンス）から同じ値が見えること。"""
+    writer = FileStateStore(str(tmp_path))
+    reader = FileStateStore(str(tmp_path))
+
+    writer.set(db, "reveal_roles", "game/with/slash", True)
+    db.commit()
+    assert reader.get(db, "reveal_roles", "game/with/slash") is True
+
+
+@pytest.mark.parametrize("make_store", [MemoryStateStore, lambda: FileStateStore(tempfile.mkdtemp())])
+def test_store_outside_db_follows_the_transaction(make_store, db: Session):
+    """MEMORY / FILE でも、書き込みは commit 後に見え、rollback すれば残らないこと。"""
+    store = make_store()
+    other = SessionLocal()
+    try:
+        store.set(db, "runoff", "g1", {"day_no": 1})
+        # 同じセッションからは見えるが、commit 前なので他からは見えない
+        assert store.get(db, "runoff", "g1") == {"day_no": 1}
+        assert store.get(other, "runoff", "g1") is None
+        db.rollback()
+        assert store.get(db, "runoff", "g1") is None
+
+        store.set(db, "runoff", "g1", {"day_no": 2})
+        db.commit()
+        assert store.get(other, "runoff", "g1") == {"day_no": 2}
+
+        store.delete(db, "runoff", "g1")
+        assert store.get(db, "runoff", "g1") is None
+        assert store.get(other, "runoff", "g1") == {"day_no": 2}
+        db.close()
+        assert store.get(other, "runoff", "g1") == {"day_no": 2}
+    finally:
+        other.close()
+
+
+def test_runoff_state_is_committed_with_the_game(db: Session):
+    """DB バックエンドでは決選投票の候補が shared_state に入り、別セッションからも読めること。"""
+    previous = set_state_store(DatabaseStateStore())
+    try:
+        _resolve_into_runoff_and_read_back(db)
+    finally:
+        set_state_store(previous)
+
+
+def _resolve_into_runoff_and_read_back(db: Session):
+    game, members = _create_game_for_day_resolve(db, wolf_count=1, village_count=4)
+    candidate1, candidate2 = members[2], members[3]
+    for i, voter in enumerate(members[:4]):
+        db.add(DayVote(
+            id=str(uuid.uuid4()),
+            game_id=game.id,
+            day_no=game.curr_day,
+            voter_member_id=voter.id,
+            target_member_id=(candidate1 if i < 2 else candidate2).id,
+        ))
+    db.commit()
+
+    result = resolve_day_simple(
+        game_id=game.id,
+        data=DayResolveRequest(requester_member_id=members[0].id),
+        db=db,
+    )
+    assert result["status"] == "RUNOFF"
+
+    other = SessionLocal()
+    try:
+        runoff = get_state_store().get(other, RUNOFF_STATE_NS, game.id)
+    finally:
+        other.close()
+    assert runoff["day_no"] == game.curr_day
+    assert set(runoff["candidate_ids"]) == {candidate1.id, candidate2.id}
+
+
+def test_set_state_store_swaps_backend(db: Session):
+    memory = MemoryStateStore()
+    previous = set_state_store(memory)
+    try:
+        assert get_state_store() is memory
+    finally:
+        set_state_store(previous)
+    assert db.query(SharedState).count() == 0
@@ -0,0 +1,73 @@
+# tests/test_static.py
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.static import CachedStaticFiles
+
+
+def test_js_is_compressed_and_cacheable(client: TestClient):
+    res = client.get("/frontend/js/night_common.js", headers={"Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["vary"]
+    assert res.headers["cache-control"] == "public, max-age=86400"
+    assert "javascript" in res.headers["content-type"]
+    with open("frontend/js/night_common.js", "rb") as f:
+        assert res.content == f.read()  # httpx が展開した本文
+
+    etag = res.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('-gzip"')
+
+    res = client.get(
+        "/frontend/js/night_common.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert res.status_code == 304
+    assert res.content == b""
+
+
+def test_versioned_asset_is_immutable(client: TestClient):
+    res = client.get("/frontend/js/game_events.js?v=20261017b")
+    assert res.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+
+def test_other_query_parameters_get_normal_max_age(client: TestClient):
+    # v 以外のパラメータ（名前が v= で終わるものを含む）や空の v はバージョン指定ではない
+    for query in ("dev=1", "nav=2", "v="):
+        res = client.get(f"/frontend/js/game_events.js?{query}")
+        assert res.headers["cache-control"] == "public, max-age=86400", query
+
+
+def test_html_is_revalidated_with_etag(client: TestClient):
+    res = client.get("/frontend/day.html", headers={"Accept-Encoding": "identity"})
+    assert res.status_code == 200
+    assert "content-encoding" not in res.headers
+    assert res.headers["cache-control"] == "no-cache"
+    assert res.headers["content-type"] == "text/html; charset=utf-8"
+
+    res = client.get(
+        "/frontend/day.html",
+        headers={"Accept-Encoding": "identity", "If-None-Match": res.headers["etag"]},
+    )
+    assert res.status_code == 304
+
+    assert client.get("/frontend/no_such_page.html").status_code == 404
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    page = tmp_path / "page.html"
+    page.write_text("<p>" + "a" * 1000 + "</p>")
+    app = FastAPI()
+    app.mount("/s", CachedStaticFiles(directory=str(tmp_path), html=True))
+    with TestClient(app) as c:
+        first = c.get("/s/page.html", headers={"Accept-Encoding": "gzip"})
+        assert first.headers["content-encoding"] == "gzip"
+
+        page.write_text("<p>changed</p>")
+        stat = page.stat()
+        os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = c.get("/s/page.html", headers={"Accept-Encoding": "gzip"})
+        assert second.text == "<p>changed</p>"
+        assert second.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,162 @@
+# tests/test_vote_batch.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.game import DayVote, Game, WolfVote
+from app.state_store import RUNOFF_STATE_NS, get_state_store
+from tests.test_night_phase import _setup_started_game
+
+
+def test_day_votes_batch_upserts_valid_votes_and_reports_errors(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    wolves = [m for m in members if m.role_type == "WEREWOLF"]
+    villagers = [m for m in members if m.role_type != "WEREWOLF"]
+    target = villagers[0]
+
+    # 既存の投票は上書きされる
+    res = client.post(
+        f"/api/games/{game_id}/day_vote",
+        json={"voter_member_id": villagers[1].id, "target_member_id": wolves[0].id},
+    )
+    assert res.status_code == 200
+
+    votes = [
+        {"voter_member_id": villagers[1].id, "target_member_id": target.id},
+        {"voter_member_id": villagers[2].id, "target_member_id": target.id},
+        {"voter_member_id": wolves[0].id, "target_member_id": wolves[1].id},
+        {"voter_member_id": target.id, "target_member_id": target.id},
+        {"voter_member_id": "no-such-member", "target_member_id": target.id},
+    ]
+    res = client.post(f"/api/games/{game_id}/day_votes:batch", json={"votes": votes})
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert (body["accepted"], body["rejected"]) == (2, 3)
+
+    results = body["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert results[0]["vote"]["target_member_id"] == target.id
+    assert results[0]["error"] is None
+    assert results[2]["error"] == {"status_code": 400, "detail": "Werewolf cannot vote for another werewolf"}
+    assert results[3]["error"]["detail"] == "Player cannot vote for themselves"
+    assert results[4]["error"] == {"status_code": 404, "detail": "Voter member not found"}
+    assert results[4]["vote"] is None
+
+    stored = {
+        v.voter_member_id: v.target_member_id
+        for v in db.query(DayVote).filter(DayVote.game_id == game_id).all()
+    }
+    assert stored == {villagers[1].id: target.id, villagers[2].id: target.id}
+
+    status = client.get(f"/api/games/{game_id}/day_vote_status").json()
+    assert status["voted_count"] == 2
+
+
+def test_day_votes_batch_reports_superseded_duplicates(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=6)
+    villagers = [m for m in members if m.role_type != "WEREWOLF"]
+    voter, first_target, second_target = villagers[0], villagers[1], villagers[2]
+
+    votes = [
+        {"voter_member_id": voter.id, "target_member_id": first_target.id},
+        {"voter_member_id": voter.id, "target_member_id": second_target.id},
+    ]
+    body = client.post(f"/api/games/{game_id}/day_votes:batch", json={"votes": votes}).json()
+    assert (body["accepted"], body["rejected"]) == (1, 1)
+    first, second = body["results"]
+    assert first["vote"] is None
+    assert first["error"] == {"status_code": 409, "detail": "Superseded by index 1"}
+    assert second["error"] is None
+    assert second["vote"]["target_member_id"] == second_target.id
+
+    stored = db.query(DayVote).filter(DayVote.game_id == game_id).all()
+    assert [(v.voter_member_id, v.target_member_id) for v in stored] == [(voter.id, second_target.id)]
+
+
+def test_day_votes_batch_checks_runoff_candidates(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=6)
+    villagers = [m for m in members if m.role_type != "WEREWOLF"]
+    game = db.get(Game, game_id)
+    get_state_store().set(
+        db, RUNOFF_STATE_NS, game_id,
+        {"day_no": game.curr_day, "candidate_ids": [villagers[0].id, villagers[1].id]},
+    )
+    db.commit()
+
+    votes = [
+        {"voter_member_id": villagers[2].id, "target_member_id": villagers[0].id},
+        {"voter_member_id": villagers[3].id, "target_member_id": villagers[2].id},
+    ]
+    body = client.post(f"/api/games/{game_id}/day_votes:batch", json={"votes": votes}).json()
+    assert body["results"][0]["error"] is None
+    assert body["results"][1]["error"]["detail"] == "Target is not in runoff candidates"
+
+
+def test_day_votes_batch_requires_day_phase(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=6)
+    game = db.get(Game, game_id)
+    game.status = "NIGHT"
+    db.commit()
+
+    votes = [{"voter_member_id": members[0].id, "target_member_id": members[1].id}]
+    res = client.post(f"/api/games/{game_id}/day_votes:batch", json={"votes": votes})
+    assert res.status_code == 400
+    assert client.post("/api/games/no-such-game/day_votes:batch", json={"votes": votes}).status_code == 404
+    assert client.post(f"/api/games/{game_id}/day_votes:batch", json={"votes": []}).status_code == 422
+
+
+def test_wolf_votes_batch(db: Session, client: TestClient):
+    game_id, members = _setup_started_game(db, client, member_count=9)
+    game = db.get(Game, game_id)
+    game.status = "NIGHT"
+    db.commit()
+    wolves = [m for m in members if m.role_type == "WEREWOLF"]
+    villagers = [m for m in members if m.role_type != "WEREWOLF"]
+    seer = next(m for m in members if m.role_type == "SEER")
+
+    votes = [
+        {"wolf_member_id": wolves[0].id, "target_member_id": villagers[0].id, "priority_level": 1},
+        {"wolf_member_id": wolves[1].id, "target_member_id": villagers[1].id, "priority_level": 2},
+        {"wolf_member_id": wolves[1].id, "target_member_id": villagers[0].id, "priority_level": 3},
+        {"wolf_member_id": wolves[0].id, "target_member_id": wolves[1].id, "priority_level": 1},
+        {"wolf_member_id": seer.id, "target_member_id": villagers[0].id, "priority_level": 1},
+    ]
+    res = client.post(f"/api/games/{game_id}/wolves/votes:batch", json={"votes": votes})
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert (body["accepted"], body["rejected"]) == (2, 3)
+    assert body["results"][3]["error"]["detail"] == "Wolf cannot target other werewolves"
+    assert body["results"][4]["error"]["detail"] == "Member is not a werewolf"
+    # 同じ人狼の2件目が後勝ち。1件目は上書きされたエラーになる
+    assert body["results"][1]["vote"] is None
+    assert body["results"][1]["error"] == {"status_code": 409, "detail": "Superseded by index 2"}
+    assert body["results"][2]["vote"]["priority_level"] == 3
+    # 後の件が通らなければ、前の件がそのまま残る
+    assert body["results"][0]["vote"]["target_member_id"] == villagers[0].id
+
+    stored = {
+        v.wolf_member_id: (v.target_member_id, v.points_at_vote)
+        for v in db.query(WolfVote).filter(WolfVote.game_id == game_id).all()
+    }
+    assert stored == {
+        wolves[0].id: (villagers[0].id, game.wolf_vote_lvl1_point),
+        wolves[1].id: (villagers[0].id, game.wolf_vote_lvl3_point),
+    }
+
+    status = client.get(f"/api/games/{game_id}/night_actions_status").json()
+    assert status["wolves_done"] == 2
+
+
+def test_batch_commits_once(db: Session, client: TestClient, query_budget):
+    """人数に依らず、一括投票の SQL 数は一定。"""
+    for count in (6, 15):
+        game_id, members = _setup_started_game(db, client, member_count=count)
+        villagers = [m for m in members if m.role_type != "WEREWOLF"]
+        votes = [
+            {"voter_member_id": m.id, "target_member_id": villagers[0].id}
+            for m in members
+            if m.id != villagers[0].id
+        ]
+        res = client.post(f"/api/games/{game_id}/day_votes:batch", json={"votes": votes})
+        assert res.json()["rejected"] == 0
+        query_budget(res, 7)